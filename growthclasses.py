@@ -29,14 +29,20 @@
 
 import numpy as np
 import argparse
-import sys
+import sys,os
 import pickle
-import scipy.integrate as spint
-
-from scipy.stats import poisson
+import json
+import hashlib
+import uuid
+import zipfile
+import multiprocessing
+import warnings
+
+from scipy.special import gammaln,xlogy,lambertw,pdtrc
 from inspect     import getmembers as ins_getmembers
 from inspect     import isclass    as ins_isclass
 from itertools   import product    as it_product
+from collections import OrderedDict
 
 
 def RungeKutta4(func,xx,tt,step):
@@ -101,32 +107,365 @@ def AddLatticeParameters(p):
     return p
 
 
-def PoissonSeedingVectors(m,n,cutoff = 1e-100,diff = False):
-    if isinstance(n,(float,np.float,np.float64,int)):
-        n = np.array([n],dtype=float)
-    px = np.zeros((len(n),len(m)))
+def AddOutputFormatParameters(p):
+    parser_format = p.add_argument_group(description = "==== Output format ====")
+    parser_format.add_argument("--format",choices = ['text','npy','npz'],default = 'text',help = "'text': whitespace separated columns, blank lines between trajectories; 'npy'/'npz': structured arrays with named columns, see 'WriteColumns' [default: text]")
+    return p
+
+
+def AddSeedingTruncationParameters(p):
+    parser_truncation = p.add_argument_group(description = "==== Truncation of Poisson seeding at the end of the growthmatrix grid ====")
+    parser_truncation.add_argument("--truncationtolerance",type=float,default=1e-8,help = "warn if Poisson seeding loses more probability mass beyond the grid [default: 1e-8]")
+    parser_truncation.add_argument("--extendgrowthmatrix",default=False,action="store_true",help = "instead of warning, compute missing rows of the growthmatrix and store them in INFILE")
+    parser_truncation.add_argument("--extendworkers",type=int,default=1,help = "number of processes to compute new rows of the growthmatrix [default: 1]")
+    return p
+
+
+def AddSeedingCacheParameters(p):
+    parser_seedingcache = p.add_argument_group(description = "==== Cache of Poisson seeding vectors ====")
+    parser_seedingcache.add_argument("--seedingcachesize",type=float,default=32,help = "memory for cached seeding vectors in MB, 0 disables the cache [default: 32]")
+    parser_seedingcache.add_argument("--seedingcachebits",type=int,default=None,help = "round inoculum sizes to this many bits of relative precision before computing seeding vectors, such that nearly equal sizes share cached vectors [default: None, exact sizes]")
+    return p
+
+
+class PoissonSeedingCache(object):
+    # memory-bounded LRU cache for single rows of banded Poisson seeding vectors (and their derivatives)
+    # rows are keyed on the axis, the inoculum size, the cutoff and whether derivatives are included
+    # by default inoculum sizes are exact keys, and cached rows are identical to the ones computed without cache
+    # with 'mantissabits', inoculum sizes are rounded to this many bits of relative precision and rows are computed at the rounded value:
+    # more hits for nearly equal sizes, results still do not depend on the state of the cache, but differ slightly from uncached ones
+    # 'maxbytes = 0' disables caching altogether
+    def __init__(self,maxbytes = 32 * 2**20, mantissabits = None):
+        self.maxbytes      = int(maxbytes)
+        self.mantissabits  = None if mantissabits is None else int(mantissabits)
+        self.hits          = 0
+        self.misses        = 0
+        self.__entries     = OrderedDict()
+        self.__axes        = dict()
+        self.__bytes       = 0
+    
+    def AxisID(self,m):
+        # axes are identified by their content, each distinct axis gets a small integer
+        b = np.ascontiguousarray(m,dtype=np.float64).tobytes()
+        if not b in self.__axes:
+            self.__axes[b] = len(self.__axes)
+        return self.__axes[b]
+    
+    def Quantize(self,n):
+        if self.mantissabits is None:
+            return np.asarray(n,dtype=np.float64)
+        mantissa,exponent = np.frexp(np.asarray(n,dtype=np.float64))
+        return np.ldexp(np.round(np.ldexp(mantissa,self.mantissabits)),exponent - self.mantissabits)
+    
+    def Get(self,key):
+        value = self.__entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.__entries.move_to_end(key)
+        return value
+    
+    def Put(self,key,value):
+        size = sum([v.nbytes for v in value])
+        if size > self.maxbytes:
+            return
+        if key in self.__entries:
+            self.__bytes -= sum([v.nbytes for v in self.__entries.pop(key)])
+        for v in value:
+            v.flags.writeable = False
+        self.__entries[key] = value
+        self.__bytes += size
+        self.Evict()
+    
+    def Evict(self):
+        while self.__bytes > self.maxbytes and len(self.__entries) > 0:
+            key,value = self.__entries.popitem(last = False)
+            self.__bytes -= sum([v.nbytes for v in value])
+    
+    def SetMaxBytes(self,maxbytes):
+        self.maxbytes = int(maxbytes)
+        self.Evict()
+    
+    def SetMantissaBits(self,mantissabits):
+        # entries computed at other precisions are not valid anymore
+        mantissabits = None if mantissabits is None else int(mantissabits)
+        if mantissabits != self.mantissabits:
+            self.__entries.clear()
+            self.__bytes  = 0
+        self.mantissabits = mantissabits
+    
+    def Clear(self):
+        self.__entries.clear()
+        self.__axes.clear()
+        self.__bytes = 0
+        self.hits    = 0
+        self.misses  = 0
+    
+    def Stats(self):
+        return {'hits':self.hits, 'misses':self.misses, 'entries':len(self.__entries), 'bytes':self.__bytes, 'maxbytes':self.maxbytes}
+    
+    def __str__(self):
+        return "# seeding cache: {hits} hits, {misses} misses, {entries} entries, {bytes} of {maxbytes} bytes\n".format(**self.Stats())
+    
+    def __len__(self):
+        return len(self.__entries)
+
+
+# default cache used by 'PoissonSeedingVectors'
+SeedingVectorCache = PoissonSeedingCache()
+
+
+def SeedingTruncationError(grid,n):
+    # probability mass of Poisson seeding with mean 'n' beyond the last value of 'grid',
+    # which is lost when weights are renormalized on the grid
+    n    = np.atleast_1d(np.array(n,dtype=np.float64))
+    last = np.floor(np.asarray(grid,dtype=np.float64)[-1])
+    return np.where(n > 0,pdtrc(last,np.maximum(n,0)),0.)
+
+
+def SeedingRequiredGridSize(n,tolerance = 1e-8):
+    # smallest integer M such that Poisson seeding with mean 'n' has at most mass 'tolerance' beyond M (bisection for all n at once)
+    n  = np.atleast_1d(np.array(n,dtype=np.float64))
+    lo = -np.ones(len(n))
+    hi = np.ceil(n + 40 * np.sqrt(n) + 40)
+    while np.any(hi - lo > 1):
+        mid   = np.floor(.5 * (lo + hi))
+        below = pdtrc(mid,np.maximum(n,0)) <= tolerance
+        hi    = np.where(below,mid,hi)
+        lo    = np.where(below,lo,mid)
+    return hi.astype(int)
+
+
+class SeedingTruncationMonitor(object):
+    # records the probability mass of Poisson seeding that is lost beyond the end of the growthmatrix grid
+    # in every evaluation of 'SeedingAverageArray' and 'SeedingIterationMap',
+    # the first time the lost mass exceeds 'tolerance' a warning is issued, afterwards only statistics are updated
+    # 'tolerance = None' disables the monitor
+    def __init__(self,tolerance = 1e-8):
+        self.tolerance = tolerance
+        self.Reset()
+    
+    def Reset(self):
+        self.maxerror   = 0.
+        self.maxinoculum = 0.
+        self.exceeded   = 0
+        self.warned     = False
+    
+    def Check(self,grid,n):
+        if self.tolerance is None or len(np.atleast_1d(n)) == 0:
+            return
+        error = SeedingTruncationError(grid,n)
+        self.maxerror = max(self.maxerror,float(np.max(error)))
+        if np.any(error > self.tolerance):
+            self.exceeded   += int(np.sum(error > self.tolerance))
+            self.maxinoculum = max(self.maxinoculum,float(np.max(np.atleast_1d(n)[error > self.tolerance])))
+            if not self.warned:
+                warnings.warn("Poisson seeding with inoculum {:.3f} loses mass {:.3e} beyond grid end {:.3f}, extend the growthmatrix to at least {:d}".format(self.maxinoculum,self.maxerror,float(np.asarray(grid)[-1]),int(SeedingRequiredGridSize(self.maxinoculum,self.tolerance)[0])))
+                self.warned = True
+    
+    def __str__(self):
+        return "# seeding truncation: {:d} inocula above tolerance {}, largest lost mass {:.3e}\n".format(self.exceeded,self.tolerance,self.maxerror)
+
+
+# default monitor used by 'SeedingAverageArray' and 'SeedingIterationMap'
+SeedingTruncation = SeedingTruncationMonitor()
+
+
+def PoissonSeedingWindow(m,n,cutoff = 1e-100):
+    # index ranges [lo,hi) on the increasing axis 'm', outside of which all Poisson weights with mean 'n' are below 'cutoff'
+    # uses the bound pmf(k) <= exp(-D(k)) with D(k) = k log(k/n) - k + n (from k! >= (k/e)^k),
+    # both roots of D(k) = -log(cutoff) are given by the branches of the Lambert W function
+    m  = np.array(m,dtype=float)
+    n  = np.atleast_1d(np.array(n,dtype=float))
+    lo = np.zeros(len(n),dtype=int)
+    hi = np.repeat(len(m),len(n))
+    pos = n > 0
+    hi[~pos] = min(2,len(m))
+    if 0 < cutoff < 1 and np.any(pos):
+        # for arg >= 0 the lower root vanishes, as W_{-1}(0) = -inf
+        npos  = n[pos]
+        arg   = (-np.log(cutoff)/npos - 1.)/np.e
+        upper = npos * np.exp(1. + lambertw(arg,0).real)
+        lower = npos * np.exp(1. + lambertw(np.minimum(arg,0),-1).real)
+        # widen windows by one entry on both sides to be safe against rounding
+        lo[pos] = np.maximum(np.searchsorted(m,lower,side = 'left') - 1,0)
+        hi[pos] = np.minimum(np.searchsorted(m,upper,side = 'right') + 1,len(m))
+    return lo,hi
+
+
+def ComputePoissonSeedingBands(m,n,cutoff = 1e-100,diff = False):
+    # Poisson weights only evaluated within the window where they can exceed 'cutoff', see 'PoissonSeedingWindow'
+    # returns 'start' and 'weights' with shape (len(n),width), all rows have a common width:
+    # row i of the full seeding vector is 'weights[i]' at positions start[i] ... start[i] + width - 1 and zero elsewhere
+    m       = np.array(m,dtype=float)
+    n       = np.atleast_1d(np.array(n,dtype=float))
+    lo,hi   = PoissonSeedingWindow(m,n,cutoff)
+    width   = int(np.max(hi - lo)) if len(n) > 0 else 0
+    start   = np.minimum(lo,len(m) - width)
+    mwindow = m[start[:,np.newaxis] + np.arange(width)[np.newaxis,:]]
+    px = np.zeros((len(n),width))
     if diff:
-        dpx = np.zeros((len(n),len(m)))
-    for i in range(len(n)):
-        if n[i] > 0:
-            px[i] = poisson.pmf(m,n[i])
-            px[i,px[i,:]<cutoff] = 0.
-            px[i] /= np.sum(px[i]) # normalize
-            if diff:
-                dpx[i] = (m/n[i] - 1.)*px[i]
-        else:
-            px[i,0] = 1.
-            if diff:
-                dpx[i,1] = 1.
+        dpx = np.zeros((len(n),width))
+    pos = n > 0
+    if np.any(pos):
+        # same expression as 'poisson.pmf', pmf vanishes on non-integer and negative values
+        mpos = mwindow[pos]
+        p = np.exp(xlogy(mpos,n[pos,np.newaxis]) - gammaln(mpos + 1.) - n[pos,np.newaxis])
+        p[np.logical_or(mpos != np.floor(mpos),mpos < 0)] = 0.
+        p[p<cutoff] = 0.
+        p /= np.sum(p,axis = 1)[:,np.newaxis] # normalize
+        px[pos] = p
+        if diff:
+            # derivative of the normalized weights: d p_m/dn = (m/n - 1) p_m - p_m sum_k (k/n - 1) p_k,
+            # the second term vanishes only if the window covers the whole distribution
+            dp = (mpos/n[pos,np.newaxis] - 1.)*p
+            dpx[pos] = dp - p * np.sum(dp,axis = 1)[:,np.newaxis]
+    if not np.all(pos):
+        px[~pos,0] = 1.
+        if diff:
+            # limit n -> 0: weight moves from m = 0 to m = 1 (windows start at m = 0 on the integer lattice)
+            dpx[~pos,0] = -1.
+            dpx[~pos,1] =  1.
     if diff:
-        return px,dpx
+        return start,px,dpx
     else:
-        return px
+        return start,px
+
+
+def SeedingBandsToVectors(start,weights,length):
+    # scatter banded weights back onto the full axis of size 'length'
+    px = np.zeros((len(start),length))
+    px[np.arange(len(start))[:,np.newaxis],start[:,np.newaxis] + np.arange(np.shape(weights)[1])[np.newaxis,:]] = weights
+    # rows without any weight above the cutoff cannot be normalized, keep them undefined on the full axis
+    px[np.any(np.isnan(weights),axis = 1)] = np.nan
+    return px
+
+
+def ComputePoissonSeedingVectors(m,n,cutoff = 1e-100,diff = False):
+    # one row of Poisson weights on the grid 'm' for each average inoculum size in 'n',
+    # pmf values are only computed within the bands returned by 'ComputePoissonSeedingBands'
+    bands = ComputePoissonSeedingBands(m,n,cutoff = cutoff,diff = diff)
+    if diff:
+        return SeedingBandsToVectors(bands[0],bands[1],len(m)),SeedingBandsToVectors(bands[0],bands[2],len(m))
+    else:
+        return SeedingBandsToVectors(bands[0],bands[1],len(m))
+
+
+def PoissonSeedingBands(m,n,cutoff = 1e-100,diff = False,cache = None):
+    # same as 'ComputePoissonSeedingBands', but bands are looked up row by row in 'cache' (default: SeedingVectorCache)
+    # and only missing rows are evaluated, in a single call; 'cache = False' bypasses caching
+    if cache is None:
+        cache = SeedingVectorCache
+    if cache is False or cache.maxbytes <= 0:
+        return ComputePoissonSeedingBands(m,n,cutoff = cutoff,diff = diff)
+    
+    m    = np.array(m,dtype=float)
+    n    = cache.Quantize(np.atleast_1d(np.array(n,dtype=float)))
+    axis = cache.AxisID(m)
+    keys = [(axis,nv,cutoff,diff) for nv in n.tolist()]
+    rows = [cache.Get(key) for key in keys]
+    
+    # rows are stored trimmed to their nonzero entries, as (position of first entry, weights, [derivatives])
+    missing = [i for i,row in enumerate(rows) if row is None]
+    if len(missing) > 0:
+        computed = ComputePoissonSeedingBands(m,n[missing],cutoff = cutoff,diff = diff)
+        for j,i in enumerate(missing):
+            nonzero = np.flatnonzero(np.any([c[j] != 0 for c in computed[1:]],axis = 0))
+            if len(nonzero) > 0:
+                first,last = nonzero[0],nonzero[-1] + 1
+            else:
+                first,last = 0,0
+            rows[i] = (np.array([computed[0][j] + first]),) + tuple([c[j,first:last].copy() for c in computed[1:]])
+            cache.Put(keys[i],rows[i])
+    
+    width = max([len(row[1]) for row in rows]) if len(rows) > 0 else 0
+    start = np.array([min(row[0][0],len(m) - width) for row in rows],dtype=int)
+    bands = [np.zeros((len(n),width)) for k in range(2 if diff else 1)]
+    for i,row in enumerate(rows):
+        offset = row[0][0] - start[i]
+        for k in range(len(bands)):
+            bands[k][i,offset:offset + len(row[k+1])] = row[k+1]
+    return (start,) + tuple(bands)
+
+
+def PoissonSeedingVectors(m,n,cutoff = 1e-100,diff = False,cache = None):
+    # one row of Poisson weights on the grid 'm' for each average inoculum size in 'n',
+    # assembled from (cached) bands, see 'PoissonSeedingBands'
+    bands = PoissonSeedingBands(m,n,cutoff = cutoff,diff = diff,cache = cache)
+    if diff:
+        return SeedingBandsToVectors(bands[0],bands[1],len(m)),SeedingBandsToVectors(bands[0],bands[2],len(m))
+    else:
+        return SeedingBandsToVectors(bands[0],bands[1],len(m))
+
+
+def IsUnitLattice(grid):
+    # grid 0,1,2,... where Poisson weights can be used directly
+    grid = np.asarray(grid)
+    return len(grid) > 0 and grid[0] == 0 and np.all(np.diff(grid) == 1)
+
+
+def GridSeedingBands(grid,n,cutoff = 1e-100,diff = False,cache = None):
+    # Poisson weights for the nodes of an arbitrary increasing grid, e.g. coarse or log-spaced growthmatrix axes:
+    # weights on the integer lattice 0 ... ceil(grid[-1]) are redistributed to the two neighboring grid nodes
+    # by linear interpolation, mass outside the grid is assigned to the first or last node.
+    # averages over the grid then correspond to averages over the linear interpolation of the matrix.
+    # grids need to contain 1: otherwise lattice points 1 ... grid[1]-1 interpolate between no cells (0) and a full deme,
+    # and averages for small inocula are off by a lot, a warning is issued if they carry more mass than 'SeedingTruncation.tolerance'
+    # returns bands on the grid in the same format as 'PoissonSeedingBands'
+    grid = np.array(grid,dtype=float)
+    if IsUnitLattice(grid):
+        return PoissonSeedingBands(grid,n,cutoff = cutoff,diff = diff,cache = cache)
+    
+    lattice = np.arange(max(np.ceil(grid[-1]),1) + 1)
+    bands   = PoissonSeedingBands(lattice,n,cutoff = cutoff,diff = diff,cache = cache)
+    start   = bands[0]
+    latticewidth = np.shape(bands[1])[1]
+    
+    # lower grid node and interpolation weight of the upper node for every lattice point
+    if len(grid) > 1:
+        node = np.clip(np.searchsorted(grid,lattice,side = 'right') - 1,0,len(grid) - 2)
+        frac = np.clip((lattice - grid[node])/(grid[node + 1] - grid[node]),0,1)
+    else:
+        node = np.zeros(len(lattice),dtype=int)
+        frac = np.zeros(len(lattice))
+    
+    # bands on the grid cover the nodes next to the first and the last lattice point of each band
+    idx       = start[:,np.newaxis] + np.arange(latticewidth)[np.newaxis,:]
+    gridstart = node[start]
+    gridwidth = min(int(np.max(node[idx[:,-1]] + 2 - gridstart,initial = 1)),len(grid))
+    gridstart = np.minimum(gridstart,len(grid) - gridwidth)
+    
+    if len(grid) > 1 and grid[0] == 0 and grid[1] > 1 and not SeedingTruncation.tolerance is None:
+        inner = (lattice[idx] > 0) & (lattice[idx] < grid[1])
+        if np.any(np.sum(np.where(inner,bands[1],0),axis = 1) > SeedingTruncation.tolerance):
+            warnings.warn("growthmatrix grid has no node 1, Poisson seeding of small inocula interpolates between 0 and {:g} cells, recompute the growthmatrix with node 1".format(grid[1]))
+    
+    rows  = np.repeat(np.arange(len(start))[:,np.newaxis],latticewidth,axis = 1)
+    lower = (rows * gridwidth + node[idx] - gridstart[:,np.newaxis]).flatten()
+    upper = (rows * gridwidth + np.minimum(node[idx] + 1,len(grid) - 1) - gridstart[:,np.newaxis]).flatten()
+    
+    def Project(weights):
+        p  = np.bincount(lower,weights = (weights * (1 - frac[idx])).flatten(),minlength = len(start) * gridwidth)
+        p += np.bincount(upper,weights = (weights * frac[idx]).flatten(),minlength = len(start) * gridwidth)
+        return p.reshape((len(start),gridwidth))
+    
+    return (gridstart,) + tuple([Project(b) for b in bands[1:]])
+
+
+def GridSeedingVectors(grid,n,cutoff = 1e-100,diff = False,cache = None):
+    # full seeding vectors on 'grid', see 'GridSeedingBands'
+    bands = GridSeedingBands(grid,n,cutoff = cutoff,diff = diff,cache = cache)
+    if diff:
+        return SeedingBandsToVectors(bands[0],bands[1],len(grid)),SeedingBandsToVectors(bands[0],bands[2],len(grid))
+    else:
+        return SeedingBandsToVectors(bands[0],bands[1],len(grid))
+
 
 def PointSeedingVectors(m,n):
     # seeding without variance
     # only interpolate between neighboring inoculum sizes to allow for fractional numbers
-    if isinstance(n,(float,np.float,np.float64,int)):
+    if isinstance(n,(float,np.float64,int)):
         n = np.array([n],dtype=float)
     px = np.zeros((len(n),len(m)))
     for i in range(len(n)):
@@ -168,17 +507,18 @@ def TransformInoculum(coord, inabs = False, outabs = False):
     # inabs:  input coordinate are (n1,n2)
     # outabs: output coordinates are (n1,n2)
     # else use relative (n,x)
+    # coord[0] and coord[1] can also be arrays of coordinates, e.g. from np.meshgrid
     if inabs:
-        n1,n2 = (coord[0],coord[1])
+        n1,n2 = (np.array(coord[0],dtype=np.float64),np.array(coord[1],dtype=np.float64))
     else:
-        n1,n2 = (coord[0] * coord[1], coord[0] * (1-coord[1]))
+        n1,n2 = (np.array(coord[0],dtype=np.float64) * coord[1], np.array(coord[0],dtype=np.float64) * (1-np.array(coord[1],dtype=np.float64)))
     if outabs:
-        return np.array([n1,n2],dtype=np.float)
+        return np.array([n1,n2],dtype=np.float64)
     else:
-        if n1+n2 > 0:
-            return np.array([n1+n2,n1/(n1+n2)],dtype=np.float)
-        else:
-            return np.zeros(2)
+        n = n1 + n2
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            x = np.where(n > 0,n1/n,0.)
+        return np.array([np.where(n > 0,n,0.),x],dtype=np.float64)
         
 
 def getDilutionList(**kwargs):
@@ -197,24 +537,342 @@ def getDilutionList(**kwargs):
     return dlist
 
 
+# number of entries gathered at once when averaging over seeding bands
+SeedingAverageChunkSize = 2**22
+
+
 def SeedingAverage(matrix,coordinates,axis1 = None, axis2 = None, mask = None, replaceNAN = True):
-    dim = matrix.shape
+    # average for a single inoculum, see 'SeedingAverageArray'
+    return SeedingAverageArray(matrix,[coordinates],axis1 = axis1,axis2 = axis2,mask = mask,replaceNAN = replaceNAN)[0]
+
+
+def SeedingAverageArray(matrix,coordinates,axis1 = None, axis2 = None, mask = None, replaceNAN = True):
+    # averages over Poisson seeding for many inocula at once
+    # 'coordinates' are absolute inoculum sizes (n1,n2) with shape (number of inocula, 2)
+    # 'matrix' has shape (len(axis1),len(axis2)) or (len(axis1),len(axis2),number of quantities),
+    # e.g. the whole growthmatrix, where the last index runs over strains
+    # weights P1, P2 are computed once for all distinct values of n1 and n2, results are rows of P1 . matrix . P2^T
+    # sums only run over the bands where Poisson weights exceed the cutoff, see 'PoissonSeedingBands'
+    # 'axis1', 'axis2' are the grid values of the matrix (default: unit lattice), other grids are handled by 'GridSeedingBands'
+    # returns array with shape (number of inocula) or (number of inocula, number of quantities)
+    dim = np.shape(matrix)
     if axis1 is None:   axis1 = np.arange(dim[0])
     if axis2 is None:   axis2 = np.arange(dim[1])
-        
-    p1 = PoissonSeedingVectors(axis1,[coordinates[0]])[0]
-    p2 = PoissonSeedingVectors(axis2,[coordinates[1]])[0]
     
-    matrix0 = matrix[:,:]
-    if not mask is None:    matrix0[np.logical_not(mask)] = 0
+    # identical inocula are only averaged once
+    coordinates,invc = np.unique(np.array(coordinates,dtype=np.float64).reshape((-1,2)),axis = 0,return_inverse = True)
+    n1,inv1 = np.unique(coordinates[:,0],return_inverse = True)
+    n2,inv2 = np.unique(coordinates[:,1],return_inverse = True)
+    SeedingTruncation.Check(axis1,n1)
+    SeedingTruncation.Check(axis2,n2)
+    s1,p1 = GridSeedingBands(axis1,n1)
+    s2,p2 = GridSeedingBands(axis2,n2)
+    
+    # only rows covered by any band are read from the matrix (memory-mapped matrices are not loaded entirely)
+    r0  = min(s1,default = 0)
+    r1  = max(s1,default = 0) + np.shape(p1)[1]
+    matrix0 = np.array(matrix[r0:r1],dtype=np.float64)
+    if not mask is None:    matrix0[np.logical_not(mask[r0:r1])] = 0
     if replaceNAN:          matrix0 = np.nan_to_num(matrix0)
     
-    return np.dot(p2,np.dot(p1,matrix0))
+    # first sum over n1 only for distinct values ...
+    p1m = np.tensordot(SeedingBandsToVectors(s1 - r0,p1,r1 - r0),matrix0,axes = (1,0))
+    
+    # ... then sum over n2 within the band of each inoculum
+    band2 = np.arange(np.shape(p2)[1])
+    avg   = np.zeros((len(coordinates),) + matrix0.shape[2:])
+    chunk = max(1,SeedingAverageChunkSize//max(1,len(band2) * int(np.prod(matrix0.shape[2:]))))
+    for i in range(0,len(coordinates),chunk):
+        i1,i2 = inv1[i:i+chunk],inv2[i:i+chunk]
+        avg[i:i+chunk] = np.einsum('kj,kj...->k...',p2[i2],p1m[i1[:,np.newaxis],s2[i2,np.newaxis] + band2])
+    return avg[invc.reshape(-1)]
     
 
+def SeedingIterationMap(matrix,n,dilutions,axis1 = None,axis2 = None,cutoff = 1e-100,jacobian = False,cache = None):
+    # one cycle of growth and dilution for many states at once, weighted by Poisson seeding of droplets
+    # 'matrix' has shape (len(axis1),len(axis2),2), e.g. growthmatrix[:,:,:2]
+    # 'n' are absolute inoculum sizes with shape (number of states,2), each state has its own entry in 'dilutions'
+    # returns next states, and with 'jacobian = True' also derivatives d next[k,i] / d n[k,j] with shape (number of states,2,2)
+    dim = np.shape(matrix)
+    if axis1 is None:   axis1 = np.arange(dim[0])
+    if axis2 is None:   axis2 = np.arange(dim[1])
+    
+    n         = np.array(n,dtype=np.float64).reshape((-1,2))
+    dilutions = np.broadcast_to(np.array(dilutions,dtype=np.float64),(len(n),))[:,np.newaxis]
+    SeedingTruncation.Check(axis1,n[:,0])
+    SeedingTruncation.Check(axis2,n[:,1])
+    
+    if jacobian:
+        px,dpx = GridSeedingVectors(axis1,n[:,0],cutoff = cutoff,diff = True,cache = cache)
+        py,dpy = GridSeedingVectors(axis2,n[:,1],cutoff = cutoff,diff = True,cache = cache)
+    else:
+        px = GridSeedingVectors(axis1,n[:,0],cutoff = cutoff,cache = cache)
+        py = GridSeedingVectors(axis2,n[:,1],cutoff = cutoff,cache = cache)
+    
+    # only rows with nonzero weights are read from the matrix
+    rows    = np.flatnonzero(np.any(px != 0,axis = 0) | (np.any(dpx != 0,axis = 0) if jacobian else False))
+    r0,r1   = (rows[0],rows[-1] + 1) if len(rows) > 0 else (0,0)
+    matrix0 = np.nan_to_num(np.array(matrix[r0:r1],dtype=np.float64))
+    px      = px[:,r0:r1]
+    if jacobian:
+        dpx = dpx[:,r0:r1]
+    
+    # sum over n1 for all states with a single matrix product, then over n2 for each state
+    pxm  = np.tensordot(px,matrix0,axes = (1,0))
+    growth = dilutions * np.einsum('kjq,kj->kq',pxm,py)
+    if not jacobian:
+        return growth
+    
+    j = np.empty((len(n),2,2))
+    j[:,:,0] = dilutions * np.einsum('kjq,kj->kq',np.tensordot(dpx,matrix0,axes = (1,0)),py)
+    j[:,:,1] = dilutions * np.einsum('kjq,kj->kq',pxm,dpy)
+    return growth,j
+
+
+def SeedingFixedPoints(matrix,n,dilutions,axis1 = None,axis2 = None,cutoff = 1e-100,precision = 1e-20,maxiterations = None,alpha = 1.,newtonraphson = True,verbose = False,cache = None):
+    # fixed points of 'SeedingIterationMap' for many initial states and dilutions at once
+    # with 'newtonraphson = True' iterates n -> n - alpha J^-1 (F(n) - n) with stacked Jacobians, otherwise n -> F(n)
+    # each state stops individually once sum( (dn/n)^2 ) <= precision (only over n > 0) or after 'maxiterations' steps
+    # fixed points agree with the scalar iteration to rounding, but step counts can differ by a few steps:
+    # if one strain goes extinct, its size decays to 0 and sum( (dn/n)^2 ) only drops below 'precision' once a step overshoots
+    # and the size is set to exactly 0, which depends on the last bits of the batched (vs scalar) arithmetic
+    # returns fixed points (number of states,2) and the number of steps for each state
+    # states without a finite step (e.g. singular Jacobian) stop at their last iterate with step count -1, all others continue
+    # seeding vectors are shared (via 'cache', see 'PoissonSeedingBands') by states with equal inoculum sizes,
+    # e.g. common start points for several dilutions, extinct strains, or nearly converged states with 'mantissabits'
+    n         = np.array(n,dtype=np.float64).reshape((-1,2)).copy()
+    dilutions = np.broadcast_to(np.array(dilutions,dtype=np.float64),(len(n),)).copy()
+    stepcount = np.zeros(len(n),dtype=int)
+    
+    def RelativeChange(dn,n):
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            return np.sum(np.where(n > 0,(dn/n)**2,0),axis = 1)
+    
+    # initial step is dn = n, as in the scalar iteration
+    active = RelativeChange(n,n) > precision
+    while np.any(active):
+        if verbose:
+            for k in np.flatnonzero(active):
+                sys.stderr.write("{:4d} {:13.6e} {:13.6e}\n".format(stepcount[k],n[k,0],n[k,1]))
+        
+        if newtonraphson:
+            growth,j = SeedingIterationMap(matrix,n[active],dilutions[active],axis1 = axis1,axis2 = axis2,cutoff = cutoff,jacobian = True,cache = cache)
+            j        -= np.eye(2)[np.newaxis,:,:]
+            fn        = growth - n[active]
+            try:
+                dn    = -alpha * np.linalg.solve(j,fn[:,:,np.newaxis])[:,:,0]
+            except np.linalg.LinAlgError:
+                # a single singular Jacobian fails the whole stack, solve state by state instead
+                dn    = np.full(np.shape(fn),np.nan)
+                for k in range(len(fn)):
+                    try:
+                        dn[k] = -alpha * np.linalg.solve(j[k],fn[k])
+                    except np.linalg.LinAlgError:
+                        pass
+        else:
+            dn        = SeedingIterationMap(matrix,n[active],dilutions[active],axis1 = axis1,axis2 = axis2,cutoff = cutoff,cache = cache) - n[active]
+        
+        idx    = np.flatnonzero(active)
+        failed = np.logical_not(np.all(np.isfinite(dn),axis = 1))
+        if np.any(failed):
+            if verbose:
+                for k in idx[failed]:
+                    sys.stderr.write("# no finite step from {:13.6e} {:13.6e} at dilution {:e}\n".format(n[k,0],n[k,1],dilutions[k]))
+            stepcount[idx[failed]] = -1
+            active[idx[failed]]    = False
+            idx,dn = idx[~failed],dn[~failed]
+        
+        n[idx] = np.maximum(n[idx] + dn,0)
+        
+        if not maxiterations is None:
+            exceeded = stepcount[idx] > maxiterations
+            active[idx[exceeded]] = False
+            idx,dn = idx[~exceeded],dn[~exceeded]
+        stepcount[idx] += 1
+        active[idx] = RelativeChange(dn,n[idx]) > precision
+    
+    return n,stepcount
+
+
+def SeedingStartPoints(axis1,axis2,count = 10,method = 'lattice',seed = None):
+    # start points for multi-start fixed point searches, covering [0,axis1[-1]] x [0,axis2[-1]]
+    # 'lattice' is a regular count x count lattice including both axes, 'halton' are count**2 points of a scrambled Halton sequence
+    # returns array with shape (number of points,2)
+    nmax = np.array([axis1[-1],axis2[-1]],dtype=np.float64)
+    if method == 'lattice':
+        x = np.linspace(0,1,num = count)
+        u = np.array(list(it_product(x,x)),dtype=np.float64)
+    elif method == 'halton':
+        from scipy.stats import qmc
+        u = qmc.Halton(d = 2,seed = seed).random(count**2)
+    else:
+        raise ValueError("unknown method '{}' for start points".format(method))
+    return u * nmax[np.newaxis,:]
+
+
+def ClusterFixedPoints(n,dilutions,tolerance = 1e-6,scale = 1.):
+    # group fixed points 'n' (number of states,2) at equal dilutions, that are closer than 'tolerance' (in units of 'scale')
+    # groups are connected components of the graph linking close points, such that chains of close points end up in the same group
+    # returns mean fixed point of each group, its dilution and the number of states in the group, sorted by dilution and n
+    from scipy.sparse.csgraph import connected_components
+    n         = np.array(n,dtype=np.float64).reshape((-1,2))
+    dilutions = np.broadcast_to(np.array(dilutions,dtype=np.float64),(len(n),))
+    scale     = np.broadcast_to(np.array(scale,dtype=np.float64),(2,))
+    
+    fixedpoints,fpdilutions,counts = list(),list(),list()
+    for dilution in np.unique(dilutions):
+        nd = n[dilutions == dilution]/scale[np.newaxis,:]
+        close = np.max(np.abs(nd[:,np.newaxis,:] - nd[np.newaxis,:,:]),axis = 2) <= tolerance
+        numgroups,labels = connected_components(close,directed = False)
+        size = np.bincount(labels,minlength = numgroups)
+        mean = np.column_stack([np.bincount(labels,weights = nd[:,i],minlength = numgroups) for i in range(2)]) / size[:,np.newaxis]
+        order = np.lexsort((mean[:,1],mean[:,0]))
+        fixedpoints.append(mean[order] * scale[np.newaxis,:])
+        fpdilutions.append(np.repeat(dilution,numgroups))
+        counts.append(size[order])
+    
+    if len(fixedpoints) == 0:
+        return np.zeros((0,2)),np.zeros(0),np.zeros(0,dtype=int)
+    return np.concatenate(fixedpoints),np.concatenate(fpdilutions),np.concatenate(counts)
+
+
+def SeedingContinuation(matrix,n,dilution,dilutionmax,axis1 = None,axis2 = None,cutoff = 1e-100,step = .05,minstep = 1e-6,maxstep = .5,maxpoints = 1000,tolerance = 1e-10,maxcorrections = 10,cache = None):
+    # pseudo-arclength continuation of a fixed point 'n' of 'SeedingIterationMap' at 'dilution' towards 'dilutionmax'
+    # the branch is followed in x = (n1,n2,log(dilution)) with H(x) = F(x) - n = 0:
+    # tangents are null vectors of dH/dx, predictor steps along the tangent are corrected by Newton iterations
+    # on the plane perpendicular to the tangent, the arclength step is adapted to the number of corrections
+    # continuation stops beyond 'dilutionmax', when the branch leaves the grid, or after 'maxpoints' points:
+    # all iterates (also of the corrector) have n >= 0 and lose at most the tolerance of 'SeedingTruncation' (default 1e-8)
+    # of their Poisson seeding beyond the end of the grid, otherwise the arclength step is halved
+    # returns array with rows (dilution, n1, n2, re(l1), im(l1), re(l2), im(l2), type), eigenvalues l of the map sorted by modulus,
+    # 'type = 0' for points on the branch, located bifurcations (where |l| crosses 1) are inserted with
+    # 'type = 1' for l = 1, 'type = 2' for l = -1 and 'type = 3' for complex pairs (Neimark-Sacker)
+    dim = np.shape(matrix)
+    if axis1 is None:   axis1 = np.arange(dim[0])
+    if axis2 is None:   axis2 = np.arange(dim[1])
+    nmax      = np.array([axis1[-1],axis2[-1]],dtype=np.float64)
+    direction = np.sign(np.log(dilutionmax) - np.log(dilution))
+    
+    # inoculum sizes are measured in units of the grid size, such that arclength steps are balanced with steps in log(dilution)
+    scale = np.append(nmax,1.)
+    truncation = 1e-8 if SeedingTruncation.tolerance is None else SeedingTruncation.tolerance
+    
+    def Supported(x):
+        # the growthmatrix only determines the map where Poisson seeding stays on the grid
+        if not np.all(np.isfinite(x)) or np.any(x[:2] < -tolerance * (1 + np.linalg.norm(x))):
+            return False
+        return SeedingTruncationError(axis1,x[0] * scale[0])[0] <= truncation and SeedingTruncationError(axis2,x[1] * scale[1])[0] <= truncation
+    
+    def Evaluate(x):
+        growth,j = SeedingIterationMap(matrix,x[:2] * scale[:2],np.exp(x[2]),axis1 = axis1,axis2 = axis2,cutoff = cutoff,jacobian = True,cache = cache)
+        h  = growth[0]/scale[:2] - x[:2]
+        dh = np.column_stack([j[0] * scale[np.newaxis,:2]/scale[:2,np.newaxis] - np.eye(2),growth[0]/scale[:2]])
+        return h,dh,j[0]
+    
+    def Tangent(dh,previous):
+        t  = np.cross(dh[0],dh[1])
+        t /= np.linalg.norm(t)
+        if previous is None:
+            return t if t[2] * direction >= 0 else -t
+        return t if np.dot(t,previous) >= 0 else -t
+    
+    def Correct(xp,t):
+        x = xp.copy()
+        for k in range(maxcorrections):
+            if not Supported(x):
+                return None,k
+            h,dh,j = Evaluate(x)
+            try:
+                dx = np.linalg.solve(np.vstack([dh,t]),-np.append(h,np.dot(t,x - xp)))
+            except np.linalg.LinAlgError:
+                return None,k
+            x += dx
+            if np.linalg.norm(dx) < tolerance * (1 + np.linalg.norm(x)):
+                return (x,k+1) if Supported(x) else (None,k+1)
+        return None,maxcorrections
+    
+    def Boundary(x):
+        # inoculum sizes that only vanish up to rounding stay on the boundary n = 0
+        if x is not None:
+            x[:2][np.abs(x[:2]) < tolerance * (1 + np.linalg.norm(x))] = 0
+        return x
+    
+    def Eigenvalues(j):
+        w = np.linalg.eigvals(j)
+        return w[np.argsort(-np.abs(w))]
+    
+    def TestFunctions(j):
+        # each vanishes at one type of bifurcation: det(J - 1) at l = 1, det(J + 1) at l = -1,
+        # and det(J) - 1 = |l|^2 - 1 when a complex pair crosses the unit circle,
+        # determinants do not depend on the order of eigenvalues, which therefore need not be matched between points
+        return np.array([np.linalg.det(j - np.eye(2)),np.linalg.det(j + np.eye(2)),np.linalg.det(j) - 1])
+    
+    def BranchPoint(x,w,pointtype):
+        return [np.exp(x[2]),x[0] * scale[0],x[1] * scale[1],w[0].real,w[0].imag,w[1].real,w[1].imag,pointtype]
+    
+    x       = np.array([n[0],n[1],np.log(dilution)],dtype=np.float64)/scale
+    h,dh,j  = Evaluate(x)
+    t       = Tangent(dh,None)
+    w       = Eigenvalues(j)
+    tf      = TestFunctions(j)
+    branch  = [BranchPoint(x,w,0)]
+    
+    ds = step
+    while len(branch) < maxpoints and ds >= minstep:
+        xnew,corrections = Correct(x + ds * t,t)
+        if xnew is None:
+            ds /= 2.
+            continue
+        xnew = Boundary(xnew)
+        # shorten steps that leave the grid, such that the branch ends close to its boundary
+        if np.any(xnew[:2] < 0) or np.any(xnew[:2] > 1):
+            ds /= 2.
+            continue
+        h,dh,j = Evaluate(xnew)
+        wnew   = Eigenvalues(j)
+        tfnew  = TestFunctions(j)
+        
+        bifurcations = list()
+        for k in np.flatnonzero(tf * tfnew < 0):
+            # locate bifurcation by bisection in arclength between the last two points
+            lo,hi = 0.,ds
+            xb,wb = xnew,wnew
+            while hi - lo > tolerance * ds:
+                mid     = .5 * (lo + hi)
+                xm      = Boundary(Correct(x + mid * t,t)[0])
+                if xm is None:
+                    break
+                jm      = Evaluate(xm)[2]
+                if tf[k] * TestFunctions(jm)[k] < 0:
+                    hi,xb,wb = mid,xm,Eigenvalues(jm)
+                else:
+                    lo = mid
+            # det(J) = 1 with real eigenvalues l1 * l2 = 1 (neutral saddle) is not a bifurcation
+            if k == 2 and np.all(wb.imag == 0):
+                continue
+            bifurcations.append((hi,BranchPoint(xb,wb,k + 1)))
+        branch += [point for position,point in sorted(bifurcations,key = lambda b:b[0])]
+        
+        branch.append(BranchPoint(xnew,wnew,0))
+        t = Tangent(dh,t)
+        x,w,tf = xnew,wnew,tfnew
+        
+        if (x[2] - np.log(dilutionmax)) * direction >= 0:
+            break
+        
+        if corrections <= 3:
+            ds = min(1.5 * ds,maxstep)
+        elif corrections > maxcorrections//2:
+            ds = .5 * ds
+    
+    return np.array(branch)
+
+
 def AssignGrowthDynamics(**kwargs):
     # pick GrowthDynamics class from below via argument string
     # convert all values of the dict-entry 'ParameterList' into entries of kwargs itself
+    # with 'GrowthMatrixCache' (a 'GrowthMatrixCache') and 'GrowthMatrixSize' (and optionally 'GrowthMatrixStep'),
+    # the growthmatrix for this grid is looked up in the cache, and is attached to the returned dynamics object on a hit
 
     def AddEntry(d,key,val):
         tmp = dict()
@@ -253,23 +911,305 @@ def AssignGrowthDynamics(**kwargs):
     if 'ParameterList' in params.keys():
         del params['ParameterList']
     
+    # cache options are not parameters of the dynamics
+    cache = params.pop('GrowthMatrixCache',None)
+    size  = params.pop('GrowthMatrixSize',None)
+    step  = params.pop('GrowthMatrixStep',1)
+    
     for name,dyn in ins_getmembers(sys.modules['growthclasses'],ins_isclass):
         if name == 'GrowthDynamics' + GrowthDynamics.strip():
-            return dyn(**params)
+            g = dyn(**params)
+            if not size is None:
+                g.GrowthMatrixFromCache(cache,*g.GrowthMatrixGrid(size,step))
+            return g
     
     # did not find GrowthDynamics
     raise NotImplementedError("'GrowthDynamics{}' not yet implemented.".format(GrowthDynamics.strip()))
 
 
 
-def LoadGM(**kwargs):
-    infile  = kwargs.get("infile",None)
-    verbose = kwargs.get("verbose",False)
+# binary growthmatrix format, all numbers are little-endian:
+#   bytes 0 ... 7       magic string b'GRMATRIX'
+#   bytes 8 ... 15      length L of the header as uint64
+#   bytes 16 ... 16+L   header as UTF-8 encoded JSON, with entries
+#                         'version':   format version (currently 1)
+#                         'dynamics':  name of the GrowthDynamics class
+#                         'kwargs':    keyword arguments used to construct the dynamics object
+#                         'arrays':    'gridX', 'gridY' and 'growthmatrix', each as {'offset','dtype','shape'}
+#                         'restricted': true if values below 1 were already set to 0 when writing (see 'RestrictFractionalPopulation'),
+#                                      otherwise this is done for the whole growthmatrix when it is first accessed
+#   array data          raw values in C order, each array starts at the given offset (from the beginning of the file, multiple of 64)
+# arrays are opened with np.memmap, such that only the parts of the growthmatrix that are accessed are read from disk
+# (which needs 'restricted', files without it are read completely on first access)
+GrowthMatrixMagic     = b'GRMATRIX'
+GrowthMatrixVersion   = 1
+GrowthMatrixAlignment = 64
+
+
+def IsBinaryGM(infile):
+    try:
+        with open(infile,'rb') as fp:
+            return fp.read(len(GrowthMatrixMagic)) == GrowthMatrixMagic
+    except:
+        return False
+
+
+def JSONValue(value):
+    # convert numpy types and tuples in kwargs into plain JSON values
+    if isinstance(value,np.ndarray):            return [JSONValue(v) for v in value.tolist()]
+    elif isinstance(value,(list,tuple)):        return [JSONValue(v) for v in value]
+    elif isinstance(value,dict):                return {(k.decode('utf-8') if isinstance(k,bytes) else str(k)):JSONValue(v) for k,v in value.items()}
+    elif isinstance(value,bytes):               return value.decode('utf-8')
+    elif isinstance(value,np.bool_):            return bool(value)
+    elif isinstance(value,np.integer):          return int(value)
+    elif isinstance(value,np.floating):         return float(value)
+    elif value is None or isinstance(value,(bool,int,float,str)):
+        return value
+    else:
+        raise ValueError("cannot store value '{}' of type {} in header of binary growthmatrix".format(value,type(value).__name__))
+
+
+def LoadBinaryGM(infile,mmapmode = 'c',readonly = False):
+    # open binary growthmatrix file, arrays are memory-mapped with 'mmapmode' (default copy-on-write: changes are never written back)
+    # 'readonly = True' returns a 'GrowthMatrixView' instead of the dynamics object
+    try:
+        with open(infile,'rb') as fp:
+            magic  = fp.read(len(GrowthMatrixMagic))
+            length = int(np.frombuffer(fp.read(8),dtype='<u8')[0])
+            header = json.loads(fp.read(length).decode('utf-8'))
+    except:
+        raise IOError("could not read header of binary growthmatrix file '{}'".format(infile))
+    if magic != GrowthMatrixMagic:
+        raise IOError("'{}' is not a binary growthmatrix file".format(infile))
+    if header.get('version',None) != GrowthMatrixVersion:
+        raise ValueError("binary growthmatrix file '{}' has unsupported format version {}".format(infile,header.get('version',None)))
+    
+    arrays = dict()
+    for key,entry in header['arrays'].items():
+        if np.prod(entry['shape']) == 0:
+            arrays[key] = np.zeros(entry['shape'],dtype = entry['dtype'])
+        else:
+            arrays[key] = np.memmap(infile,dtype = entry['dtype'],mode = mmapmode,offset = entry['offset'],shape = tuple(entry['shape']))
+    
+    state = [header['kwargs'],arrays['growthmatrix'],(arrays['gridX'],arrays['gridY']),header.get('restricted',False)]
+    if readonly:
+        return GrowthMatrixView(header['dynamics'],state)
     
+    # construct dynamics object the same way as unpickling does
+    dynamics = getattr(sys.modules[__name__],header['dynamics'])
+    g = dynamics.__new__(dynamics)
+    g.__setstate__(state)
+    return g
+
+
+def TemporaryFilename(outfile):
+    # unique name next to 'outfile', such that concurrent writers of the same file (e.g. the same cache entry)
+    # never write into or rename each others partial files
+    return '{}.{}.tmp'.format(outfile,uuid.uuid4().hex)
+
+
+def SaveBinaryGM(g,outfile):
+    # write growthmatrix of 'g' in binary format, via a temporary file as in 'SaveGM'
+    state   = g.__getstate__()
+    arrays  = OrderedDict([('gridX',state[2][0]),('gridY',state[2][1]),('growthmatrix',state[1])])
+    arrays  = OrderedDict([(key,np.ascontiguousarray(a,dtype = np.asarray(a).dtype.newbyteorder('<'))) for key,a in arrays.items()])
+    header  = {'version':GrowthMatrixVersion, 'dynamics':g.dynamics if isinstance(g,GrowthMatrixView) else type(g).__name__, 'kwargs':JSONValue(state[0]), 'arrays':dict(), 'restricted':True}
+    # values below 1 are set to 0 once here, instead of in the whole memory-mapped growthmatrix every time it is loaded
+    if header['kwargs'].get('RestrictFractionalPopulation',True):
+        arrays['growthmatrix'] = np.where(arrays['growthmatrix'] < 1,0,arrays['growthmatrix']).astype(arrays['growthmatrix'].dtype)
+    
+    # offsets depend on the length of the header, which itself contains the offsets: reserve enough space for the header first
+    def Offsets(headerlength):
+        offset = GrowthMatrixAlignment * int(np.ceil((len(GrowthMatrixMagic) + 8 + headerlength)/GrowthMatrixAlignment))
+        for key,a in arrays.items():
+            header['arrays'][key] = {'offset':offset, 'dtype':a.dtype.str, 'shape':list(a.shape)}
+            offset += GrowthMatrixAlignment * int(np.ceil(a.nbytes/GrowthMatrixAlignment))
+        return json.dumps(header).encode('utf-8')
+    headerlength = len(Offsets(0))
+    while True:
+        encoded = Offsets(headerlength)
+        if len(encoded) <= headerlength:    break
+        headerlength = len(encoded)
+    encoded += b' ' * (headerlength - len(encoded))
+    
+    tmpfile = TemporaryFilename(outfile)
     try:
-        g = pickle.load(open(infile,'rb'), encoding = 'bytes')
+        with open(tmpfile,'wb') as fp:
+            fp.write(GrowthMatrixMagic)
+            fp.write(np.array([len(encoded)],dtype='<u8').tobytes())
+            fp.write(encoded)
+            for key,a in arrays.items():
+                fp.seek(header['arrays'][key]['offset'])
+                fp.write(a.tobytes())
+        os.replace(tmpfile,outfile)
     except:
-        raise IOError("could not load growthmatrix from pickle file '{}'".format(infile))
+        if os.path.exists(tmpfile):
+            os.remove(tmpfile)
+        raise IOError("could not write binary growthmatrix file '{}'".format(outfile))
+
+
+def WriteColumns(filename,columns,offsets = None,format = 'npz',chunksize = 2**16):
+    # write named columns (dict of equal-length arrays) as one structured array, rows are copied in chunks of 'chunksize'
+    # 'offsets' marks segments (e.g. trajectories, which are separated by blank lines in text output):
+    # rows offsets[i] ... offsets[i+1]-1 belong to segment i
+    # 'npy': structured array in FILENAME.npy, offsets in FILENAME_offsets.npy
+    # 'npz': arrays 'data' and 'offsets' in FILENAME.npz
+    names  = list(columns.keys())
+    arrays = [np.asarray(columns[name]).reshape(-1) for name in names]
+    length = len(arrays[0]) if len(arrays) > 0 else 0
+    dtype  = np.dtype([(name,a.dtype.newbyteorder('<')) for name,a in zip(names,arrays)])
+    
+    def WriteChunks(fp):
+        buf = np.empty(min(chunksize,max(length,1)),dtype = dtype)
+        for i in range(0,length,chunksize):
+            k = min(chunksize,length - i)
+            for name,a in zip(names,arrays):
+                buf[name][:k] = a[i:i+k]
+            fp.write(buf[:k].tobytes())
+    
+    header = {'descr':np.lib.format.dtype_to_descr(dtype),'fortran_order':False,'shape':(length,)}
+    if format == 'npy':
+        with open(filename + '.npy','wb') as fp:
+            np.lib.format.write_array_header_1_0(fp,header)
+            WriteChunks(fp)
+        if not offsets is None:
+            np.save(filename + '_offsets.npy',np.asarray(offsets,dtype='<i8'))
+    elif format == 'npz':
+        with zipfile.ZipFile(filename + '.npz','w',compression = zipfile.ZIP_STORED,allowZip64 = True) as zf:
+            with zf.open('data.npy','w',force_zip64 = True) as fp:
+                np.lib.format.write_array_header_1_0(fp,header)
+                WriteChunks(fp)
+            if not offsets is None:
+                with zf.open('offsets.npy','w') as fp:
+                    np.lib.format.write_array(fp,np.asarray(offsets,dtype='<i8'))
+    else:
+        raise ValueError("unknown output format '{}'".format(format))
+
+
+def SegmentOffsets(lengths):
+    # offsets for 'WriteColumns' from the number of rows in each segment
+    return np.concatenate([[0],np.cumsum(lengths)]).astype(np.int64)
+
+
+# parameters that do not change the growthmatrix (I/O, parallelization, grid), excluded from 'GrowthMatrixKey'
+GrowthMatrixKeyIgnoredParameters = ['infile','outfile','verbose','binary','maxsize','step','workers','checkpointdir','tilesize','resume','nocheckpoint',
+                                    'GrowthDynamics','ParameterList','cachedir','cachemaxsize','nocache']
+
+
+def CanonicalParameters(kwargs):
+    # kwargs as plain JSON values, all numbers as floats, such that e.g. 24 and 24.0 give identical keys
+    def Canonical(value):
+        if isinstance(value,list):                                      return [Canonical(v) for v in value]
+        elif isinstance(value,dict):                                    return {k:Canonical(v) for k,v in value.items()}
+        elif isinstance(value,(int,float)) and not isinstance(value,bool):  return float(value)
+        return value
+    return {k:Canonical(v) for k,v in JSONValue(kwargs).items() if not k in GrowthMatrixKeyIgnoredParameters}
+
+
+def GrowthMatrixKey(dynamics,kwargs,gridX,gridY):
+    # content hash of everything that determines a growthmatrix:
+    # name of the GrowthDynamics class, canonical parameters and the values of both grids
+    h = hashlib.sha256()
+    h.update(json.dumps({'dynamics':dynamics,'parameters':CanonicalParameters(kwargs)},sort_keys = True,separators = (',',':')).encode('utf-8'))
+    for grid in [gridX,gridY]:
+        h.update(np.ascontiguousarray(grid,dtype='<f8').tobytes())
+        h.update(b'|')
+    return h.hexdigest()
+
+
+class GrowthMatrixCache(object):
+    # content-addressed cache of growthmatrices, stored in binary format as '<key>.gm' in 'directory', keys from 'GrowthMatrixKey'
+    # hits update the modification time of the file, if all files exceed 'maxsize' bytes the least recently used are removed
+    # default directory is $GROWTHMATRIXCACHE or ~/.cache/growthmatrices
+    def __init__(self,directory = None,maxsize = 4 * 2**30):
+        if directory is None:
+            directory = os.environ.get('GROWTHMATRIXCACHE',os.path.join(os.path.expanduser('~'),'.cache','growthmatrices'))
+        self.directory = directory
+        self.maxsize   = int(maxsize)
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+    
+    def Filename(self,key):
+        return os.path.join(self.directory,key + '.gm')
+    
+    def Get(self,key):
+        # returns 'GrowthMatrixView' of the stored growthmatrix or None
+        filename = self.Filename(key)
+        if not os.path.exists(filename):
+            return None
+        os.utime(filename)
+        return LoadBinaryGM(filename,readonly = True)
+    
+    def Put(self,key,g):
+        SaveBinaryGM(g,self.Filename(key))
+        self.Evict(keep = key)
+    
+    def Files(self):
+        # all cached files as (modification time, size, filename), oldest first
+        files = list()
+        for name in os.listdir(self.directory):
+            if name.endswith('.gm'):
+                try:
+                    stat = os.stat(os.path.join(self.directory,name))
+                    files.append((stat.st_mtime,stat.st_size,os.path.join(self.directory,name)))
+                except OSError:
+                    continue
+        return sorted(files)
+    
+    def Evict(self,keep = None):
+        files = self.Files()
+        total = sum([f[1] for f in files])
+        for mtime,size,filename in files:
+            if total <= self.maxsize:
+                break
+            if not keep is None and filename == self.Filename(keep):
+                continue
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+            total -= size
+    
+    def __str__(self):
+        files = self.Files()
+        return "# growthmatrix cache '{}': {} files, {} of {} bytes\n".format(self.directory,len(files),sum([f[1] for f in files]),self.maxsize)
+
+
+class StoredGrowthDynamics(object):
+    # placeholder for GrowthDynamics objects in pickle files, keeps the pickled state without constructing the dynamics
+    dynamics = 'GrowthDynamics'
+    def __setstate__(self,state):
+        self.state = state
+
+
+class GrowthMatrixUnpickler(pickle.Unpickler):
+    # unpickle GrowthDynamics objects (of any subclass) as 'StoredGrowthDynamics'
+    def find_class(self,module,name):
+        cls = getattr(sys.modules[__name__],name,None)
+        if ins_isclass(cls) and issubclass(cls,GrowthDynamics):
+            return type(name,(StoredGrowthDynamics,),{'dynamics':name})
+        return super(GrowthMatrixUnpickler,self).find_class(module,name)
+
+
+def LoadGM(**kwargs):
+    # load growthmatrix either from binary format (see above) or from legacy pickle files
+    # with 'readonly', a 'GrowthMatrixView' is returned, which skips the construction of the dynamics object
+    infile   = kwargs.get("infile",None)
+    verbose  = kwargs.get("verbose",False)
+    readonly = kwargs.get("readonly",False)
+    
+    if IsBinaryGM(infile):
+        g = LoadBinaryGM(infile,readonly = readonly)
+    else:
+        try:
+            with open(infile,'rb') as fp:
+                if readonly:
+                    stored = GrowthMatrixUnpickler(fp,encoding = 'bytes').load()
+                    g = GrowthMatrixView(stored.dynamics,stored.state)
+                else:
+                    g = pickle.load(fp, encoding = 'bytes')
+        except:
+            raise IOError("could not load growthmatrix from pickle file '{}'".format(infile))
     
     if not g.hasGrowthMatrix:
         raise ValueError("loaded pickle instance does not contain growthmatrix")
@@ -282,6 +1222,90 @@ def LoadGM(**kwargs):
     return g
 
 
+def SaveGM(g,outfile,binary = False):
+    # write to temporary file first, such that an interrupted dump never destroys an existing growthmatrix file
+    if binary:
+        SaveBinaryGM(g,outfile)
+        return
+    tmpfile = TemporaryFilename(outfile)
+    try:
+        with open(tmpfile,'wb') as fp:
+            pickle.dump(g,fp)
+        os.replace(tmpfile,outfile)
+    except:
+        if os.path.exists(tmpfile):
+            os.remove(tmpfile)
+        raise IOError("could not write growthmatrix to pickle file '{}'".format(outfile))
+
+
+def ExtendGMForSeeding(g,n,**kwargs):
+    # with 'extendgrowthmatrix', extend the grid of 'g' such that Poisson seeding for all inocula 'n' (shape (number of inocula,2))
+    # loses at most mass 'truncationtolerance' beyond the grid, new rows are computed by the dynamics of 'g' and stored in 'infile'
+    # returns True if the growthmatrix was extended
+    if not kwargs.get("extendgrowthmatrix",False):
+        return False
+    n = np.array(n,dtype=np.float64).reshape((-1,2))
+    if len(n) == 0:
+        return False
+    tolerance = kwargs.get("truncationtolerance",1e-8)
+    
+    grid     = list(g.growthmatrixgrid)
+    extended = False
+    for i in range(2):
+        required = SeedingRequiredGridSize(np.max(n[:,i]),tolerance)[0]
+        if required > grid[i][-1]:
+            # continue with the spacing at the end of the grid
+            step    = grid[i][-1] - grid[i][-2] if len(grid[i]) > 1 else 1
+            grid[i] = np.concatenate([grid[i],grid[i][-1] + step * np.arange(1,np.ceil((required - grid[i][-1])/step) + 1)])
+            extended = True
+    if not extended:
+        return False
+    
+    if kwargs.get("verbose",False):
+        sys.stderr.write("# extending growthmatrix to grid end ({:.3f}, {:.3f})\n".format(grid[0][-1],grid[1][-1]))
+    g.ExtendGrowthMatrix(size = (grid[0],grid[1]),workers = kwargs.get("extendworkers",1))
+    infile = kwargs.get("infile",None)
+    if not infile is None:
+        SaveGM(g,infile,binary = IsBinaryGM(infile))
+    return True
+
+
+# worker processes for parallel computation of growthmatrix,
+# each worker rebuilds the dynamics object from the kwargs stored in the pickle file
+_workerdynamics = None
+
+# largest number of inocula integrated together in one batch by 'GrowthMatrixCells',
+# memory of batched integrators grows with this number times the number of ODE components
+GrowthArrayChunkSize = 2**14
+
+def GrowthArrayWorkerInit(dynamicsname,kwargs):
+    global _workerdynamics
+    _workerdynamics = getattr(sys.modules[__name__],dynamicsname)(**kwargs)
+
+def GrowthArrayWorker(initialcells):
+    return _workerdynamics.GrowthArray(initialcells)
+
+
+def GrowthMatrixTileWorker(tile):
+    key,gridX,gridY = tile
+    return key,_workerdynamics.GrowthMatrixCells(gridX,gridY)
+
+def GrowthDynamicsPool(dynamicsname,kwargs,workers):
+    return multiprocessing.Pool(processes = workers, initializer = GrowthArrayWorkerInit, initargs = (dynamicsname,kwargs))
+
+
+def ParallelGrowthArray(dynamicsname,kwargs,initialcells,workers,chunks = None):
+    # distribute chunks of inocula to a pool of processes
+    # Pool.map returns results in the same order as the chunks, such that output is identical to a serial run
+    if chunks is None:
+        chunks = np.array_split(initialcells,min(len(initialcells),4*workers))
+    pool = GrowthDynamicsPool(dynamicsname,kwargs,workers)
+    try:
+        g = pool.map(GrowthArrayWorker,chunks,chunksize = 1)
+    finally:
+        pool.close()
+        pool.join()
+    return np.concatenate(g,axis = 0)
 
 
 
@@ -294,6 +1318,268 @@ def LoadGM(**kwargs):
 
 
 
+class GrowthMatrixView(object):
+    '''
+    Read-only access to a stored growthmatrix, its grid and the parameters of the dynamics
+    
+    state is the same as pickled by GrowthDynamics (kwargs, growthmatrix, grid),
+    but the dynamics object (and its integrator) is only constructed when it is needed,
+    i.e. to compute new entries in 'ExtendGrowthMatrix'
+    
+    pickles as the GrowthDynamics object it was loaded from
+    '''
+    def __init__(self,dynamics,state):
+        self.dynamics = dynamics
+        self.kwargs   = dict()
+        for k,v in state[0].items():
+            if isinstance(k,str):   self.kwargs[k] = v
+            else:                   self.kwargs[k.decode('utf-8')] = v
+        self.__growthmatrix = state[1]
+        if isinstance(state[2],int):
+            # backward compatibility
+            self.__growthmatrixgrid = (np.arange(state[2]),np.arange(state[2]))
+        else:
+            self.__growthmatrixgrid = tuple(state[2])
+        # values below 1 were already set to 0 (binary files), see 'LoadBinaryGM'
+        self.restricted = len(state) > 3 and bool(state[3])
+        
+        # same defaults as in GrowthDynamics
+        self.__restrictFractionalPopulation = self.kwargs.get("RestrictFractionalPopulation",True) and not self.restricted
+        self.growthrates  = np.array(self.kwargs.get("growthrates",[1.]),dtype=np.float64)
+        self.yieldfactors = np.array(self.kwargs.get("yieldfactors",[1.]),dtype=np.float64)
+        self.mixingtime   = float(self.kwargs.get("mixingtime",24))
+        self.substrate    = float(self.kwargs.get("substrateconcentration",1e4))
+        self.setDilution(self.kwargs.get("dilution",1.))
+    
+    def Dynamics(self):
+        # construct full dynamics object with the current growthmatrix
+        dynamics = getattr(sys.modules[__name__],self.dynamics)
+        g = dynamics.__new__(dynamics)
+        g.__setstate__(self.__getstate__() + [self.restricted or not self.__restrictFractionalPopulation])
+        return g
+    
+    def ExtendGrowthMatrix(self,size,step = 1,workers = 1,cache = None):
+        g = self.Dynamics()
+        g.ExtendGrowthMatrix(size,step = step,workers = workers,cache = cache)
+        self.__growthmatrix     = g.growthmatrix
+        self.__growthmatrixgrid = g.growthmatrixgrid
+    
+    def hasGrowthMatrix(self):
+        return not (self.__growthmatrix is None)
+    
+    def setDilution(self,dilution):
+        self.dilution = min(max(float(dilution),0.),1.)
+    
+    def getSingleStrainFixedPoints(self):
+        t = 1./self.growthrates * np.log(1./self.dilution)
+        n = np.where(t <= self.mixingtime,self.yieldfactors,0.)
+        if self.dilution < 1.:
+            return self.dilution / (1. - self.dilution) * self.substrate * n
+        else:
+            return None
+    
+    def getSingleStrainFixedPointsApproximate(self):
+        # approximate Poisson seeding with single strains.
+        param = self.getSingleStrainFixedPoints()
+        n = param - np.exp(-param+1)
+        n[param<1] = 0
+        return n
+    
+    def ParameterString(self):
+        r  = '\n'
+        s  = "*** microbial strains ***" +r
+        s += "  growthrates " + "[" + ", ".join(["{:.4f}".format(a) for a in self.growthrates]) + "]" +r
+        s += "  yield       " + "[" + ", ".join(["{:.4f}".format(a) for a in self.yieldfactors]) + "]" +r+r
+        s += "*** environment ***" +r
+        s += "  mixingtime  " + str(self.mixingtime) +r
+        s += "  substrate   " + str(self.substrate) +r
+        if self.dilution < 1:
+            s += "  dilution    " + str(self.dilution) +r
+        return s
+    
+    def __str__(self):
+        return self.ParameterString()
+    
+    def __getattr__(self,key):
+        if key == "growthmatrix":
+            if self.__growthmatrix is None:
+                raise ValueError("Growthmatrix not yet computed")
+            if self.__restrictFractionalPopulation:
+                # as in GrowthDynamics, but only applied once
+                self.__growthmatrix[self.__growthmatrix < 1] = 0
+                self.__restrictFractionalPopulation = False
+            return self.__growthmatrix
+        elif key == "growthmatrixgrid":
+            return self.__growthmatrixgrid
+        elif key == "numstrains":
+            return len(self.growthrates)
+        raise AttributeError(key)
+    
+    def __getstate__(self):
+        return [self.kwargs,self.__growthmatrix,self.__growthmatrixgrid]
+    
+    def __reduce__(self):
+        # unpickles as the GrowthDynamics object: instance created without '__init__', then restored by its '__setstate__'
+        return (object.__new__,(getattr(sys.modules[__name__],self.dynamics),),self.__getstate__())
+
+
+class StrainTable(object):
+    '''
+    Stores characteristics of all microbial strains of a GrowthDynamics object
+    as arrays (one entry per strain), instead of a list of separate objects
+    
+    vectors used in the dynamics (growthrates, yieldfactors, deathrates) are cached
+    and only recomputed after parameters were set or growth was stopped/allowed,
+    growthrates of stopped strains are 0, growing strains are stored as a boolean mask
+    
+    behaves like the former list of MicrobialStrain objects:
+    indexing returns a MicrobialStrain that refers to the corresponding entry of the table,
+    other attributes set on strains are kept in one dict per strain
+    '''
+    __slots__ = ['__growthrate','__yieldfactor','__deathrate','__growing','__attributes','__cache']
+    
+    def __init__(self):
+        self.__growthrate  = np.zeros(0)
+        self.__yieldfactor = np.zeros(0)
+        self.__deathrate   = np.zeros(0)
+        self.__growing     = np.zeros(0,dtype = bool)
+        self.__attributes  = list()
+        self.__cache       = dict()
+    
+    def checkfloat(self,value,lowerbound = None,upperbound = None):
+        try:
+            checkedvalue = float(value)
+        except:
+            raise ValueError
+        if not lowerbound is None:
+            if checkedvalue < lowerbound:
+                checkedvalue = lowerbound
+        if not upperbound is None:
+            if checkedvalue > upperbound:
+                checkedvalue = upperbound
+        return checkedvalue
+    
+    def Cached(self,key,value):
+        # cached vectors are read-only, such that they cannot be changed by accident outside of this table
+        value.flags.writeable = False
+        self.__cache[key] = value
+        return value
+    
+    def AddStrain(self,growthrate = 1.,yieldfactor = 1.,deathrate = 0.,growing = True,attributes = None):
+        self.__growthrate  = np.append(self.__growthrate, float(growthrate))
+        self.__yieldfactor = np.append(self.__yieldfactor,float(yieldfactor))
+        self.__deathrate   = np.append(self.__deathrate,  float(deathrate))
+        self.__growing     = np.append(self.__growing,    bool(growing))
+        self.__attributes.append(dict() if attributes is None else dict(attributes))
+        self.__cache       = dict()
+    
+    def append(self,strain):
+        # copy values of a MicrobialStrain into the table
+        self.AddStrain(growthrate = strain.growthrate_raw, yieldfactor = strain.yieldfactor, deathrate = strain.deathrate, growing = strain.growing, attributes = strain.__dict__)
+    
+    def pop(self):
+        # remove last strain and return it as separate object
+        if len(self) == 0:
+            raise IndexError("pop from empty StrainTable")
+        strain = MicrobialStrain(growthrate = self.__growthrate[-1], yieldfactor = self.__yieldfactor[-1], deathrate = self.__deathrate[-1])
+        if not self.__growing[-1]:
+            strain.StopGrowth()
+        strain.__dict__.update(self.__attributes.pop())
+        self.__growthrate  = self.__growthrate[:-1]
+        self.__yieldfactor = self.__yieldfactor[:-1]
+        self.__deathrate   = self.__deathrate[:-1]
+        self.__growing     = self.__growing[:-1]
+        self.__cache       = dict()
+        return strain
+    
+    def StopGrowth(self,index = None):
+        if index is None:
+            self.__growing[:] = False
+        else:
+            self.__growing[index] = False
+        self.__cache.pop('growthrates',None)
+
+    def AllowGrowth(self,index = None):
+        if index is None:
+            self.__growing[:] = True
+        else:
+            self.__growing[index] = True
+        self.__cache.pop('growthrates',None)
+    
+    def Get(self,key,index):
+        if key == "growthrate":
+            if self.__growing[index]:
+                return self.__growthrate[index]
+            else:
+                return 0.
+        elif key == "growthrate_raw":
+            return self.__growthrate[index]
+        elif key == "yieldfactor":
+            return self.__yieldfactor[index]
+        elif key == "deathrate":
+            return self.__deathrate[index]
+        elif key == "growing":
+            return bool(self.__growing[index])
+    
+    def Set(self,key,index,value):
+        # values are bounded below by 0, same as for a single strain
+        if key == "growthrate":
+            self.__growthrate[index]  = self.checkfloat(value,lowerbound = 0.)
+        elif key == "yieldfactor":
+            self.__yieldfactor[index] = self.checkfloat(value,lowerbound = 0.)
+        elif key == "deathrate":
+            self.__deathrate[index]   = self.checkfloat(value,lowerbound = 0.)
+        else:
+            raise KeyError(key)
+        self.__cache = dict()
+    
+    def Attributes(self,index):
+        # dict of other attributes of strain 'index', shared by all MicrobialStrain objects referring to it
+        return self.__attributes[index]
+    
+    def SetAll(self,key,values):
+        for i,value in enumerate(values):
+            self.Set(key,i,value)
+    
+    def __len__(self):
+        return len(self.__growthrate)
+    
+    def __getitem__(self,index):
+        if isinstance(index,slice):
+            return [MicrobialStrain(table = self,index = i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("strain index out of range")
+        return MicrobialStrain(table = self,index = index)
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield MicrobialStrain(table = self,index = i)
+    
+    @property
+    def growthrates(self):
+        if 'growthrates' in self.__cache:
+            return self.__cache['growthrates']
+        return self.Cached('growthrates',np.where(self.__growing,self.__growthrate,0.))
+    
+    @property
+    def yieldfactors(self):
+        if 'yieldfactors' in self.__cache:
+            return self.__cache['yieldfactors']
+        return self.Cached('yieldfactors',self.__yieldfactor.copy())
+    
+    @property
+    def deathrates(self):
+        if 'deathrates' in self.__cache:
+            return self.__cache['deathrates']
+        return self.Cached('deathrates',self.__deathrate.copy())
+    
+    @property
+    def growing(self):
+        return self.__growing.copy()
+
+
 class MicrobialStrain(object):
     '''
     Stores all characteristics of a microbial strain
@@ -306,51 +1592,34 @@ class MicrobialStrain(object):
         * growth rate
         * yield factor
         * death rate        # actually, never used in any of the within-deme dynamics
-        
+    
+    values are stored in a StrainTable, either in a table of its own or
+    as entry 'index' of the table of all strains in a GrowthDynamics object
     '''
-    def __init__(self,growthrate = 1.,yieldfactor = 1.,deathrate = 0.):
-        self.__growthrate  = growthrate
-        self.__yieldfactor = yieldfactor
-        self.__deathrate   = deathrate
-        
-        self.__growing   = True
+    __slots__ = ['__table','__index','__dict__']
+    
+    def __init__(self,growthrate = 1.,yieldfactor = 1.,deathrate = 0.,table = None,index = None):
+        if table is None:
+            table,index = StrainTable(),0
+            table.AddStrain(growthrate = growthrate, yieldfactor = yieldfactor, deathrate = deathrate)
+        object.__setattr__(self,'_MicrobialStrain__table',table)
+        object.__setattr__(self,'_MicrobialStrain__index',index)
+        # other attributes are stored in the table as well, such that they persist for 'g.strains[i]'
+        object.__setattr__(self,'__dict__',table.Attributes(index))
     
     def StopGrowth(self):
-        self.__growing = False
+        self.__table.StopGrowth(self.__index)
     def AllowGrowth(self):
-        self.__growing = True
+        self.__table.AllowGrowth(self.__index)
     
     def __getattr__(self,key):
-        if key == "growthrate":
-            if self.__growing:
-                return self.__growthrate
-            else:
-                return 0.
-        elif key == "yieldfactor":
-            return self.__yieldfactor
-        elif key == "deathrate":
-            return self.__deathrate
+        if key in ["growthrate","growthrate_raw","yieldfactor","deathrate","growing"]:
+            return self.__table.Get(key,self.__index)
+        raise AttributeError(key)
     
     def __setattr__(self,key,value):
-        def checkfloat(value,lowerbound = None,upperbound = None):
-            try:
-                checkedvalue = float(value)
-            except:
-                raise ValueError
-            if not lowerbound is None:
-                if checkedvalue < lowerbound:
-                    checkedvalue = lowerbound
-            if not upperbound is None:
-                if checkedvalue > upperbound:
-                    checkedvalue = upperbound
-            return checkedvalue
-        
-        if key == "growthrate":
-            self.__growthrate  = checkfloat(value,lowerbound = 0.)
-        elif key == "yieldfactor":
-            self.__yieldfactor = checkfloat(value,lowerbound = 0.)
-        elif key == "deathrate":
-            self.__deathrate   = checkfloat(value,lowerbound = 0.)
+        if key in ["growthrate","yieldfactor","deathrate"]:
+            self.__table.Set(key,self.__index,value)
         else:
             super(MicrobialStrain,self).__setattr__(key,value)
 
@@ -455,7 +1724,7 @@ class GrowthDynamics(object):
             self.__usedeathreates = False
             deathrates = np.zeros(defaultlength)
 
-        self.strains = list()
+        self.strains = StrainTable()
         for a,y,d in zip(growthrates,yieldfactors,deathrates):
             self.addStrain(growthrate = a,yieldfactor = y,deathrate = d)
         
@@ -472,6 +1741,8 @@ class GrowthDynamics(object):
         self.__growthmatrix      = None
         self.__growthmatrixgridX = None
         self.__growthmatrixgridY = None
+        # True if values below 1 are known to be set to 0 already, such that (memory-mapped) growthmatrices are not touched on access
+        self.__growthmatrixrestricted = False
         
         self.__kwargs_for_pickle = kwargs
         
@@ -483,33 +1754,34 @@ class GrowthDynamics(object):
         
     
     def addStrain(self,growthrate = 1.,yieldfactor = 1.,deathrate = 0):
-        self.strains.append(MicrobialStrain(growthrate = growthrate, yieldfactor = yieldfactor, deathrate = deathrate))
+        self.strains.AddStrain(growthrate = growthrate, yieldfactor = yieldfactor, deathrate = deathrate)
     
     def delLastStrain(self):
         return self.strains.pop()
     
     def AllowGrowth(self):
-        for i in range(len(self.strains)):
-            self.strains[i].AllowGrowth()
+        self.strains.AllowGrowth()
     def StopGrowth(self,strain = None):
         if strain is None:
-            for i in range(len(self.strains)):
-                self.strains[i].StopGrowth()
+            self.strains.StopGrowth()
         else:
             if strain < len(self.strains):
-                self.strains[strain].StopGrowth()
+                self.strains.StopGrowth(strain)
     
-    def getTimeToDepletion(self,initialcells):
+    def getTimeToDepletion(self,initialcells,substrate = None):
         # internal function to determine when substrate is used up
+        # 'substrate' is the amount that can be consumed, defaults to the initial substrate concentration
+        if substrate is None:
+            substrate = self.env.substrate
         t0 = 0
         if np.sum(initialcells) > 0.:
             # assume only single strain
-            t1 = max(np.log(self.env.substrate*self.yieldfactors[initialcells > 0]/initialcells[initialcells > 0]+1.)/self.growthrates[initialcells >0])
+            t1 = max(np.log(substrate*self.yieldfactors[initialcells > 0]/initialcells[initialcells > 0]+1.)/self.growthrates[initialcells >0])
             i = 0
             while ((t1-t0)/t1)**2 > self.NR['precision2']:
                 t0 = t1
                 # Newton-Raphson iteration to refine solution
-                t1 += self.NR['alpha']*(self.env.substrate-np.sum(initialcells[initialcells>0]/self.yieldfactors[initialcells>0]*(np.exp(self.growthrates[initialcells>0]*t1)-1.)))/(np.sum(initialcells[initialcells>0]/self.yieldfactors[initialcells>0]*self.growthrates[initialcells>0]*np.exp(self.growthrates[initialcells>0]*t1)))
+                t1 += self.NR['alpha']*(substrate-np.sum(initialcells[initialcells>0]/self.yieldfactors[initialcells>0]*(np.exp(self.growthrates[initialcells>0]*t1)-1.)))/(np.sum(initialcells[initialcells>0]/self.yieldfactors[initialcells>0]*self.growthrates[initialcells>0]*np.exp(self.growthrates[initialcells>0]*t1)))
                 i+=1
                 # should not iterate infinitely
                 if i > self.NR['maxsteps']:
@@ -517,7 +1789,41 @@ class GrowthDynamics(object):
             return min(t1,self.env.mixingtime)
         else:
             return 0.
-      
+    
+    def getTimeToDepletionArray(self,initialcells,substrate = None):
+        # same as 'getTimeToDepletion', but for a whole array of inocula with shape (number of inocula, numstrains)
+        # Newton-Raphson iterations run on all inocula simultaneously, converged entries are masked out
+        # 'substrate' can be a single value or an array with one entry for each inoculum
+        ic  = np.array(initialcells,dtype=np.float64)
+        a   = self.growthrates
+        y   = self.yieldfactors
+        ttd = np.zeros(len(ic))
+        if substrate is None:
+            substrate = self.env.substrate
+        substrate = np.zeros(len(ic)) + substrate
+        nonzero = np.sum(ic,axis=1) > 0.
+        if np.any(nonzero):
+            ny = ic[nonzero]/y
+            sn = substrate[nonzero]
+            with np.errstate(divide = 'ignore', invalid = 'ignore'):
+                t1 = np.max(np.where(ny > 0,np.log(sn[:,np.newaxis]/ny + 1.)/a,-np.inf),axis = 1)
+            t0 = np.zeros(len(t1))
+            active = np.ones(len(t1),dtype = bool)
+            i = 0
+            while np.any(active):
+                t0[active] = t1[active]
+                # Newton-Raphson iteration to refine solution, only for entries that did not converge yet
+                nya = ny[active]
+                eat = np.exp(a * t1[active,np.newaxis])
+                t1[active] += self.NR['alpha']*(sn[active] - np.sum(np.where(nya > 0,nya*(eat-1.),0.),axis = 1))/np.sum(np.where(nya > 0,nya*a*eat,0.),axis = 1)
+                active[active] = ((t1[active]-t0[active])/t1[active])**2 > self.NR['precision2']
+                i+=1
+                # should not iterate infinitely
+                if i > self.NR['maxsteps']:
+                    raise ValueError
+            ttd[nonzero] = np.minimum(t1,self.env.mixingtime)
+        return ttd
+
 
     def checkInitialCells(self,initialcells = None):
         if initialcells is None:
@@ -561,10 +1867,28 @@ class GrowthDynamics(object):
         ttd = self.getTimeToDepletion(ic)          # time to depletion
         g   = self.env.dilution * ic * np.exp(self.growthrates * ttd - self.deathrates * self.env.mixingtime)
         return g
+    
+    def checkInitialCellsArray(self,initialcells):
+        # same as 'checkInitialCells' for an array of inocula with shape (number of inocula, number of strains)
+        ic   = np.zeros((len(initialcells),self.numstrains),dtype=np.float64)
+        ic0  = np.array(initialcells,dtype=np.float64)
+        ncol = min(self.numstrains,np.shape(ic0)[1])
+        ic[:,:ncol] = ic0[:,:ncol]
+        return ic
+    
+    def GrowthArray(self,initialcells):
+        # vectorized 'Growth' for an array of inocula with shape (number of inocula, numstrains)
+        # growth rates, yields and death rates are only looked up once for all inocula
+        # dynamics with their own 'Growth' compute all inocula one after the other, unless they also provide a vectorized 'GrowthArray'
+        if getattr(self.Growth,'__func__',None) is not GrowthDynamics.Growth:
+            return np.array([self.Growth(ic) for ic in self.checkInitialCellsArray(initialcells)])
+        ic  = self.checkInitialCellsArray(initialcells)
+        ttd = self.getTimeToDepletionArray(ic)
+        return self.env.dilution * ic * np.exp(self.growthrates * ttd[:,np.newaxis] - self.deathrates * self.env.mixingtime)
 
 
     def getGrowthVector(self,size,strainID = 0):
-        if isinstance(size,(int,np.int,np.int32,np.int64)):
+        if isinstance(size,(int,np.int32,np.int64)):
             g = np.zeros(size)
             m = np.zeros(self.numstrains)
             for i in np.arange(size):
@@ -581,35 +1905,151 @@ class GrowthDynamics(object):
         return g
 
 
-    def ComputeGrowthMatrix(self,size,step=1):
-        if isinstance(size,int):
-            self.__growthmatrixgridX = np.arange(start = 0, stop = size, step = step)
-            self.__growthmatrixgridY = np.arange(start = 0, stop = size, step = step)
+    def GrowthMatrixGrid(self,size,step=1):
+        # translate 'size' argument into the two axes of the growthmatrix:
+        # either int, (int,int) or (array,array) with arbitrary grid values
+        # grids with 'step' > 1 also contain 1, as seeding averages cannot interpolate between 0 and larger inocula (see 'GridSeedingBands')
+        def SteppedAxis(stop):
+            axis = np.arange(start = 0,stop = stop,step = step)
+            if step > 1 and stop > 1:
+                axis = np.insert(axis,1,1)
+            return axis
+        
+        if isinstance(size,(int,np.integer)):
+            gridX = SteppedAxis(size)
+            gridY = SteppedAxis(size)
         elif isinstance(size,(list,tuple,np.ndarray)):
-            if isinstance(size[0],int):
-                self.__growthmatrixgridX = np.arange(start = 0,stop = size[0],step = step)
+            if isinstance(size[0],(int,np.integer)):
+                gridX = SteppedAxis(size[0])
             elif isinstance(size[0],(list,tuple,np.ndarray)):
-                self.__growthmatrixgridX = size[0]
+                gridX = np.array(size[0])
             else:
                 raise ValueError("size argument can only be int or (list/tuple of int)")
 
             if len(size) >= 2:
-                if isinstance(size[1],int):
-                    self.__growthmatrixgridY = np.arange(start = 0,steop = size[1],step = step)
+                if isinstance(size[1],(int,np.integer)):
+                    gridY = SteppedAxis(size[1])
                 elif isinstance(size[1],(list,tuple,np.ndarray)):
-                    self.__growthmatrixgridY = size[1]
+                    gridY = np.array(size[1])
                 else:
                     raise ValueError("size argument can only be int or (list/tuple of int)")
             else:
-                self.__growthmatrixgridY = self.__growthmatrixgridX[:]
+                gridY = gridX[:]
                 
         else:
             raise ValueError("size argument does not fit")
+        return gridX,gridY
+
 
-        self.__growthmatrix = np.zeros((len(self.__growthmatrixgridX),len(self.__growthmatrixgridY),2))
-        for i,n1 in enumerate(self.__growthmatrixgridX):
-            for j,n2 in enumerate(self.__growthmatrixgridY):
-                self.__growthmatrix[i,j] = self.Growth(initialcells = np.array([n1,n2]))
+    def GrowthMatrixKey(self,gridX,gridY):
+        return GrowthMatrixKey(type(self).__name__,self.__kwargs_for_pickle,gridX,gridY)
+    
+    def GrowthMatrixFromCache(self,cache,gridX,gridY):
+        # look up growthmatrix for grid (gridX,gridY) in 'cache' ('GrowthMatrixCache' or None), returns True on a hit
+        if cache is None:
+            return False
+        stored = cache.Get(self.GrowthMatrixKey(gridX,gridY))
+        if stored is None:
+            return False
+        state = stored.__getstate__()
+        self.__growthmatrix = state[1]
+        self.__growthmatrixgridX,self.__growthmatrixgridY = state[2]
+        self.__growthmatrixrestricted = stored.restricted
+        return True
+
+    def ComputeGrowthMatrix(self,size,step=1,workers=1,checkpointdir=None,tilesize=50,resume=False,cache=None):
+        # with 'cache', identical growthmatrices (same dynamics, parameters and grid) are only computed once
+        self.__growthmatrixgridX,self.__growthmatrixgridY = self.GrowthMatrixGrid(size,step)
+        if self.GrowthMatrixFromCache(cache,self.__growthmatrixgridX,self.__growthmatrixgridY):
+            return
+
+        self.__growthmatrixrestricted = False
+        if checkpointdir is None:
+            self.__growthmatrix = self.GrowthMatrixCells(self.__growthmatrixgridX,self.__growthmatrixgridY,workers = workers)
+        else:
+            self.__growthmatrix = self.GrowthMatrixTiles(self.__growthmatrixgridX,self.__growthmatrixgridY,checkpointdir,tilesize = tilesize,workers = workers,resume = resume)
+        
+        if not cache is None:
+            cache.Put(self.GrowthMatrixKey(self.__growthmatrixgridX,self.__growthmatrixgridY),self)
+
+    def GrowthMatrixCells(self,gridX,gridY,workers = 1):
+        # compute growth for all combinations (n1,n2) of the two grids at once,
+        # returns array with shape (len(gridX),len(gridY),numstrains)
+        # rows of the grid are computed in blocks of at most 'GrowthArrayChunkSize' inocula (or a single row),
+        # with workers > 1, these blocks are distributed to a pool of processes
+        n1,n2 = np.meshgrid(np.array(gridX,dtype=np.float64),np.array(gridY,dtype=np.float64),indexing = 'ij')
+        ic    = np.column_stack([n1.flatten(),n2.flatten()])
+        numblocks = int(np.ceil(len(gridX)/max(1,GrowthArrayChunkSize//max(1,len(gridY)))))
+        if workers > 1:
+            numblocks = max(numblocks,4*workers)
+        rows   = [r for r in np.array_split(np.arange(len(gridX)),max(1,min(len(gridX),numblocks))) if len(r) > 0]
+        chunks = [ic[r[0]*len(gridY):(r[-1]+1)*len(gridY)] for r in rows]
+        if workers > 1 and len(chunks) > 1:
+            g  = ParallelGrowthArray(type(self).__name__,self.__kwargs_for_pickle,ic,workers,chunks = chunks)
+        elif len(chunks) > 0:
+            g  = np.concatenate([self.GrowthArray(chunk) for chunk in chunks],axis = 0)
+        else:
+            g  = self.GrowthArray(ic)
+        return np.reshape(g,(len(gridX),len(gridY),self.numstrains))
+
+    def GrowthMatrixTiles(self,gridX,gridY,checkpointdir,tilesize = 50,workers = 1,resume = False):
+        # compute growthmatrix in tiles of size (tilesize x tilesize), each tile is written to 'checkpointdir' once it is finished
+        # the file 'manifest.json' in this directory lists all finished tiles,
+        # with resume = True, these are not computed again if the checkpoint has the same 'GrowthMatrixKey' (all parameters and both grids)
+        tiles = dict()
+        for ti,i0 in enumerate(range(0,len(gridX),tilesize)):
+            for tj,j0 in enumerate(range(0,len(gridY),tilesize)):
+                tiles['{:d}_{:d}'.format(ti,tj)] = (slice(i0,min(i0+tilesize,len(gridX))),slice(j0,min(j0+tilesize,len(gridY))))
+        
+        manifestfile = os.path.join(checkpointdir,'manifest.json')
+        manifest     = { 'dynamics':        type(self).__name__,
+                         'growthmatrixkey': self.GrowthMatrixKey(gridX,gridY),
+                         'tilesize':        int(tilesize),
+                         'finished':        [] }
+        
+        if not os.path.isdir(checkpointdir):
+            os.makedirs(checkpointdir)
+        if resume and os.path.exists(manifestfile):
+            try:
+                with open(manifestfile) as fp:
+                    oldmanifest = json.load(fp)
+            except:
+                raise IOError("could not read manifest '{}'".format(manifestfile))
+            for key in ['dynamics','growthmatrixkey','tilesize']:
+                if oldmanifest.get(key) != manifest[key]:
+                    raise ValueError("checkpoint in '{}' was computed with different '{}'".format(checkpointdir,key))
+            manifest['finished'] = [key for key in oldmanifest['finished'] if os.path.exists(os.path.join(checkpointdir,'tile_' + key + '.npy'))]
+        
+        def writetile(key,tile):
+            # write to temporary files first, such that an interrupted job never leaves incomplete tiles behind
+            tilefile = os.path.join(checkpointdir,'tile_' + key + '.npy')
+            with open(tilefile + '.tmp','wb') as fp:
+                np.save(fp,tile)
+            os.replace(tilefile + '.tmp',tilefile)
+            manifest['finished'].append(key)
+            with open(manifestfile + '.tmp','w') as fp:
+                json.dump(manifest,fp)
+            os.replace(manifestfile + '.tmp',manifestfile)
+        
+        todo = [(key,gridX[sx],gridY[sy]) for key,(sx,sy) in tiles.items() if not key in manifest['finished']]
+        if len(todo) > 0:
+            if workers > 1:
+                pool = GrowthDynamicsPool(type(self).__name__,self.__kwargs_for_pickle,workers)
+                try:
+                    for key,tile in pool.imap_unordered(GrowthMatrixTileWorker,todo):
+                        writetile(key,tile)
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                for key,tX,tY in todo:
+                    writetile(key,self.GrowthMatrixCells(tX,tY))
+        
+        # assemble growthmatrix from all tiles, position only depends on tile index
+        g = np.zeros((len(gridX),len(gridY),self.numstrains))
+        for key,(sx,sy) in tiles.items():
+            g[sx,sy] = np.load(os.path.join(checkpointdir,'tile_' + key + '.npy'))
+        return g
 
     
     def getGrowthMatrix(self,size,step=1):
@@ -620,8 +2060,11 @@ class GrowthDynamics(object):
     def hasGrowthMatrix(self):
         return not (self.__growthmatrix is None)
     
-    def ExtendGrowthMatrix(self,size,step=1):
-        if isinstance(size,int):
+    def ExtendGrowthMatrix(self,size,step=1,workers=1,cache=None):
+        # int: extend both axes of existing grid up to 'size'
+        # otherwise: use new grid as in 'ComputeGrowthMatrix', which can be refined, extended or non-square
+        # only cells (n1,n2) not present in the old grid are computed, or none at all if the new grid is found in 'cache'
+        if isinstance(size,(int,np.integer)):
             if size > self.__growthmatrixgridX[-1]:
                 new_growthmatrixgridX = np.concatenate((self.__growthmatrixgridX,np.arange(start = self.__growthmatrixgridX[-1]+step,stop = size,step = step)))
             else:
@@ -631,21 +2074,41 @@ class GrowthDynamics(object):
             else:
                 new_growthmatrixgridY = self.__growthmatrixgridY
         else:
-            raise NotImplementedError
-
-        g = np.zeros((len(new_growthmatrixgridX),len(new_growthmatrixgridY),2))
-        for i in range(len(new_growthmatrixgridX)):
-            x = new_growthmatrixgridX[i]
-            for j in range(len(new_growthmatrixgridY)):
-                y = new_growthmatrixgridY[j]
-                if (x in self.__growthmatrixgridX) and (y in self.__growthmatrixgridX):
-                    g[i,j] = self.__growthmatrix[i,j]
-                else:
-                    g[i,j] = self.Growth(initialcells = np.array([x,y]))
+            new_growthmatrixgridX,new_growthmatrixgridY = self.GrowthMatrixGrid(size,step)
+        if self.GrowthMatrixFromCache(cache,new_growthmatrixgridX,new_growthmatrixgridY):
+            return
+
+        # indices of new grid values in old grid, -1 if not present
+        idxX  = self.GridIndices(self.__growthmatrixgridX,new_growthmatrixgridX)
+        idxY  = self.GridIndices(self.__growthmatrixgridY,new_growthmatrixgridY)
+        oldX  = idxX >= 0
+        oldY  = idxY >= 0
+
+        g = np.zeros((len(new_growthmatrixgridX),len(new_growthmatrixgridY),np.shape(self.__growthmatrix)[2]))
+        g[np.ix_(oldX,oldY)] = self.__growthmatrix[np.ix_(idxX[oldX],idxY[oldY])]
+        if np.any(~oldX):
+            # complete rows for new values n1
+            g[~oldX,:] = self.GrowthMatrixCells(new_growthmatrixgridX[~oldX],new_growthmatrixgridY,workers = workers)
+        if np.any(~oldY) and np.any(oldX):
+            # new values n2 for rows that existed already
+            g[np.ix_(oldX,~oldY)] = self.GrowthMatrixCells(new_growthmatrixgridX[oldX],new_growthmatrixgridY[~oldY],workers = workers)
                     
         self.__growthmatrixgridX = new_growthmatrixgridX[:]
         self.__growthmatrixgridY = new_growthmatrixgridY[:]
         self.__growthmatrix      = g[:,:,:]
+        self.__growthmatrixrestricted = False
+        if not cache is None:
+            cache.Put(self.GrowthMatrixKey(self.__growthmatrixgridX,self.__growthmatrixgridY),self)
+    
+    def GridIndices(self,oldgrid,newgrid):
+        # position of each value of 'newgrid' in 'oldgrid', or -1 if it does not appear there
+        oldgrid = np.array(oldgrid,dtype=np.float64)
+        newgrid = np.array(newgrid,dtype=np.float64)
+        order   = np.argsort(oldgrid)
+        pos     = np.clip(np.searchsorted(oldgrid[order],newgrid),0,len(oldgrid)-1)
+        idx     = order[pos]
+        found   = np.abs(oldgrid[idx] - newgrid) <= 1e-10 * np.maximum(1.,np.abs(newgrid))
+        return np.where(found,idx,-1)
     
     
     def getGrowthMultipleStrains(self,size,nstrains=2):
@@ -687,8 +2150,9 @@ class GrowthDynamics(object):
                 dn = 1.
                 # Newton-Raphson iteration to determine fixed point of non-linear equation (with Poisson seeding)
                 while (dn/n[i])**2 > self.NR['precision2']:
-                    px,dpx = PoissonSeedingVectors(m,np.array([n[i]]),diff=True)
-                    dn = (np.dot(px[0],growthi) - n[i])/(np.dot(dpx[0],growthi) - 1.)
+                    start,px,dpx = PoissonSeedingBands(m,np.array([n[i]]),diff=True)
+                    band = growthi[start[0]:start[0] + len(px[0])]
+                    dn = (np.dot(px[0],band) - n[i])/(np.dot(dpx[0],band) - 1.)
                     n[i] -= self.NR['alpha'] * dn
                     step += 1
                     if step > self.NR['maxsteps']:
@@ -699,12 +2163,9 @@ class GrowthDynamics(object):
         return n
     
     def getTimeToDepletionMatrix(self,size):
-        m = np.arange(size)
-        t = np.zeros((size,size))
-        for i in m:
-            for j in m:
-                t[i,j] = self.getTimeToDepletion(initialcells = np.array([i,j]))
-        return t
+        m1,m2 = getInoculumMatrices(np.arange(size),np.arange(size))
+        t = self.getTimeToDepletionArray(np.column_stack([m1.flatten(),m2.flatten()]))
+        return np.reshape(t,(size,size))
 
     def getApproximateGamma(self,initialcells):
         ic = self.checkInitialCells(initialcells)
@@ -739,6 +2200,7 @@ class GrowthDynamics(object):
 
     def setGrowthMatrixValues(self,threshold,newvalue = 0, operation = 'below'):
         if self.hasGrowthMatrix():
+            self.__growthmatrixrestricted = False
             if operation.lower() == 'below':
                 self.__growthmatrix[self.__growthmatrix <  threshold] = newvalue
             elif operation.lower() == 'above':
@@ -802,21 +2264,31 @@ class GrowthDynamics(object):
             self.ComputeXiMatrix()
         return self.__xi
 
+    # strain parameters are read in every evaluation of the dynamics,
+    # use properties instead of '__getattr__' below to get cached vectors from the StrainTable directly
+    @property
+    def numstrains(self):
+        return len(self.strains)
+    
+    @property
+    def growthrates(self):
+        return self.strains.growthrates
+    
+    @property
+    def yieldfactors(self):
+        return self.strains.yieldfactors
+    
+    @property
+    def deathrates(self):
+        return self.strains.deathrates
+
     def __getattr__(self,key):
-        if key == "numstrains":
-            return len(self.strains)
-        elif key == "growthrates":
-            return np.array([self.strains[i].growthrate for i in range(self.numstrains)])
-        elif key == "yieldfactors":
-            return np.array([self.strains[i].yieldfactor for i in range(self.numstrains)])
-        elif key == "deathrates":
-            return np.array([self.strains[i].deathrate for i in range(self.numstrains)])
-        elif key == "growthmatrix":
+        if key == "growthmatrix":
             if self.__growthmatrix is None:
                 raise ValueError("Growthmatrix not yet computed")
             else:
                 tmp = self.__growthmatrix
-                if self.__restrictFractionalPopulation:
+                if self.__restrictFractionalPopulation and not self.__growthmatrixrestricted:
                     tmp[tmp<1] = 0
                 return tmp
         elif key == "growthmatrixgrid":
@@ -833,24 +2305,21 @@ class GrowthDynamics(object):
             except:
                 raise ValueError
             assert len(tmp) == self.numstrains
-            for i in range(self.numstrains):
-                self.strains[i].growthrate = tmp[i]
+            self.strains.SetAll("growthrate",tmp)
         elif key == "yieldfactors":
             try:
                 tmp = np.array(value,dtype=float)
             except:
                 raise ValueError
             assert len(tmp) == self.numstrains
-            for i in range(self.numstrains):
-                self.strains[i].yieldfactor = tmp[i]
+            self.strains.SetAll("yieldfactor",tmp)
         elif key == "deathrates":
             try:
                 tmp = np.array(value,dtype=float)
             except:
                 raise ValueError
             assert len(tmp) == self.numstrains
-            for i in range(self.numstrains):
-                self.strains[i].deathrate = tmp[i]
+            self.strains.SetAll("deathrate",tmp)
         else:
             super(GrowthDynamics,self).__setattr__(key,value)
         
@@ -893,6 +2362,8 @@ class GrowthDynamics(object):
             else:                   kwargs[k.decode('utf-8')] = v
         self.__init__(**kwargs)
         self.__growthmatrix = state[1]
+        # optional entry from binary files, values below 1 were already set to 0 when writing
+        self.__growthmatrixrestricted = len(state) > 3 and bool(state[3])
         if isinstance(state[2],int):
             # backward compatibility
             self.__growthmatrixgridX = np.arange(state[2])
@@ -922,10 +2393,17 @@ class GrowthDynamics(object):
 class TimeIntegrator(object):
     # General forward integration of dynamics with Runge-Kutta method of 4th order
     # allows definition of multiple endconditions, currently implemented maximum time and one of the populations reaching zero
+    # with IntegrationMethod = 'OWNDP45', use adaptive steps of embedded Dormand-Prince 5(4) method instead,
+    # where the local error is kept below TimeIntegratorAtol + TimeIntegratorRtol * |x| and events are located within steps
     def __init__(self,requiredpositive = True,dynamics = None,**kwargs):
         
         self.__step       = float(kwargs.get("TimeIntegratorStep",1e-3))
         self.__outputstep = int(kwargs.get("TimeIntegratorOutput",100))
+        
+        self.__adaptive   = (str(kwargs.get("IntegrationMethod","OWNRK4")).upper() == 'OWNDP45')
+        self.__rtol       = float(kwargs.get("TimeIntegratorRtol",1e-6))
+        self.__atol       = float(kwargs.get("TimeIntegratorAtol",1e-6))
+        self.__events     = list()
 
         if dynamics is None:
             raise NotImplementedError
@@ -941,27 +2419,235 @@ class TimeIntegrator(object):
         self.__minimalpositivevalue = kwargs.get('MinimalPositiveValue',0)  # can introduce hard-cutoff, if values get too small
                                                                             # if requiredpositive is true, set everything below this threshold to 0
         
-        self.__trajectory = None
+        self.__trajectory       = None
+        self.__trajectorylength = 0
+        self.__stage            = None
+        self.__extinctionindex  = np.zeros(0,dtype=int)
+        self.__extinctionvalues = np.zeros(0)
         self.have_start_values = False
     
     def RungeKutta4(self,xx,tt):
         # 4th order Runge-Kutta integration scheme
-        k1 = self.__step * self.dyn( tt               , xx      )
-        k2 = self.__step * self.dyn( tt+self.__step/2., xx+k1/2.)
-        k3 = self.__step * self.dyn( tt+self.__step/2., xx+k2/2.)
-        k4 = self.__step * self.dyn( tt+self.__step   , xx+k3   )
-        ret = xx + (k1+2*k2+2*k3+k4)/6.
-        if self.__requiredpositive:
-            ret[ret <= self.__minimalpositivevalue] = 0
+        ret = np.array(xx,dtype=np.float64)
+        self.RungeKutta4InPlace(ret,tt)
         return ret
     
+    def AllocateBuffers(self,dimension):
+        # intermediate stages of Runge-Kutta scheme are stored in preallocated arrays
+        self.__stage     = np.zeros(dimension)
+        self.__increment = np.zeros(dimension)
+        self.__kstep     = np.zeros(dimension)
+        self.__belowmin  = np.zeros(dimension,dtype=bool)
+    
+    def RungeKutta4InPlace(self,xx,tt):
+        # same scheme as 'RungeKutta4', but state 'xx' is updated directly
+        # and no temporary arrays are created apart from the return values of the dynamics
+        if self.__stage is None or len(self.__stage) != len(xx):
+            self.AllocateBuffers(len(xx))
+        h,xs,inc,hk = self.__step,self.__stage,self.__increment,self.__kstep
+        
+        k = self.dyn(tt,xx)
+        np.multiply(k,h/6.,out = inc)
+        np.multiply(k,h/2.,out = xs)
+        xs += xx
+        k = self.dyn(tt+h/2.,xs)
+        np.multiply(k,h/3.,out = hk)
+        inc += hk
+        np.multiply(k,h/2.,out = xs)
+        xs += xx
+        k = self.dyn(tt+h/2.,xs)
+        np.multiply(k,h/3.,out = hk)
+        inc += hk
+        np.multiply(k,h,out = xs)
+        xs += xx
+        k = self.dyn(tt+h,xs)
+        np.multiply(k,h/6.,out = hk)
+        inc += hk
+        xx += inc
+        
+        if self.__requiredpositive:
+            if self.__minimalpositivevalue == 0:
+                np.maximum(xx,0.,out = xx)
+            else:
+                np.less_equal(xx,self.__minimalpositivevalue,out = self.__belowmin)
+                xx[self.__belowmin] = 0
+        return xx
+    
+    
+    # Butcher tableau of Dormand-Prince 5(4), last row of DP_A are the weights of the 5th order solution
+    DP_C = np.array([0.,1./5,3./10,4./5,8./9,1.,1.])
+    DP_A = [np.array([]),
+            np.array([1./5]),
+            np.array([3./40,9./40]),
+            np.array([44./45,-56./15,32./9]),
+            np.array([19372./6561,-25360./2187,64448./6561,-212./729]),
+            np.array([9017./3168,-355./33,46732./5247,49./176,-5103./18656]),
+            np.array([35./384,0.,500./1113,125./192,-2187./6784,11./84])]
+    DP_E = np.array([71./57600,0.,-71./16695,71./1920,-17253./339200,22./525,-1./40])
+    
+    def DormandPrince45(self,xx,tt,ff,step):
+        # single step of embedded Runge-Kutta method, 'ff' is dynamics at (tt,xx)
+        # last stage is evaluated at new point and can be reused (first same as last)
+        k = [ff]
+        for i in range(1,7):
+            k.append(self.dyn(tt + self.DP_C[i]*step, xx + step * np.dot(self.DP_A[i],k)))
+        ret = xx + step * np.dot(self.DP_A[6],k[:6])
+        err = step * np.dot(self.DP_E,k)
+        scale = self.__atol + self.__rtol * np.maximum(np.abs(xx),np.abs(ret))
+        return ret,k[6],np.sqrt(np.mean((err/scale)**2))
+    
+    def Hermite(self,x0,f0,x1,f1,step,theta):
+        # cubic interpolation within a step, used for dense output and to locate events
+        return (1-theta)**2 * (1+2*theta) * x0 + theta**2 * (3-2*theta) * x1 + theta * (1-theta) * step * ((1-theta) * f0 - theta * f1)
+    
+    def LocateEvents(self,x0,f0,x1,f1,step):
+        # return position 'theta' within step and list of events that happen first,
+        # events are triggered when entry 'index' falls to or below 'value',
+        # extinction (as in 'checkExtinction') when a nonzero population falls below 'value', also when starting exactly at 'value'
+        theta  = 1.
+        events = list()
+        for ev in self.__events:
+            index,value = ev[0],ev[1]
+            if index >= len(x0):
+                continue
+            if ev[2] == 'extinction':
+                triggered = x0[index] > 0 and x0[index] >= value and x1[index] < value
+            else:
+                triggered = x0[index] > value and x1[index] <= value
+            if triggered:
+                # bisection on cubic interpolation
+                lower,upper = 0.,1.
+                for i in range(60):
+                    mid = .5*(lower+upper)
+                    if self.Hermite(x0[index],f0[index],x1[index],f1[index],step,mid) > value:
+                        lower = mid
+                    else:
+                        upper = mid
+                if upper < theta - 1e-12:
+                    theta  = upper
+                    events = [ev]
+                elif upper <= theta + 1e-12:
+                    events.append(ev)
+        return theta,events
+    
+    def IntegrateAdaptive(self,store_trajectory = False):
+        # adaptive stepsize control and event location, ends exactly at the earliest 'maxtime' end condition
+        # with trajectory output at multiples of TimeIntegratorStep * TimeIntegratorOutput
+        maxtime  = self.EarliestMaxTime()
+        events   = list(self.__events)
+        for i,value in self.__extinctionthresholds.items():
+            self.__events.append([i,value,'extinction'])
+        for ec in self.__EndConditions:
+            if ec[0] == "reachzero":
+                self.__events.append([ec[1],0.,'terminate'])
+        
+        outputinterval = self.__step * self.__outputstep
+        nextoutput     = (np.floor(self.__globaltime/outputinterval) + 1) * outputinterval
+        
+        self.checkExtinction()
+        t     = self.__globaltime
+        x     = self.x
+        f     = self.dyn(t,x)
+        step  = self.__step
+        ended = False
+        try:
+            while t < maxtime and not ended:
+                step = min(step,maxtime - t)
+                x1,f1,err = self.DormandPrince45(x,t,f,step)
+                if not np.isfinite(err):
+                    # keep non-finite state at the time it occured, as in fixed-step integration
+                    t,x = t + step,x1
+                    break
+                if err > 1:
+                    # reject step
+                    step *= max(0.2,0.9*err**-0.2)
+                    if step < 1e-12 * max(1.,abs(t)):
+                        raise ValueError("stepsize too small in adaptive integration at time {}".format(t))
+                    continue
+                
+                theta,triggered = self.LocateEvents(x,f,x1,f1,step)
+                t1 = t + theta * step
+                
+                if store_trajectory:
+                    while nextoutput <= t1 and nextoutput < maxtime:
+                        xout = self.Hermite(x,f,x1,f1,step,(nextoutput-t)/step)
+                        if self.__requiredpositive:
+                            xout[xout <= self.__minimalpositivevalue] = 0
+                        self.StoreTrajectory(nextoutput,xout)
+                        nextoutput += outputinterval
+                
+                # step is cut at the first event
+                changed = (theta < 1)
+                if theta < 1:
+                    x1 = self.Hermite(x,f,x1,f1,step,theta)
+                for ev in triggered:
+                    if ev[2] == 'extinction':
+                        x1[ev[0]] = 0.
+                    else:
+                        x1[ev[0]] = ev[1]
+                    if ev[2] == 'terminate':
+                        ended = True
+                        self.__triggeredEndConditions.append(["reachzero",ev[0]])
+                if self.__requiredpositive:
+                    belowmin = x1 <= self.__minimalpositivevalue
+                    if np.any(x1[belowmin] != 0):
+                        x1[belowmin] = 0
+                        changed = True
+                # extinction thresholds are applied after every accepted step, as in 'checkExtinction'
+                if len(self.__extinctionindex) > 0:
+                    xe    = x1[self.__extinctionindex]
+                    below = (xe < self.__extinctionvalues) & (xe != 0)
+                    if below.any():
+                        x1[self.__extinctionindex[below]] = 0
+                        changed = True
+                
+                # dynamics at new point can only be reused if point was not changed by events or cutoffs
+                if changed:
+                    f1 = self.dyn(t1,x1)
+                
+                t,x,f = t1,x1,f1
+                step *= min(5.,max(0.2,0.9*err**-0.2)) if err > 0 else 5.
+        finally:
+            self.__events = events
+        
+        self.x = x
+        self.__globaltime = t
+        if store_trajectory:
+            self.StoreTrajectory(t,x)
+        return self.x
     
     def checkExtinction(self):
-        if len(self.__extinctionthresholds) >= 1:
-            for i in self.__extinctionthresholds.keys():
-                if i < len(self.x):
-                    if self.x[i] < self.__extinctionthresholds[i]:
-                        self.x[i] = 0
+        # thresholds are stored as index and value arrays, see 'UpdateExtinctionMask'
+        if len(self.__extinctionindex) > 0:
+            below = self.x[self.__extinctionindex] < self.__extinctionvalues
+            if below.any():
+                self.x[self.__extinctionindex[below]] = 0
+    
+    def UpdateExtinctionMask(self):
+        indices = [i for i in sorted(self.__extinctionthresholds.keys()) if i < len(self.x)]
+        self.__extinctionindex  = np.array(indices,dtype=int)
+        self.__extinctionvalues = np.array([self.__extinctionthresholds[i] for i in indices],dtype=np.float64)
+    
+    def InitTrajectory(self,maxtime = None):
+        # trajectory is stored in preallocated array with time in first column,
+        # its size is estimated from the end time, and doubled whenever it is full
+        if maxtime is None or not np.isfinite(maxtime):
+            length = 1024
+        else:
+            length = int((maxtime - self.__globaltime)/(self.__step * self.__outputstep)) + 3
+        self.__trajectory       = np.zeros((max(length,2),len(self.x) + 1))
+        self.__trajectorylength = 0
+    
+    def StoreTrajectory(self,time,x):
+        if self.__trajectorylength >= len(self.__trajectory):
+            self.__trajectory = np.concatenate([self.__trajectory,np.zeros(np.shape(self.__trajectory))],axis = 0)
+        self.__trajectory[self.__trajectorylength,0]  = time
+        self.__trajectory[self.__trajectorylength,1:] = x
+        self.__trajectorylength += 1
+    
+    def EarliestMaxTime(self):
+        maxtimes = [ec[1] for ec in self.__EndConditions if ec[0] == "maxtime"]
+        return min(maxtimes) if len(maxtimes) > 0 else np.inf
 
     def HasEnded(self):
         terminateInteration = False
@@ -989,7 +2675,7 @@ class TimeIntegrator(object):
         self.__triggeredEndConditions = list()
         t = 0
         while t <= time:
-            self.x = self.RungeKutta4(self.x,self.__globaltime + t)
+            self.RungeKutta4InPlace(self.x,self.__globaltime + t)
             self.checkExtinction()
             t += self.__step
         self.__globaltime += t
@@ -1001,7 +2687,7 @@ class TimeIntegrator(object):
             raise ValueError
         t = 0
         while self.x[index] > 0:
-            self.x = self.RungeKutta4(self.x,self.__globaltime + t)
+            self.RungeKutta4InPlace(self.x,self.__globaltime + t)
             self.checkExtinction()
             t += self.__step
         self.__globaltime += t
@@ -1012,17 +2698,32 @@ class TimeIntegrator(object):
         if not self.have_start_values:
             raise ValueError
         if store_trajectory:
-            self.__trajectory = list()
+            self.InitTrajectory(self.EarliestMaxTime())
         o = 0
         if self.CountEndConditions > 0:
-            while not self.HasEnded():
-                self.x = self.RungeKutta4(self.x,self.__globaltime)
+            if self.__adaptive:
+                return self.IntegrateAdaptive(store_trajectory = store_trajectory)
+            # end conditions are evaluated without looping over the list of conditions in every step,
+            # only the final call to 'HasEnded' records which of them triggered
+            maxtime  = self.EarliestMaxTime()
+            zeroidx  = np.array([ec[1] for ec in self.__EndConditions if ec[0] == "reachzero"],dtype=int)
+            checkzero = len(zeroidx) > 0
+            x = self.x
+            while self.__globaltime <= maxtime:
+                xsum = x.sum()
+                if xsum != xsum:
+                    # nan
+                    break
+                if checkzero and (x[zeroidx] <= 0.).any():
+                    break
+                self.RungeKutta4InPlace(x,self.__globaltime)
                 self.checkExtinction()
                 self.__globaltime += self.__step
                 if store_trajectory:
                     if o%self.__outputstep == 0:
-                        self.__trajectory.append([self.__globaltime,self.x])
+                        self.StoreTrajectory(self.__globaltime,x)
                 o += 1
+            self.HasEnded()
             return self.x
         else:
             raise NotImplementedError
@@ -1032,6 +2733,8 @@ class TimeIntegrator(object):
         assert len(self.x) == len(self.dyn(0,self.x)), "Dimensions of initial conditions and dynamics do not match"
         self.__globaltime = globaltime
         self.__triggeredEndConditions = list()
+        self.AllocateBuffers(len(self.x))
+        self.UpdateExtinctionMask()
         self.have_start_values = True
 
     def SetEndConditionMaxTime(self,maxtime):
@@ -1062,16 +2765,24 @@ class TimeIntegrator(object):
     
     def SetPopulationExtinctionThreshold(self,index,value):
         self.__extinctionthresholds[int(index)] = float(value)
+        if self.have_start_values:
+            self.UpdateExtinctionMask()
+    
+    def SetEvent(self,index,value):
+        # only used with adaptive steps: land exactly on the point where entry 'index' reaches 'value'
+        # needed for discontinuities in the dynamics, like substrate getting depleted
+        self.__events.append([int(index),float(value),'locate'])
     
     def __str__(self):
         return (" ".join(["{:14.6e}"]*len(self.x))).format(*self.x)
     
     def GetTrajectory(self,TimeOutput = False):
+        # returns views of the stored trajectory, no copies
         if not self.__trajectory is None:
             if TimeOutput:
-                return np.array([np.concatenate([np.array([t]),x]) for t,x in self.__trajectory])
+                return self.__trajectory[:self.__trajectorylength]
             else:
-                return np.array([x for t,x in self.__trajectory])
+                return self.__trajectory[:self.__trajectorylength,1:]
         else:
             raise ValueError
     
@@ -1089,6 +2800,114 @@ class TimeIntegrator(object):
 
 
 
+class TimeIntegratorBatch(object):
+    # Runge-Kutta integration of 4th order for many initial conditions of the same dynamics at once
+    # state is stored as array with shape (number of initial conditions, dimension of dynamics),
+    # all rows are advanced in lockstep and 'dynamics(t,x)' has to accept such arrays (and an array of times)
+    # rows that reached one of their end conditions are frozen, while the others continue
+    def __init__(self,requiredpositive = True,dynamics = None,**kwargs):
+        
+        self.__step = float(kwargs.get("TimeIntegratorStep",1e-3))
+
+        if dynamics is None:
+            raise NotImplementedError
+        else:
+            self.dyn = dynamics
+        
+        self.__EndConditions = list()
+        self.__extinctionthresholds = dict()
+        self.__requiredpositive = requiredpositive
+        self.__minimalpositivevalue = kwargs.get('MinimalPositiveValue',0)
+        
+        self.have_start_values = False
+    
+    def RungeKutta4(self,xx,tt):
+        # 4th order Runge-Kutta integration scheme, for all rows simultaneously
+        k1 = self.__step * self.dyn( tt               , xx      )
+        k2 = self.__step * self.dyn( tt+self.__step/2., xx+k1/2.)
+        k3 = self.__step * self.dyn( tt+self.__step/2., xx+k2/2.)
+        k4 = self.__step * self.dyn( tt+self.__step   , xx+k3   )
+        ret = xx + (k1+2*k2+2*k3+k4)/6.
+        if self.__requiredpositive:
+            ret[ret <= self.__minimalpositivevalue] = 0
+        return ret
+    
+    def RowValues(self,value,rows):
+        # end conditions and thresholds can be either identical for all rows or given for each row separately
+        if np.ndim(value) == 0:
+            return value
+        else:
+            return np.array(value)[rows]
+
+    def HasEnded(self,rows):
+        # evaluate end conditions for all rows given by index array 'rows'
+        ended = np.isnan(self.x[rows]).any(axis = 1)
+        for ec in self.__EndConditions:
+            if ec[0] == "maxtime":
+                ended |= self.RowValues(ec[1],rows) < self.__globaltime[rows]
+            elif ec[0] == "reachzero":
+                ended |= self.x[rows,ec[1]] <= 0.
+            else:
+                raise NotImplementedError
+        return ended
+
+    def IntegrateToEndConditions(self):
+        if not self.have_start_values:
+            raise ValueError
+        if self.CountEndConditions > 0:
+            rows = np.arange(len(self.x))
+            rows = rows[~self.HasEnded(rows)]
+            while len(rows) > 0:
+                x = self.RungeKutta4(self.x[rows],self.__globaltime[rows])
+                if not self.__thresholds is None:
+                    x[x < self.__thresholds[rows]] = 0
+                self.x[rows] = x
+                self.__globaltime[rows] += self.__step
+                rows = rows[~self.HasEnded(rows)]
+            return self.x
+        else:
+            raise NotImplementedError
+        
+    def ResetInitialConditions(self,initialconditions,globaltime = 0):
+        self.x = np.array(initialconditions,dtype=np.float64)
+        assert self.x.ndim == 2, "Initial conditions need shape (number of initial conditions, dimension)"
+        assert np.shape(self.x) == np.shape(self.dyn(np.zeros(len(self.x)),self.x)), "Dimensions of initial conditions and dynamics do not match"
+        self.__globaltime = np.zeros(len(self.x)) + globaltime
+        
+        # extinction thresholds as array with same shape as state, -inf for entries without threshold
+        if len(self.__extinctionthresholds) > 0:
+            self.__thresholds = np.full(np.shape(self.x),-np.inf)
+            for i,value in self.__extinctionthresholds.items():
+                if i < np.shape(self.x)[1]:
+                    self.__thresholds[:,i] = value
+        else:
+            self.__thresholds = None
+        self.have_start_values = True
+
+    def SetEndCondition(self,condition,value):
+        # value can be scalar or array with one entry for each row
+        if str(condition).lower() == "maxtime":
+            if np.all(np.array(value) >= 0):
+                self.__EndConditions.append(["maxtime",value])
+        elif str(condition).lower() == "reachzero":
+            self.__EndConditions.append(["reachzero",int(value)])
+        else:
+            raise NotImplementedError
+    
+    def SetPopulationExtinctionThreshold(self,index,value):
+        # value can be scalar or array with one entry for each row
+        self.__extinctionthresholds[int(index)] = value
+    
+    def __getattr__(self,key):
+        if key == "CountEndConditions":
+            return len(self.__EndConditions)
+        elif key == "populations":
+            return self.x
+        elif key == "time":
+            return self.__globaltime
+
+
+
 class GrowthDynamicsODE(GrowthDynamics):
     def __init__(self,numstrains = None, **kwargs):
         super(GrowthDynamicsODE,self).__init__(numstrains = numstrains,**kwargs)
@@ -1103,25 +2922,64 @@ class GrowthDynamicsODE(GrowthDynamics):
         self.TimeIntegratorOutput    = kwargs.get("TimeIntegratorOutput",10)
         self.TimeIntegratorStep      = kwargs.get("TimeIntegratorStep",1e-3)
         self.EmptySubstrateThreshold = 1e-3 * np.mean(self.yieldfactors)
+        self.ExactExponentialPhase   = kwargs.get("ExactExponentialPhase",False) and self.hasExponentialPhase()
         
-        if self.IntegrationMethod.upper() == 'OWNRK4':
+        if self.IntegrationMethod.upper() in ['OWNRK4','OWNDP45']:
             # use TimeIntegrator class defined above
             self.integrator = TimeIntegrator(dynamics = self.dynamics,requiredpositive = True,**kwargs)
             self.Growth     = self.GrowthOwnRK4Integrator
             self.Trajectory = self.TrajectoryOwnRK4Integrator
+            if self.ExactExponentialPhase:
+                self.Growth = self.GrowthExponentialPhase
             
             self.integrator.SetEndCondition("maxtime",self.env.mixingtime)
             for i in range(self.numstrains):
                 self.integrator.SetPopulationExtinctionThreshold(i,1)
+            
+            # adaptive steps need to land exactly where substrate is used up,
+            # as growth stops either at zero or below 'EmptySubstrateThreshold'
+            self.integrator.SetEvent(self.getSubstrateIndex(),self.EmptySubstrateThreshold)
+            self.integrator.SetEvent(self.getSubstrateIndex(),0)
+
+        if self.IntegrationMethod.upper() == 'OWNRK4':
+            # integrate many inocula at once in lockstep, used to compute the growthmatrix
+            if self.hasDynamicsArray():
+                self.batchintegrator = TimeIntegratorBatch(dynamics = self.dynamicsArray,requiredpositive = True,**kwargs)
+            else:
+                self.batchintegrator = TimeIntegratorBatch(dynamics = self.dynamicsRows,requiredpositive = True,**kwargs)
+            self.GrowthArray = self.GrowthArrayOwnRK4Integrator
+            if self.ExactExponentialPhase:
+                self.GrowthArray = self.GrowthArrayExponentialPhase
+            
+            self.batchintegrator.SetEndCondition("maxtime",self.env.mixingtime)
+            for i in range(self.numstrains):
+                self.batchintegrator.SetPopulationExtinctionThreshold(i,1)
+
+        elif self.IntegrationMethod.upper() == 'OWNDP45':
+            # adaptive steps differ for each inocula, compute growthmatrix one after the other
+            pass
 
         elif self.IntegrationMethod.upper() == 'SCIPY':
-            # initialize integration from 'Scipy.integrate' = 'spint'
+            # initialize integration from 'Scipy.integrate' = 'spint', only imported for ODE dynamics
+            import scipy.integrate as spint
             self.integrator = spint.ode(self.dynamics)
             self.integrator.set_integrator('vode', method = 'bdf', min_step = 1e-4, max_step = 1e-2)
 
             self.Trajectory = self.TrajectorySciPyIntegrator
             self.Growth     = self.GrowthSciPyIntegrator
         
+        elif self.IntegrationMethod.upper() == 'SOLVEIVP':
+            # 'scipy.integrate.solve_ivp' integrates between events without intermediate steps of fixed size,
+            # restarts after substrate is used up or strains went extinct
+            if not self.hasSolveIVPSupport():
+                raise ValueError("integration method 'SolveIVP' not available for " + type(self).__name__)
+            self.SolveIVPMethod = kwargs.get("SolveIVPMethod",'LSODA')
+            self.SolveIVPRtol   = float(kwargs.get("TimeIntegratorRtol",1e-6))
+            self.SolveIVPAtol   = float(kwargs.get("TimeIntegratorAtol",1e-6))
+            
+            self.Trajectory = self.TrajectorySolveIVPIntegrator
+            self.Growth     = self.GrowthSolveIVPIntegrator
+        
         else:
             raise NotImplementedError
         
@@ -1139,12 +2997,122 @@ class GrowthDynamicsODE(GrowthDynamics):
                     self.growthrates * x[:self.numstrains],
                     np.array([np.sum(-a * x[:self.numstrains]/self.yieldfactors)])
                 ])
+    
+    # vectorized version of 'dynamics' for states with shape (number of inocula, dimension)
+    # child-objects can define their own 'dynamicsArray', otherwise 'dynamics' is evaluated row by row
+    def dynamicsArray(self,t,x):
+        a = np.where(x[:,-1:] <= 0,0.,self.growthrates)
+        return np.column_stack([
+                    self.growthrates * x[:,:self.numstrains],
+                    np.sum(-a * x[:,:self.numstrains]/self.yieldfactors,axis = 1)
+                ])
+    
+    def getSubstrateIndex(self):
+        # position of substrate in state vector, directly after all strains for most dynamics
+        return self.numstrains
+    
+    def dynamicsRows(self,t,x):
+        return np.array([self.dynamics(tt,xx) for tt,xx in zip(t,x)])
+    
+    def hasDynamicsArray(self):
+        # vectorized dynamics can only be used if defined in the same class as 'dynamics' itself
+        return self.definedWithDynamics('dynamicsArray')
+    
+    def hasExponentialPhase(self):
+        # same for the analytic solution of the exponential phase
+        return self.definedWithDynamics('ExponentialPhaseEnd')
+    
+    def hasSolveIVPSupport(self):
+        # 'SolveIVP' reproduces the end conditions of 'TimeIntegrator' as long as growth is determined by 'dynamics' alone
+        return True
+    
+    def definedWithDynamics(self,name):
+        for cls in type(self).__mro__:
+            if 'dynamics' in cls.__dict__:
+                return name in cls.__dict__
+        return False
+    
+    # dynamics that reduce to pure exponential growth while substrate lasts can skip integrating this phase numerically,
+    # child-objects opt in by defining both functions below (next to their 'dynamics')
+    # states have shape (number of inocula, dimension)
+    # substrate level, where exponential phase ends for each state, or nan if state is not in exponential phase
+    def ExponentialPhaseEnd(self,x):
+        return np.zeros(len(x))
+    
+    # state after exponential growth for times t (one for each state)
+    def ExponentialPhaseState(self,x,t):
+        eat = np.exp(self.growthrates * t[:,np.newaxis])
+        ret = np.array(x,dtype=np.float64)
+        ret[:,:self.numstrains] = x[:,:self.numstrains] * eat
+        ret[:,self.getSubstrateIndex()] -= np.sum(x[:,:self.numstrains]/self.yieldfactors * (eat - 1.),axis = 1)
+        return ret
+    
+    # cell numbers can be frozen once substrate is used up, otherwise the remaining time is integrated numerically
+    def StationaryAfterExponentialPhase(self):
+        return False
+    
+    def ExponentialPhaseIntegral(self,t):
+        # integral over exp(a*t) for all growthrates a, shape (len(t), numstrains)
+        at = self.growthrates * t[:,np.newaxis]
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            return np.where(at != 0,np.expm1(at)/self.growthrates,t[:,np.newaxis])
+    
+    def ExponentialPhaseJump(self,initialcells):
+        # move all inocula analytically to the end of their exponential phase, using 'getTimeToDepletionArray'
+        # returns states, times, and which inocula already reached the end of the mixing time
+        ic   = self.checkInitialCellsArray(initialcells)
+        ic[ic < 1]  = 0   # same as extinction threshold in integrators
+        x    = np.concatenate([ic,np.repeat([self.otherinitialconditions],len(ic),axis = 0)],axis = 1)
+        t    = np.zeros(len(x))
+        s    = self.getSubstrateIndex()
+        
+        send = self.ExponentialPhaseEnd(x)
+        with np.errstate(invalid = 'ignore'):
+            exponential = np.isfinite(send) & (x[:,s] > send)
+        if np.any(exponential):
+            t[exponential] = self.getTimeToDepletionArray(ic[exponential],substrate = x[exponential,s] - send[exponential])
+            depleted = exponential & (np.sum(ic,axis = 1) > 0) & (t < self.env.mixingtime)
+            ongrid   = self.IntegrationMethod.upper() == 'OWNRK4' and not self.StationaryAfterExponentialPhase()
+            if ongrid:
+                # fixed steps continue from the last point of their grid before depletion,
+                # otherwise the final step would overshoot the mixing time
+                h = float(self.TimeIntegratorStep)
+                t[depleted] = np.floor(t[depleted]/h) * h
+            x[exponential] = self.ExponentialPhaseState(x[exponential],t[exponential])
+            if not ongrid:
+                # land exactly on the end of the exponential phase, instead of the Newton-Raphson estimate
+                x[depleted,s] = send[depleted]
+            if self.StationaryAfterExponentialPhase():
+                t[depleted] = self.env.mixingtime
+        done = exponential & ((t >= self.env.mixingtime) | (np.sum(ic,axis = 1) == 0))
+        return x,t,done
+    
+    def GrowthExponentialPhase(self,initialcells = None):
+        ic      = self.checkInitialCells(initialcells)
+        x,t,done = self.ExponentialPhaseJump(ic[np.newaxis,:])
+        if done[0]:
+            return x[0,:self.numstrains]
+        self.integrator.ResetInitialConditions(x[0],globaltime = t[0])
+        return self.integrator.IntegrateToEndConditions()[:self.numstrains]
+    
+    def GrowthArrayExponentialPhase(self,initialcells):
+        x,t,done = self.ExponentialPhaseJump(initialcells)
+        if not np.all(done):
+            self.batchintegrator.ResetInitialConditions(x[~done],globaltime = t[~done])
+            x[~done] = self.batchintegrator.IntegrateToEndConditions()
+        return x[:,:self.numstrains]
 
     # base growth function to use for time integrator dynamics
     def GrowthOwnRK4Integrator(self,initialcells = None):
         # compute whole trajectory, only output final cell numbers
         tmp = self.TrajectoryOwnRK4Integrator(initialcells)
         return tmp[-1,:self.numstrains]
+    
+    # integrate all inocula at once, only output final cell numbers
+    def GrowthArrayOwnRK4Integrator(self,initialcells):
+        ic   = self.checkInitialCellsArray(initialcells)
+        self.batchintegrator.ResetInitialConditions(np.concatenate([ic,np.repeat([self.otherinitialconditions],len(ic),axis = 0)],axis = 1))
+        return self.batchintegrator.IntegrateToEndConditions()[:,:self.numstrains]
         
 
 
@@ -1191,6 +3159,98 @@ class GrowthDynamicsODE(GrowthDynamics):
     def GrowthSciPyIntegrator(self,initialcells):
         traj = self.Trajectory(initialcells)
         return traj[-1,:self.numstrains]
+
+    # integrate with 'solve_ivp' between terminal events, where the integration is restarted,
+    # same end conditions as 'TimeIntegrator': strains go extinct when they fall below 1, entries stay positive;
+    # substrate falling below 'EmptySubstrateThreshold' or to 0 only restarts the integration at this discontinuity
+    # of most dynamics, as events in adaptive 'OWNDP45' steps, growth itself is determined by 'dynamics' alone
+    def SolveIVPIntegrator(self,initialcells,store_trajectory = False):
+        ic = self.checkInitialCells(initialcells[:self.numstrains])
+        x  = np.concatenate([ic,self.otherinitialconditions])
+        t  = 0.
+        s  = self.getSubstrateIndex()
+        
+        if self.hasDynamicsArray():
+            # solve_ivp uses shape (dimension, number of points), the transpose of 'dynamicsArray'
+            dyn = lambda tt,xx: self.dynamicsArray(tt,xx.T).T
+        else:
+            dyn = self.dynamics
+        def rhs(tt,xx):
+            # all entries are required to stay positive, same as in 'TimeIntegrator'
+            dx = dyn(tt,xx)
+            return np.where((xx <= 0) & (dx < 0),0.,dx)
+        
+        def makeevent(index,value):
+            event = lambda tt,xx: xx[index] - value
+            event.terminal  = True
+            event.direction = -1
+            return event
+        
+        x[:self.numstrains][x[:self.numstrains] < 1] = 0
+        
+        import scipy.integrate as spint
+        outputinterval = self.TimeIntegratorStep * self.TimeIntegratorOutput
+        localtraj = [np.concatenate([[t],x])] if store_trajectory else None
+        
+        while t < self.env.mixingtime:
+            # only events that can still change the dynamics
+            eventlist = list()
+            if x[s] > self.EmptySubstrateThreshold:
+                eventlist.append(('substrate',makeevent(s,self.EmptySubstrateThreshold)))
+            for i in np.where(x[:self.numstrains] > 0)[0]:
+                # strains go extinct below 1 (strictly, as in 'checkExtinction'), events exactly at the initial value would trigger immediately
+                eventlist.append((i,makeevent(i,np.nextafter(1.,0.))))
+            for i in np.where(x[self.numstrains:] > 0)[0] + self.numstrains:
+                eventlist.append(('zero',makeevent(i,0.),i))
+            
+            if store_trajectory:
+                sol = spint.solve_ivp(rhs,(t,self.env.mixingtime),x,method = self.SolveIVPMethod,events = [ev[1] for ev in eventlist],
+                                      vectorized = self.hasDynamicsArray(),dense_output = True,rtol = self.SolveIVPRtol,atol = self.SolveIVPAtol)
+            else:
+                # final state is either at the end of the mixing time or at an event, no output in between
+                sol = spint.solve_ivp(rhs,(t,self.env.mixingtime),x,method = self.SolveIVPMethod,events = [ev[1] for ev in eventlist],
+                                      vectorized = self.hasDynamicsArray(),t_eval = [self.env.mixingtime],rtol = self.SolveIVPRtol,atol = self.SolveIVPAtol)
+            if sol.status < 0:
+                raise ValueError("solve_ivp failed: " + str(sol.message))
+            
+            triggered = [k for k in range(len(eventlist)) if len(sol.t_events[k]) > 0]
+            if sol.status == 1 and len(triggered) > 0:
+                t1 = sol.t_events[triggered[0]][-1]
+                x1 = np.array(sol.y_events[triggered[0]][-1],dtype=np.float64)
+            else:
+                t1 = self.env.mixingtime
+                x1 = np.array(sol.y[:,-1],dtype=np.float64)
+            
+            for k in triggered:
+                if eventlist[k][0] == 'substrate':
+                    x1[s] = self.EmptySubstrateThreshold
+                elif eventlist[k][0] == 'zero':
+                    x1[eventlist[k][2]] = 0
+                else:
+                    x1[eventlist[k][0]] = 0
+            
+            if store_trajectory:
+                tout = np.arange(np.floor(t/outputinterval) + 1,np.ceil(t1/outputinterval)) * outputinterval
+                tout = tout[(tout > t) & (tout < t1)]
+                if len(tout) > 0:
+                    localtraj.append(np.concatenate([tout[:,np.newaxis],sol.sol(tout).T],axis = 1))
+                localtraj.append(np.concatenate([[t1],x1]))
+            t,x = t1,x1
+        
+        if store_trajectory:
+            return np.vstack(localtraj)
+        else:
+            return x
+    
+    def TrajectorySolveIVPIntegrator(self,initialcells,TimeOutput = False):
+        traj = self.SolveIVPIntegrator(initialcells,store_trajectory = True)
+        if TimeOutput:
+            return traj
+        else:
+            return traj[:,1:]
+    
+    def GrowthSolveIVPIntegrator(self,initialcells):
+        return self.SolveIVPIntegrator(initialcells)[:self.numstrains]
     
 
 
@@ -1400,6 +3460,14 @@ class GrowthDynamicsAntibiotics(GrowthDynamicsODE):
                                             np.sum(self.__params['PGproduction']*x[:-3]),      # production of public good
                                             -self.__params['PGreductionAB']*x[-1]*x[-2] ])])   # reduction of antibiotics by public good
     
+    def dynamicsArray(self,t,x):
+        bk = np.power(x[:,-1:],self.__params['kappa'])
+        a  = np.where(x[:,-3:-2] > 0,self.growthrates * (1 - (1+self.__params['gamma'])*bk/(bk + self.__params['gamma'])),0.)
+        return np.column_stack([    a*x[:,:-3],
+                                    -np.sum(a/self.yieldfactors*x[:,:-3],axis = 1),
+                                    np.sum(self.__params['PGproduction']*x[:,:-3],axis = 1),
+                                    -self.__params['PGreductionAB']*x[:,-1]*x[:,-2] ])
+    
     
     def ParameterString(self):
         r  = '\n'
@@ -1455,6 +3523,32 @@ class GrowthDynamicsAntibiotics2(GrowthDynamicsODE):
                                     ])
                                 ])
     
+    def dynamicsArray(self,t,x):
+        with np.errstate(invalid = 'ignore'):
+            bk = np.power(x[:,-1:],self.__params['kappa'])
+        beta   = np.where(x[:,-1:] >= 1e-10,(1. - bk)/(1 + bk/self.__params['gamma']),1.)
+        growth = x[:,-2:-1] > self.EmptySubstrateThreshold
+        a      = np.where(growth,self.growthrates * beta,0.)
+        a0     = np.where(growth,self.growthrates,0.)
+        return np.column_stack([
+                                a*x[:,:self.numstrains],
+                                -np.sum(a0/self.yieldfactors*x[:,:self.numstrains],axis = 1),
+                                -np.sum(self.__params['ProductionEfficiency']*x[:,:self.numstrains],axis = 1) * x[:,-1]
+                                ])
+    
+    def ExponentialPhaseEnd(self,x):
+        # without antibiotics, strains grow exponentially until substrate drops to 'EmptySubstrateThreshold'
+        return np.where(x[:,-1] < 1e-10,self.EmptySubstrateThreshold,np.nan)
+    
+    def StationaryAfterExponentialPhase(self):
+        # growth stops below 'EmptySubstrateThreshold'
+        return True
+    
+    def ExponentialPhaseState(self,x,t):
+        ret = super(GrowthDynamicsAntibiotics2,self).ExponentialPhaseState(x,t)
+        ret[:,-1] = x[:,-1] * np.exp(-np.sum(self.__params['ProductionEfficiency'] * x[:,:self.numstrains] * self.ExponentialPhaseIntegral(t),axis = 1))
+        return ret
+    
     def ParameterString(self):
         r  = '\n'
         s  = super(GrowthDynamicsAntibiotics2,self).ParameterString() +r
@@ -1518,6 +3612,25 @@ class GrowthDynamicsAntibiotics3(GrowthDynamicsODE):
                                     np.array([self.__params['BL_Diffusivity'] * np.sum(x[:self.numstrains] * (x[self.numstrains + 1:2*self.numstrains + 1] - x[-2]))]),
                                     np.array([self.__params['AB_Diffusivity'] * np.sum(x[:self.numstrains] * (x[2*self.numstrains + 1:3*self.numstrains + 1] - x[-1])) - self.__params['BL_Efficiency'] * x[-1] * x[-2]])
                                 ])
+    
+    def dynamicsArray(self,t,x):
+        n      = self.numstrains
+        ABint  = x[:,2*n + 1:3*n + 1]
+        BLint  = x[:,n + 1:2*n + 1]
+        with np.errstate(invalid = 'ignore'):
+            bk = np.power(ABint,self.__params['kappa'])
+        beta   = np.where(np.any(ABint >= self.__params['AB_Conc_threshold'],axis = 1)[:,np.newaxis],(1. - bk)/(1 + bk/self.__params['gamma']),1.)
+        growth = x[:,n:n+1] > self.EmptySubstrateThreshold
+        a      = np.where(growth,self.growthrates * beta,0.)
+        a0     = np.where(growth,self.growthrates,0.)
+        return np.column_stack([
+                                    a*x[:,:n],
+                                    -np.sum(a0/self.yieldfactors*x[:,:n],axis = 1),
+                                    self.__params['BL_Production'] * x[:,:n] - self.__params['BL_Diffusivity'] * (BLint - x[:,-2:-1]),
+                                    -self.__params['BL_Efficiency'] * BLint * ABint - self.__params['BL_Diffusivity'] * (ABint - x[:,-1:]),
+                                    self.__params['BL_Diffusivity'] * np.sum(x[:,:n] * (BLint - x[:,-2:-1]),axis = 1),
+                                    self.__params['AB_Diffusivity'] * np.sum(x[:,:n] * (ABint - x[:,-1:]),axis = 1) - self.__params['BL_Efficiency'] * x[:,-1] * x[:,-2]
+                                ])
 
     def ParameterString(self):
         r  = '\n'
@@ -1656,6 +3769,29 @@ class GrowthDynamicsAntibiotics5(GrowthDynamicsODE):
                             -np.dot(self.__params['EnzymeProductionActivity'],x[:self.numstrains]) # degradation of antibiotics
                             ])
                     ])
+    
+    def dynamicsArray(self,t,x):
+        growth = x[:,self.numstrains:self.numstrains+1] > self.EmptySubstrateThreshold
+        a      = np.where(growth,np.where(x[:,-1:] > 1,-self.growthrates * self.__params['gamma'],self.growthrates),0.)
+        ma0y   = np.where(growth,-self.growthrates,0.)/self.yieldfactors
+        return np.column_stack([
+                    a * x[:,:self.numstrains],
+                    np.sum(ma0y * x[:,:self.numstrains],axis = 1),
+                    -np.sum(self.__params['EnzymeProductionActivity'] * x[:,:self.numstrains],axis = 1)
+                    ])
+    
+    def ExponentialPhaseEnd(self,x):
+        # below MIC all strains grow exponentially until substrate drops to 'EmptySubstrateThreshold'
+        return np.where(x[:,-1] <= 1,self.EmptySubstrateThreshold,np.nan)
+    
+    def StationaryAfterExponentialPhase(self):
+        # growth stops below 'EmptySubstrateThreshold'
+        return True
+    
+    def ExponentialPhaseState(self,x,t):
+        ret = super(GrowthDynamicsAntibiotics5,self).ExponentialPhaseState(x,t)
+        ret[:,-1] = np.maximum(x[:,-1] - np.sum(self.__params['EnzymeProductionActivity'] * x[:,:self.numstrains] * self.ExponentialPhaseIntegral(t),axis = 1),0)
+        return ret
 
 
     def ParameterString(self):
@@ -1685,6 +3821,11 @@ class GrowthDynamicsPyoverdin(GrowthDynamicsODE):
         self.otherinitialconditions = np.array([self.env.substrate,self.__params['PVDconc'],self.env.substrate])
 
 
+    def hasSolveIVPSupport(self):
+        # strains keep growing on empty substrate, growth only stops in intermediate steps with negative substrate,
+        # final population sizes thus depend on the stepsize of 'OWNRK4' and cannot be reproduced by 'SolveIVP'
+        return False
+
     def dynamics(self,t,x):
         p = self.__params['PVDincreaseS'] if x[-1] <= self.env.substrate * self.__params['PVDmaxFactorS'] else 0
         if x[-3] >= 0:
@@ -1695,6 +3836,14 @@ class GrowthDynamicsPyoverdin(GrowthDynamicsODE):
                                                         np.sum(self.__params['PVDproduction']*x[:-3]),
                                                         p * x[-2]   ])])
 
+    def dynamicsArray(self,t,x):
+        p = np.where(x[:,-1] <= self.env.substrate * self.__params['PVDmaxFactorS'],self.__params['PVDincreaseS'],0)
+        a = np.where(x[:,-3:-2] >= 0,self.growthrates,0.)
+        return np.column_stack([    a*x[:,:-3],
+                                    np.sum(-a*x[:,:-3]/self.yieldfactors,axis = 1) + p * x[:,-2],
+                                    np.sum(self.__params['PVDproduction']*x[:,:-3],axis = 1),
+                                    p * x[:,-2] ])
+
     def ParameterString(self):
         r  = '\n'
         s  = super(GrowthDynamicsPyoverdin,self).ParameterString() +r
@@ -1733,6 +3882,14 @@ class GrowthDynamicsPyoverdin2(GrowthDynamicsODE):
                                                         np.sum(self.__params['PVDproduction']*x[:-3]),
                                                         p * x[-2]   ])])
 
+    def dynamicsArray(self,t,x):
+        p = np.where(x[:,-1] <= self.env.substrate * self.__params['PVDmaxFactorS'],self.__params['PVDincreaseS'],0)
+        a = np.where(x[:,-3:-2] > 0,self.growthrates,0.)
+        return np.column_stack([    a*x[:,:-3],
+                                    np.sum(-a*x[:,:-3]/self.yieldfactors,axis = 1) + p * x[:,-2],
+                                    np.sum(self.__params['PVDproduction']*x[:,:-3],axis = 1),
+                                    p * x[:,-2] ])
+
     
     def ParameterString(self):
         r = '\n'
@@ -1767,6 +3924,10 @@ class GrowthDynamicsPyoverdin3(GrowthDynamicsODE):
         else:
             raise NotImplementedError
         self.otherinitialconditions = np.concatenate([self.__params['InitialInternalIron'],np.array([self.env.substrate])])
+    
+    def getSubstrateIndex(self):
+        # internal iron for each strain is stored before substrate
+        return 2 * self.numstrains
         
     
     
@@ -1849,6 +4010,16 @@ class GrowthDynamicsPyoverdin4(GrowthDynamicsODE):
                                     np.array([-np.sum(a * x[:self.numstrains]/y)])
                               ])
 
+    def dynamicsArray(self,t,x):
+        n = np.sum(x[:,:self.numstrains],axis = 1)[:,np.newaxis]
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            y = np.where(n > 0,self.yieldfactors * (self.__params['YieldIncreaseFactor'] - (self.__params['YieldIncreaseFactor'] - 1.)*np.exp(-np.sum(self.__params['Production']*x[:,:self.numstrains],axis = 1)[:,np.newaxis]/n)),self.yieldfactors)
+        a = np.where(x[:,-1:] > 0,self.growthrates,0.)
+        return np.column_stack([
+                                    a * x[:,:self.numstrains],
+                                    -np.sum(a * x[:,:self.numstrains]/y,axis = 1)
+                              ])
+
                             
     def ParameterString(self):
         r  = '\n'
@@ -1892,6 +4063,16 @@ class GrowthDynamicsPyoverdin5(GrowthDynamicsODE):
                                               np.dot(self.__params['Production'],x[:self.numstrains]) ])
                               ])
 
+    def dynamicsArray(self,t,x):
+        n = np.sum(x[:,:self.numstrains],axis = 1)[:,np.newaxis]
+        y = np.where(n > 0,self.yieldfactors * (self.__params['YieldIncreaseFactor'] - (self.__params['YieldIncreaseFactor'] - 1.)*np.exp(-x[:,-1:])),self.yieldfactors)
+        a = np.where(x[:,-2:-1] > 0,self.growthrates,0.)
+        return np.column_stack([
+                                    a * x[:,:self.numstrains],
+                                    -np.sum(a * x[:,:self.numstrains]/y,axis = 1),
+                                    np.sum(self.__params['Production'] * x[:,:self.numstrains],axis = 1)
+                              ])
+
                             
     def ParameterString(self):
         r  = '\n'
@@ -1912,7 +4093,7 @@ class GrowthDynamicsApprox(GrowthDynamics):
         super(GrowthDynamicsApprox,self).__init__(**kwargs)
         
         self.__model = kwargs.get('model','GY')
-        self.__modelparameters = np.array(kwargs.get('modelparameters',[]),dtype = np.float)
+        self.__modelparameters = np.array(kwargs.get('modelparameters',[]),dtype = np.float64)
             
         # rewrite parameters for later use
         self.__a  = np.mean(self.growthrates)
@@ -1962,8 +4143,8 @@ class GrowthDynamicsResourceExtraction(GrowthDynamicsODE):
         super(GrowthDynamicsResourceExtraction,self).__init__(**kwargs)
         
         self.__params = dict()
-        self.__params['ExtractionMaxRate']     = np.array(kwargs.get('ExtractionMaxRate',     np.zeros(self.numstrains)),dtype=np.float)
-        self.__params['ExtractionKm']          = np.array(kwargs.get('ExtractionKm',          100. * np.ones(self.numstrains)), dtype=np.float)
+        self.__params['ExtractionMaxRate']     = np.array(kwargs.get('ExtractionMaxRate',     np.zeros(self.numstrains)),dtype=np.float64)
+        self.__params['ExtractionKm']          = np.array(kwargs.get('ExtractionKm',          100. * np.ones(self.numstrains)), dtype=np.float64)
         self.__params['InitiallyExtractedRes'] =          kwargs.get('InitiallyExtractedRes', 0)
     
         assert len(self.__params['ExtractionMaxRate']) == self.numstrains, 'Extraction rates not defined for each strain'
@@ -1989,6 +4170,15 @@ class GrowthDynamicsResourceExtraction(GrowthDynamicsODE):
                 ])
             ])
     
+    def dynamicsArray(self,t,x):
+        a    = np.where(x[:,self.numstrains:self.numstrains+1] > 0,self.growthrates * x[:,self.numstrains:self.numstrains+1],0.)
+        extr = np.where(x[:,self.numstrains+1] > 0,np.sum(x[:,:self.numstrains]*self.__params['ExtractionMaxRate']/(x[:,:self.numstrains] + self.__params['ExtractionKm']),axis = 1),0.)
+        return np.column_stack([
+            a * x[:,:self.numstrains],
+            extr - np.sum(a/self.yieldfactors * x[:,:self.numstrains],axis = 1),
+            -extr
+            ])
+    
     def ParameterString(self):
         r  = '\n'
         s  = super(GrowthDynamicsResourceExtraction,self).ParameterString() +r
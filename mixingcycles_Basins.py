@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+#-*- coding: utf-8 -*-
+
+'''
+==================================
+=  mixingcycles_Basins.py
+==================================
+
+    Computes basins of attraction of average inoculum dynamics
+    by iterating the cycle map from every cell of a lattice
+
+
+    Lukas Geyrhofer, l.geyrhofer@technion.ac.il, 2018
+
+'''
+
+
+import argparse
+import numpy as np
+import sys
+import growthclasses as gc
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser_io = parser.add_argument_group(description = "==== I/O parameters ====")
+    parser_io.add_argument("-i","--infile",required = True)
+    parser_io.add_argument("-o","--outfile",required = True)
+    parser_io.add_argument("-v","--verbose",default=False,action="store_true")
+
+    parser = gc.AddDilutionParameters(parser)
+
+    parser_lattice = parser.add_argument_group(description = "==== Lattice parameters ====")
+    parser_lattice.add_argument("-N","--maxInoculum",type=float,default=40,help = "lattice covers [0,N] x [0,N] in absolute inoculum sizes (n1,n2) [default: 40]")
+    parser_lattice.add_argument("-n","--stepInoculum",type=float,default=2,help = "lattice spacing [default: 2]")
+
+    parser_algorithm = parser.add_argument_group(description = "==== Algorithm parameters ====")
+    parser_algorithm.add_argument("-l","--maxsteps",type=int,default=1000,help = "cells without known fate after this number of cycles are labeled -1 [default: 1000]")
+    parser_algorithm.add_argument("-p","--precision",type=float,default=1e-10,help = "trajectories converged once all |dn| are smaller than this value (relative to grid size) [default: 1e-10]")
+    parser_algorithm.add_argument("-t","--clustertolerance",type=float,default=1e-4,help = "converged states closer than this value (relative to grid size) reached the same attractor, trajectories closer than this value to states leading to a stable attractor stop there [default: 1e-4]")
+    parser_algorithm.add_argument("-c","--cutoff",type=float,default=1e-100,help = "cutoff probabilities lower than this value, in iterations and for the stability of attractors [default: 1e-100]")
+
+    parser = gc.AddSeedingTruncationParameters(parser)
+    parser = gc.AddSeedingCacheParameters(parser)
+    parser = gc.AddOutputFormatParameters(parser)
+
+    args = parser.parse_args()
+
+
+    g     = gc.LoadGM(readonly = True,**vars(args))
+    dlist = np.array(gc.getDilutionList(**vars(args)),dtype=np.float64)
+    gc.SeedingTruncation.tolerance = args.truncationtolerance
+    gc.SeedingVectorCache.SetMaxBytes(args.seedingcachesize * 2**20)
+    gc.SeedingVectorCache.SetMantissaBits(args.seedingcachebits)
+    mx,my = g.growthmatrixgrid
+    scale = np.array([mx[-1],my[-1]],dtype=np.float64)
+
+    if args.verbose:
+        sys.stderr.write(str(g))
+
+    axis1,axis2 = gc.getInoculumAxes(AbsoluteCoordinates = True,maxInoculum = args.maxInoculum,stepInoculum = args.stepInoculum)
+    shape       = (len(axis1),len(axis2))
+    numcells    = shape[0] * shape[1]
+
+    # one trajectory starts from every cell for every dilution, all of them are iterated at once
+    # 'labels' holds the index of the fixed point reached from each cell (-1 as long as the fate of the cell is unknown)
+    # states visited by trajectories that converged to a stable attractor are stored in 'memo', binned in boxes of size 'clustertolerance':
+    # trajectories entering such a box are closer than 'clustertolerance' to a state with known fate, and stop with this fate.
+    # unstable fixed points (e.g. the origin) never enter 'memo', as trajectories close to them can still leave
+    # 'history' holds the states visited by all active trajectories, one entry (trajectory indices,states) per step
+    m1,m2      = gc.getInoculumMatrices(axis1,axis2)
+    state      = np.tile(np.column_stack([m1.flatten(),m2.flatten()]),(len(dlist),1))
+    dilutionid = np.repeat(np.arange(len(dlist)),numcells)
+    origin     = np.tile(np.arange(numcells),len(dlist))
+    labels     = -np.ones((len(dlist),numcells),dtype=int)
+    active     = np.ones(len(state),dtype=bool)
+    history    = [(np.arange(len(state)),state.copy())]
+    attractors = [list() for dilution in dlist]
+    stable     = [list() for dilution in dlist]
+    memo       = [dict() for dilution in dlist]
+    boxsize    = args.clustertolerance * scale
+
+    def Attractor(k,n):
+        # index of fixed point at 'n' for dilution index 'k', new fixed points are appended to the list with their stability
+        for a,attractor in enumerate(attractors[k]):
+            if np.all(np.abs(attractor - n) <= args.clustertolerance * scale):
+                return a
+        j = gc.SeedingIterationMap(g.growthmatrix[:,:,:2],n,dlist[k],axis1 = mx,axis2 = my,cutoff = args.cutoff,jacobian = True)[1][0]
+        attractors[k].append(n.copy())
+        stable[k].append(bool(np.all(np.abs(np.linalg.eigvals(j)) < 1)))
+        return len(attractors[k]) - 1
+
+    def Boxes(n):
+        return [tuple(b) for b in np.floor(n/boxsize).astype(np.int64).tolist()]
+
+    for i in range(args.maxsteps):
+        if not np.any(active):
+            break
+        if args.verbose:
+            sys.stderr.write("# computing step {} for {} trajectories\n".format(i+1,np.sum(active)))
+
+        idx        = np.flatnonzero(active)
+        if gc.ExtendGMForSeeding(g,state[idx],**vars(args)):
+            # boxes are measured relative to the grid size, states stored so far are forgotten
+            mx,my   = g.growthmatrixgrid
+            scale   = np.array([mx[-1],my[-1]],dtype=np.float64)
+            boxsize = args.clustertolerance * scale
+            memo    = [dict() for dilution in dlist]
+        n          = gc.SeedingIterationMap(g.growthmatrix[:,:,:2],state[idx],dlist[dilutionid[idx]],axis1 = mx,axis2 = my,cutoff = args.cutoff)
+        change     = np.max(np.abs(n - state[idx])/scale[np.newaxis,:],axis = 1)
+        state[idx] = n
+        history.append((idx,n))
+
+        # trajectories close to a state with known fate stop and reuse that fate ...
+        fate       = np.array([memo[k].get(box,-1) for k,box in zip(dilutionid[idx],Boxes(n))],dtype=int)
+        # ... converged trajectories identify (or add) their fixed point
+        for k in np.flatnonzero((fate < 0) & (change <= args.precision)):
+            fate[k] = Attractor(dilutionid[idx[k]],n[k])
+
+        resolved   = np.flatnonzero(fate >= 0)
+        labels[dilutionid[idx[resolved]],origin[idx[resolved]]] = fate[resolved]
+        active[idx[resolved]] = False
+
+        # all states visited on the way to a stable attractor lead there as well
+        tfate      = -np.ones(len(state),dtype=int)
+        for k in resolved:
+            if stable[dilutionid[idx[k]]][fate[k]]:
+                tfate[idx[k]] = fate[k]
+        if np.any(tfate >= 0):
+            for hidx,hstate in history:
+                sel = tfate[hidx] >= 0
+                for k,box,f in zip(dilutionid[hidx[sel]],Boxes(hstate[sel]),tfate[hidx[sel]]):
+                    memo[k].setdefault(box,f)
+
+        # only states of trajectories that are still active are needed
+        history    = [(hidx[active[hidx]],hstate[active[hidx]]) for hidx,hstate in history]
+
+    if args.verbose and np.any(active):
+        sys.stderr.write("# {} cells without known fate after {} steps\n".format(np.sum(labels < 0),args.maxsteps))
+
+
+    # label raster for each dilution, axis1 (n1) along rows and axis2 (n2) along columns
+    for k,dilution in enumerate(dlist):
+        if args.verbose:
+            sys.stderr.write("# writing basins for D = {:e}\n".format(dilution))
+        if args.format == 'text':
+            np.savetxt(args.outfile + "_D{:.3e}".format(dilution),labels[k].reshape(shape),fmt = "%d")
+        else:
+            # one row per cell, segments are rows of the raster
+            gc.WriteColumns(args.outfile + "_D{:.3e}".format(dilution),{'n1':m1,'n2':m2,'label':labels[k]},offsets = gc.SegmentOffsets(np.repeat(shape[1],shape[0])),format = args.format)
+
+    # attractor table with stability from the linearized cycle map
+    table = list()
+    for k,dilution in enumerate(dlist):
+        if len(attractors[k]) == 0:
+            continue
+        n   = np.array(attractors[k])
+        j   = gc.SeedingIterationMap(g.growthmatrix[:,:,:2],n,dilution,axis1 = mx,axis2 = my,cutoff = args.cutoff,jacobian = True)[1]
+        w   = np.linalg.eigvals(j)
+        w   = np.take_along_axis(w,np.argsort(-np.abs(w),axis = 1),axis = 1)
+        for a in range(len(n)):
+            table.append((dilution,a,n[a,0],n[a,1],np.sum(labels[k] == a),np.real(w[a,0]),np.real(w[a,1])))
+
+    if args.format == 'text':
+        fp = open(args.outfile + "_attractors","w")
+        fp.write("# dilution label n1 n2 cells re(l1) re(l2)\n")
+        for row in table:
+            fp.write("{:13.6e} {:4d} {:13.6e} {:13.6e} {:6d} {:13.6e} {:13.6e}\n".format(*row))
+        fp.close()
+    else:
+        names   = ['dilution','label','n1','n2','cells','re_l1','re_l2']
+        dtypes  = [np.float64,int,np.float64,np.float64,int,np.float64,np.float64]
+        gc.WriteColumns(args.outfile + "_attractors",{name:np.array([row[c] for row in table],dtype = dtypes[c]) for c,name in enumerate(names)},format = args.format)
+
+    if args.verbose:
+        sys.stderr.write(str(gc.SeedingVectorCache))
+        sys.stderr.write(str(gc.SeedingTruncation))
+
+
+if __name__ == "__main__":
+    main()
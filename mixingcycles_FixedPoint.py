@@ -32,113 +32,171 @@ def main():
     parser = gc.AddDilutionParameters(parser)
 
     parser_algorithm = parser.add_argument_group(description = "==== Algorithm parameters ====")
-    parser_algorithm.add_argument("-N","--newtonraphson",action="store_true",default=False,help = "Plain iteration of dynamics or try to use NR to estimate fixed point")
+    parser_algorithm.add_argument("-N","--newtonraphson",action="store_true",default=False,help = "Plain iteration of dynamics or try to use NR to estimate fixed point, steps are -1 where NR has no finite step (singular Jacobian)")
     parser_algorithm.add_argument("-p","--precision",type=float,default=1e-20,help = "relative precision as premature stopping condition, computed as sum( (dn/n)^2 ) [default: 1e-20]")
     parser_algorithm.add_argument("-M","--maxiterations",type=int,default=None, help = "maximum number of iterations [default: None, iterate until precision is reached]")
     parser_algorithm.add_argument("-A","--alpha",type=float,default=1.,help = "convergence parameter for NR [default: 1.0]")
     parser_algorithm.add_argument("-c","--cutoff",type=float,default=1e-100,help = "cutoff probabilities lower than this value [default: 1e-100]")
 
+    parser_continuation = parser.add_argument_group(description = "==== Continuation of fixed points in dilution ====")
+    parser_continuation.add_argument("-T","--continuation",action="store_true",default=False,help = "follow fixed point from DILUTIONMIN to DILUTIONMAX by pseudo-arclength continuation in log(dilution) and locate bifurcations")
+    parser_continuation.add_argument("-B","--branchfile",default=None,help = "write branch with columns (dilution, n1, n2, re(l1), im(l1), re(l2), im(l2), type) to this file [default: stdout]")
+    parser_continuation.add_argument("--continuationstep",type=float,default=.05,help = "initial arclength step [default: 0.05]")
+    parser_continuation.add_argument("--continuationmaxstep",type=float,default=.5,help = "maximal arclength step [default: 0.5]")
+    parser_continuation.add_argument("--continuationmaxpoints",type=int,default=1000,help = "maximal number of points on branch [default: 1000]")
+
+    parser_multistart = parser.add_argument_group(description = "==== Multi-start search for all fixed points ====")
+    parser_multistart.add_argument("-m","--multistart",type=int,default=None,help = "start NR from COUNT x COUNT points covering the grid for each dilution and report all distinct fixed points, the stepcount column then holds the number of start points converging to each fixed point [default: None]")
+    parser_multistart.add_argument("--startpoints",choices = ['lattice','halton'],default='lattice',help = "regular lattice or quasi-random Halton sequence as start points [default: lattice]")
+    parser_multistart.add_argument("--clustertolerance",type=float,default=1e-6,help = "fixed points closer than this value (relative to grid size) are identical, also used as tolerance for residuals [default: 1e-6]")
+    parser_multistart.add_argument("--multistartmaxiterations",type=int,default=100,help = "maximum number of NR iterations for each start point, used when MAXITERATIONS is not set [default: 100]")
+
+    parser = gc.AddSeedingTruncationParameters(parser)
+    parser = gc.AddSeedingCacheParameters(parser)
+    parser = gc.AddOutputFormatParameters(parser)
+
     parser_general = parser.add_argument_group(description = "==== General and I/O parameters ====")
     parser_general.add_argument("-v","--verbose",action="store_true",default=False,help = "output current values every iteration step")
     parser_general.add_argument("-V","--printeigenvectors",default=False,action="store_true",help = "print eigenvectors of linearized iteration map")
     parser_general.add_argument("-I","--initialconditions",default=None,nargs="*",help="Override initial conditions when set")
     parser_general.add_argument("-S","--stayonfixedpoint",default=False,action="store_true",help="Keep fixed point from previous dilution as initial conditions")
     parser_general.add_argument("-C","--complexOutput",default=False,action="store_true",help="Print real and imaginary parts of eigenvalues (and eigenvectors) [default: only real]")
+    parser_general.add_argument("-o","--outfile",default=None,help="write fixed points to this file [default: stdout, only for text format]")
     args = parser.parse_args()
 
+    if args.format != 'text' and (args.branchfile if args.continuation else args.outfile) is None:
+        raise ValueError("output format '{}' needs {}".format(args.format,'BRANCHFILE' if args.continuation else 'OUTFILE'))
 
-    g     = gc.LoadGM(**vars(args))
+
+    g     = gc.LoadGM(readonly = True,**vars(args))
     dlist = gc.getDilutionList(**vars(args))
+    gc.SeedingTruncation.tolerance = args.truncationtolerance
+    gc.SeedingVectorCache.SetMaxBytes(args.seedingcachesize * 2**20)
+    gc.SeedingVectorCache.SetMantissaBits(args.seedingcachebits)
 
-    gm1   = g.growthmatrix[:,:,0]
-    gm2   = g.growthmatrix[:,:,1]
     mx,my = g.growthmatrixgrid
+    dlist = np.array(dlist,dtype=np.float64)
 
 
-    for i,dilution in enumerate(dlist):
-
-        
-        if args.initialconditions is None:
-            # initial condition are the respective (approximated) fixed points on the axis
+    # initial conditions for all dilutions
+    if args.initialconditions is None:
+        # initial condition are the respective (approximated) fixed points on the axis
+        n0 = list()
+        for dilution in dlist:
             g.setDilution(dilution)
-            n = g.getSingleStrainFixedPointsApproximate()
-        elif (not args.stayonfixedpoint) or (i == 0):
-            n   = np.array(args.initialconditions,dtype=float)
-            assert len(n) == g.numstrains
+            n0.append(g.getSingleStrainFixedPointsApproximate())
+        n0 = np.array(n0,dtype=np.float64)
+    else:
+        n0 = np.array(args.initialconditions,dtype=float)
+        assert len(n0) == g.numstrains
+        n0 = np.repeat(n0[np.newaxis,:],len(dlist),axis = 0)
+
+    if args.continuation:
+        if args.dilutionmax is None:
+            raise ValueError("continuation needs both DILUTIONMIN and DILUTIONMAX")
+        # fixed point at first dilution is starting point of the branch
+        n,stepcount = gc.SeedingFixedPoints(g.growthmatrix[:,:,:2],n0[0],dlist[0],axis1 = mx,axis2 = my,cutoff = args.cutoff,precision = args.precision,maxiterations = args.maxiterations,alpha = args.alpha,newtonraphson = True,verbose = args.verbose)
+        if gc.ExtendGMForSeeding(g,n,**vars(args)):
+            mx,my = g.growthmatrixgrid
+        branch = gc.SeedingContinuation(g.growthmatrix[:,:,:2],n[0],dlist[0],args.dilutionmax,axis1 = mx,axis2 = my,cutoff = args.cutoff,step = args.continuationstep,maxstep = args.continuationmaxstep,maxpoints = args.continuationmaxpoints)
+        if args.verbose:
+            for b in branch[branch[:,-1] > 0]:
+                sys.stderr.write("# bifurcation (type {:d}) at D = {:13.6e}, n = ({:13.6e}, {:13.6e})\n".format(int(b[-1]),b[0],b[1],b[2]))
+        if args.format == 'text':
+            np.savetxt(sys.stdout if args.branchfile is None else args.branchfile,branch,fmt = ["%13.6e"] * 7 + ["%d"])
         else:
-            # n is already defined from previous dilution
-            pass
+            names = ['dilution','n1','n2','re_l1','im_l1','re_l2','im_l2']
+            columns = dict([(name,branch[:,k]) for k,name in enumerate(names)] + [('type',branch[:,-1].astype(int))])
+            gc.WriteColumns(args.branchfile,columns,format = args.format)
+        return
+
+    solverparameters = {'axis1':mx, 'axis2':my, 'cutoff':args.cutoff, 'precision':args.precision, 'maxiterations':args.maxiterations, 'alpha':args.alpha, 'newtonraphson':args.newtonraphson, 'verbose':args.verbose}
+
+    def SolveOnExtendedGrid(n,dilutions,stepcount):
+        # with --extendgrowthmatrix, fixed points close to the end of the grid are iterated further on the extended grid
+        while gc.ExtendGMForSeeding(g,n,**vars(args)):
+            solverparameters.update(dict(zip(['axis1','axis2'],g.growthmatrixgrid)))
+            n,steps    = gc.SeedingFixedPoints(g.growthmatrix[:,:,:2],n,dilutions,**solverparameters)
+            stepcount  = np.where((stepcount < 0) | (steps < 0),-1,stepcount + steps)
+        return n,stepcount
+
+    if not args.multistart is None:
+        # Newton iterations from all start points for all dilutions at once, not every start point converges
+        starts  = gc.SeedingStartPoints(mx,my,count = args.multistart,method = args.startpoints)
+        nstarts = np.tile(starts,(len(dlist),1))
+        dstarts = np.repeat(dlist,len(starts))
+        solverparameters.update({'newtonraphson':True, 'maxiterations':args.multistartmaxiterations if args.maxiterations is None else args.maxiterations})
+        n,stepcount = gc.SeedingFixedPoints(g.growthmatrix[:,:,:2],nstarts,dstarts,**solverparameters)
         
+        # keep roots within the grid with small residuals, then merge roots found from several start points
+        scale     = np.array([mx[-1],my[-1]],dtype=np.float64)
+        growth    = gc.SeedingIterationMap(g.growthmatrix[:,:,:2],n,dstarts,axis1 = mx,axis2 = my,cutoff = args.cutoff)
+        converged = np.all(np.abs(growth - n) <= args.clustertolerance * scale,axis = 1) & np.all(n <= scale,axis = 1) & (stepcount >= 0)
+        n[converged],stepcount[converged] = SolveOnExtendedGrid(n[converged],dstarts[converged],stepcount[converged])
+        scale     = np.array([g.growthmatrixgrid[0][-1],g.growthmatrixgrid[1][-1]],dtype=np.float64)
+        n,dlist,stepcount = gc.ClusterFixedPoints(n[converged],dstarts[converged],tolerance = args.clustertolerance,scale = scale)
+        if args.verbose:
+            sys.stderr.write("# {:d} of {:d} start points converged to {:d} fixed points\n".format(np.sum(converged),len(converged),len(n)))
+    elif args.stayonfixedpoint and not args.initialconditions is None:
+        # fixed point from previous dilution is initial condition for the next one, dilutions have to be solved sequentially
+        n         = np.zeros((len(dlist),2))
+        stepcount = np.zeros(len(dlist),dtype=int)
+        for i,dilution in enumerate(dlist):
+            ninit = n0[i] if i == 0 else n[i-1]
+            n[i:i+1],stepcount[i:i+1] = gc.SeedingFixedPoints(g.growthmatrix[:,:,:2],ninit,dilution,**solverparameters)
+    else:
+        # Newton iterations for all dilutions at once
+        n,stepcount = gc.SeedingFixedPoints(g.growthmatrix[:,:,:2],n0,dlist,**solverparameters)
+    
+    if args.multistart is None:
+        n,stepcount = SolveOnExtendedGrid(n,dlist,stepcount)
+    mx,my = g.growthmatrixgrid
 
-        dn         = n                  # increase in one step
-        j          = np.zeros((2,2))    # jacobian
-        stepcount  = 0                  # number of steps for debugging
-
-        while np.sum((dn[n>0]/n[n>0])**2) > args.precision:
-            if args.verbose:
-                sys.stderr.write("{:4d} {:13.6e} {:13.6e}\n".format(stepcount,n[0],n[1]))
-            
-            # probabilities for seeding new droplets, assumed to be poissonian
-            px,dpx = gc.PoissonSeedingVectors(mx,[n[0]],cutoff = args.cutoff,diff=True)
-            py,dpy = gc.PoissonSeedingVectors(my,[n[1]],cutoff = args.cutoff,diff=True)
-            
-            # construct iteration function for growth and dilution
-            # by weighting growth with the probability of how droplets are seeded
-            growth1 = np.dot(py[0], np.dot(px[0], gm1 * dilution))
-            growth2 = np.dot(py[0], np.dot(px[0], gm2 * dilution))
-            fn = np.array([growth1,growth2]) - n
-            
-            if args.newtonraphson:
-                # NR iterations 
-
-                # get jacobian of dynamics
-                j[0,0] = np.dot( py[0], np.dot(dpx[0], gm1 * dilution)) - 1.
-                j[0,1] = np.dot(dpy[0], np.dot( px[0], gm1 * dilution))
-                j[1,0] = np.dot( py[0], np.dot(dpx[0], gm2 * dilution))
-                j[1,1] = np.dot(dpy[0], np.dot( px[0], gm2 * dilution)) - 1.
-                
-                # calculate step in NR iteration
-                dn = -args.alpha * np.dot(np.linalg.inv(j),fn)
-            
-            else:
-                # simple iteration of the function, hoping it converges at some point
-                dn = fn
-            
-            # apply changes
-            n += dn
-            n[n<0] = 0
-            
-            if not args.maxiterations is None:
-                if stepcount > args.maxiterations:
-                    break
-            stepcount += 1
-
-
-        # stability of fixed point is checked with jacobian
-        px,dpx = gc.PoissonSeedingVectors(mx,[n[0]],cutoff = args.cutoff,diff=True)
-        py,dpy = gc.PoissonSeedingVectors(my,[n[1]],cutoff = args.cutoff,diff=True)
-
-        j[0,0] = np.dot( py[0], np.dot(dpx[0], gm1 * dilution))
-        j[0,1] = np.dot(dpy[0], np.dot( px[0], gm1 * dilution))
-        j[1,0] = np.dot( py[0], np.dot(dpx[0], gm2 * dilution))
-        j[1,1] = np.dot(dpy[0], np.dot( px[0], gm2 * dilution))
-
-
-        w,v = np.linalg.eig(j)
+
+    # stability of fixed point is checked with (stacked) jacobians
+    growth,j = gc.SeedingIterationMap(g.growthmatrix[:,:,:2],n,dlist,axis1 = mx,axis2 = my,cutoff = args.cutoff,jacobian = True)
+    w,v      = np.linalg.eig(j)
+
+    if args.format != 'text':
+        # same columns as text output, eigenvectors are (v1_1,v1_2) and (v2_1,v2_2)
+        columns = {'dilution':dlist, 'growthratio':np.repeat(g.growthrates[1]/g.growthrates[0],len(dlist)), 'yieldratio':np.repeat(g.yieldfactors[1]/g.yieldfactors[0],len(dlist)),
+                   'n1':n[:,0], 'n2':n[:,1], 'steps':np.asarray(stepcount,dtype=int), 're_l1':w[:,0].real, 're_l2':w[:,1].real}
+        if args.complexOutput:
+            columns.update({'im_l1':w[:,0].imag, 'im_l2':w[:,1].imag})
+        parts = [('re',np.real)] + ([('im',np.imag)] if args.complexOutput else [])
+        if args.printeigenvectors:
+            for part,f in parts:
+                columns.update({'{}_v{}_{}'.format(part,a+1,b+1):f(v[:,b,a]) for a in range(2) for b in range(2)})
+        gc.WriteColumns(args.outfile,columns,format = args.format)
+        if args.verbose:
+            sys.stderr.write(str(gc.SeedingVectorCache))
+            sys.stderr.write(str(gc.SeedingTruncation))
+        return
+
+    fp = sys.stdout if args.outfile is None else open(args.outfile,"w")
+
+
+    for i,dilution in enumerate(dlist):
 
         # final output
 
-        outputstring  = "{:13.6e} {:8.6f} {:8.6f} {:13.6e} {:13.6e} {:4d}".format(dilution,g.growthrates[1]/g.growthrates[0], g.yieldfactors[1]/g.yieldfactors[0], n[0], n[1], stepcount)
-        outputstring += " {:13.6e} {:13.6e}".format(re(w[0]),re(w[1]))
+        outputstring  = "{:13.6e} {:8.6f} {:8.6f} {:13.6e} {:13.6e} {:4d}".format(dilution,g.growthrates[1]/g.growthrates[0], g.yieldfactors[1]/g.yieldfactors[0], n[i,0], n[i,1], stepcount[i])
+        outputstring += " {:13.6e} {:13.6e}".format(re(w[i,0]),re(w[i,1]))
         if args.complexOutput:
             # have yet to find complex eigenvalues (NB: they exist for antibiotics dynamics)
-            outputstring += " {:13.6e} {:13.6e}".format(im(w[0]),im(w[1]))
+            outputstring += " {:13.6e} {:13.6e}".format(im(w[i,0]),im(w[i,1]))
 
         if args.printeigenvectors:
-            outputstring += " {:13.6e} {:13.6e} {:13.6e} {:13.6e}".format(re(v[0,0]),re(v[1,0]),re(v[0,1]),re(v[1,1]))
+            outputstring += " {:13.6e} {:13.6e} {:13.6e} {:13.6e}".format(re(v[i,0,0]),re(v[i,1,0]),re(v[i,0,1]),re(v[i,1,1]))
             if args.complexOutput:
-                outputstring += " {:13.6e} {:13.6e} {:13.6e} {:13.6e}".format(im(v[0][0]),im(v[0][1]),im(v[1][0]),im(v[1][1]))
-        sys.stdout.write(outputstring + "\n")
+                outputstring += " {:13.6e} {:13.6e} {:13.6e} {:13.6e}".format(im(v[i,0,0]),im(v[i,0,1]),im(v[i,1,0]),im(v[i,1,1]))
+        fp.write(outputstring + "\n")
+    if not args.outfile is None:
+        fp.close()
+
+    if args.verbose:
+        sys.stderr.write(str(gc.SeedingVectorCache))
+        sys.stderr.write(str(gc.SeedingTruncation))
 
                 
 if __name__ == "__main__":
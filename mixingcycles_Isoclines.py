@@ -22,7 +22,15 @@ from skimage import measure
 import growthclasses as gc
 
 
-def write_contours_to_file(contours, filename, axis1, axis2):
+def write_contours_to_file(contours, filename, axis1, axis2, format = 'text', names = ('n','x')):
+    if format != 'text':
+        # all contours in one table, with offsets to the start of each contour
+        coords = [np.zeros(0),np.zeros(0)]
+        if len(contours) > 0:
+            c      = np.concatenate(contours)
+            coords = [np.interp(c[:,k],np.arange(len(axis)),axis) for k,axis in enumerate([axis1,axis2])]
+        gc.WriteColumns(filename,dict(zip(names,coords)),offsets = gc.SegmentOffsets([len(c) for c in contours]),format = format)
+        return
     fp = open(filename,"w")
     for c in contours:
         for i in range(len(c)):
@@ -49,35 +57,32 @@ def main():
 
     parser = gc.AddLatticeParameters(parser)
     parser = gc.AddDilutionParameters(parser)
+    parser = gc.AddOutputFormatParameters(parser)
 
     args=parser.parse_args()
 
-    g     = gc.LoadGM(**vars(args))
+    g     = gc.LoadGM(readonly = True,**vars(args))
     dlist = gc.getDilutionList(**vars(args))
 
     # get new axes, which depends on parameters above (in lattice parameter group)
     axis1,axis2 = gc.getInoculumAxes(**vars(args)) # either (n,x) or [ (n1,n2) if args.AbsoluteCoordinates == True ]
     shape       = (len(axis1),len(axis2))
+    names       = ('n1','n2') if args.AbsoluteCoordinates else ('n','x')
 
     # loaded from pickle file
     m1,m2       = g.growthmatrixgrid
-    gm1         = g.growthmatrix[:,:,0]
-    gm2         = g.growthmatrix[:,:,1]
 
     # matrices to store averages
-    g1          = np.zeros(shape,dtype=np.float64) # avg'd growth strain 1
-    g2          = np.zeros(shape,dtype=np.float64) # avg'd growth strain 2
     rr1         = np.zeros(shape,dtype=np.float64) # avg'd ratio of strains at end
     r1          = np.zeros(shape,dtype=np.float64) # avg'd ratio of strains at beginning
-    sn1         = np.zeros(shape,dtype=np.float64) # number of cells of strain 1 in new matrix shape
-    sn2         = np.zeros(shape,dtype=np.float64) # number of cells of strain 1 in new matrix shape
 
-    # get all averages and store them in the appropriate matrices
-    for i,a1 in enumerate(axis1):
-        for j,a2 in enumerate(axis2):
-            sn1[i,j],sn2[i,j] = gc.TransformInoculum([a1,a2],inabs = args.AbsoluteCoordinates, outabs = True)
-            g1[i,j] = gc.SeedingAverage(gm1, [sn1[i,j],sn2[i,j]])
-            g2[i,j] = gc.SeedingAverage(gm2, [sn1[i,j],sn2[i,j]])
+    # number of cells of both strains in new matrix shape
+    sn1,sn2     = gc.TransformInoculum(np.meshgrid(axis1,axis2,indexing = 'ij'),inabs = args.AbsoluteCoordinates, outabs = True)
+    
+    # get all averages (avg'd growth of strain 1 and 2) at once
+    avg         = gc.SeedingAverageArray(g.growthmatrix[:,:,:2],np.column_stack([sn1.flatten(),sn2.flatten()]),axis1 = m1,axis2 = m2)
+    g1          = avg[:,0].reshape(shape)
+    g2          = avg[:,1].reshape(shape)
 
     rr1[g1+g2>0]  = (g1[g1+g2>0])/((g1+g2)[g1+g2>0])
     r1[sn1+sn2>0] = (sn1[sn1+sn2>0])/((sn1+sn2)[sn1+sn2>0])
@@ -86,18 +91,18 @@ def main():
     if args.verbose:
         sys.stdout.write('\n computing nullcline for fraction of strains\n')
     cont_xx = measure.find_contours(rr1 - r1,0)
-    write_contours_to_file(cont_xx,args.baseoutfilename + '_X',axis1,axis2)
+    write_contours_to_file(cont_xx,args.baseoutfilename + '_X',axis1,axis2,format = args.format,names = names)
 
     for dilution in dlist:
         if args.verbose:
             sys.stdout.write(' computing nullclines for dilution D = {:.4e}\n'.format(dilution))
         cont_nn = measure.find_contours((g1 + g2) * dilution - sn1 - sn2,0)
-        write_contours_to_file(cont_nn,args.baseoutfilename + '_N_D{:.3e}'.format(dilution),axis1,axis2)
+        write_contours_to_file(cont_nn,args.baseoutfilename + '_N_D{:.3e}'.format(dilution),axis1,axis2,format = args.format,names = names)
         if args.OutputSinglestrainNullclines:
             cont_n1 = measure.find_contours(g1 * dilution - sn1,0)
             cont_n2 = measure.find_contours(g2 * dilution - sn2,0)
-            write_contours_to_file(cont_n1,args.baseoutfilename + '_1_D{:.3e}'.format(dilution),axis1,axis2)
-            write_contours_to_file(cont_n2,args.baseoutfilename + '_2_D{:.3e}'.format(dilution),axis1,axis2)
+            write_contours_to_file(cont_n1,args.baseoutfilename + '_1_D{:.3e}'.format(dilution),axis1,axis2,format = args.format,names = names)
+            write_contours_to_file(cont_n2,args.baseoutfilename + '_2_D{:.3e}'.format(dilution),axis1,axis2,format = args.format,names = names)
 
                 
 if __name__ == "__main__":
@@ -31,26 +31,36 @@ def main():
 
     parser = gc.AddDilutionParameters(parser)
     parser = gc.AddLatticeParameters(parser)
+    parser = gc.AddOutputFormatParameters(parser)
     
     args = parser.parse_args()
 
-    g           = gc.LoadGM(**vars(args))
+    g           = gc.LoadGM(readonly = True,**vars(args))
     dlist       = gc.getDilutionList(**vars(args))
     axis1,axis2 = gc.getInoculumAxes(**vars(args)) # either (n,x) or [ (n1,n2) if args.AbsoluteCoordinates == True ]
 
-    gm1 = g.growthmatrix[:,:,0]
-    gm2 = g.growthmatrix[:,:,1]
+    mx,my       = g.growthmatrixgrid
+
+    # averages for all lattice points and both strains at once, independent of dilution
+    shape   = (len(axis1),len(axis2))
+    sn1,sn2 = gc.TransformInoculum(np.meshgrid(axis1,axis2,indexing = 'ij'),args.AbsoluteCoordinates,True)
+    avg     = gc.SeedingAverageArray(g.growthmatrix[:,:,:2],np.column_stack([sn1.flatten(),sn2.flatten()]),axis1 = mx,axis2 = my).reshape(shape + (2,))
 
     for dilution in dlist:
         if args.verbose:
             sys.stderr.write("# computing single step dynamics for D = {:e}\n".format(dilution))
-            
+        
+        nextcoord = gc.TransformInoculum([avg[:,:,0] * dilution,avg[:,:,1] * dilution],True,args.AbsoluteCoordinates)
+        if args.format != 'text':
+            # one segment for each value on axis1, as blocks in text output
+            names = ['n1','n2'] if args.AbsoluteCoordinates else ['n','x']
+            c1,c2 = np.meshgrid(axis1,axis2,indexing = 'ij')
+            gc.WriteColumns(args.outfile + "_D{:.3e}".format(dilution),dict(zip(names + [name + '_next' for name in names],[c1,c2,nextcoord[0],nextcoord[1]])),offsets = gc.SegmentOffsets(np.repeat(len(axis2),len(axis1))),format = args.format)
+            continue
         fp = open(args.outfile + "_D{:.3e}".format(dilution),"w")
         for i,a1 in enumerate(axis1):
             for j,a2 in enumerate(axis2):
-                next1 = gc.SeedingAverage(gm1, gc.TransformInoculum([a1,a2],args.AbsoluteCoordinates,True)) * dilution
-                next2 = gc.SeedingAverage(gm2, gc.TransformInoculum([a1,a2],args.AbsoluteCoordinates,True)) * dilution
-                fp.write('{} {} {} {}\n'.format(a1,a2,*gc.TransformInoculum([next1,next2],True,args.AbsoluteCoordinates)))
+                fp.write('{} {} {} {}\n'.format(a1,a2,nextcoord[0,i,j],nextcoord[1,i,j]))
             fp.write('\n')
         fp.close()
                 
@@ -40,11 +40,18 @@ def main():
     parser_lattice.add_argument("-x","--stepFraction",type=float,default=.05)
     parser_lattice.add_argument("-l","--trajectorylength",type=int,default=20)
     
+    parser = gc.AddSeedingTruncationParameters(parser)
+    parser = gc.AddSeedingCacheParameters(parser)
+    parser = gc.AddOutputFormatParameters(parser)
+    
     args = parser.parse_args()
 
 
-    g     = gc.LoadGM(**vars(args))
+    g     = gc.LoadGM(readonly = True,**vars(args))
     dlist = gc.getDilutionList(**vars(args))
+    gc.SeedingTruncation.tolerance = args.truncationtolerance
+    gc.SeedingVectorCache.SetMaxBytes(args.seedingcachesize * 2**20)
+    gc.SeedingVectorCache.SetMantissaBits(args.seedingcachebits)
 
     if args.initialcoordinatesfile is None:
         axis1,axis2 = gc.getInoculumAxes(**vars(args))
@@ -57,7 +64,7 @@ def main():
         initialcoordinates = list()
         for line in fp_coords.readlines():
             try:
-                values = np.array(line.split(),dtype=np.float)
+                values = np.array(line.split(),dtype=np.float64)
                 if len(values) >= 2:
                     initialcoordinates.append(gc.TransformInoculum(values[:2],args.AbsoluteCoordinates,args.AbsoluteCoordinates))
             except:
@@ -66,29 +73,55 @@ def main():
 
 
     mx,my = g.growthmatrixgrid
-    gm1   = g.growthmatrix[:,:,0]
-    gm2   = g.growthmatrix[:,:,1]
 
     if args.verbose:
         sys.stderr.write(str(g))
 
-    for dilution in dlist:
+    # all initial conditions for all dilutions are iterated at once,
+    # state of each step has shape (number of dilutions, number of initial conditions, 2)
+    dlist        = np.array(dlist,dtype=np.float64)
+    initialcells = gc.TransformInoculum(np.array(initialcoordinates,dtype=np.float64).reshape((-1,2)).T,args.AbsoluteCoordinates,True).T
+    trajectories = np.zeros((args.trajectorylength + 1,len(dlist),len(initialcells),2))
+    trajectories[0] = initialcells[np.newaxis,:,:]
+    
+    # trajectories are finished once both strains are extinct
+    length       = np.zeros((len(dlist),len(initialcells)),dtype=int)
+    active       = np.ones((len(dlist),len(initialcells)),dtype=bool)
+    dilutions    = np.repeat(dlist[:,np.newaxis],len(initialcells),axis = 1)
+
+    for i in range(args.trajectorylength):
+        if not np.any(active):
+            break
         if args.verbose:
-            sys.stderr.write("# computing trajectories for D = {:e}\n".format(dilution))
+            sys.stderr.write("# computing step {} for {} trajectories\n".format(i+1,np.sum(active)))
+        if gc.ExtendGMForSeeding(g,trajectories[i][active],**vars(args)):
+            mx,my = g.growthmatrixgrid
+        trajectories[i+1][active] = gc.SeedingAverageArray(g.growthmatrix[:,:,:2],trajectories[i][active],axis1 = mx,axis2 = my) * dilutions[active][:,np.newaxis]
+        length[active] = i+1
+        active = np.logical_and(active,np.any(trajectories[i+1] != 0,axis = -1))
+
+    outcoordinates = gc.TransformInoculum([trajectories[...,0],trajectories[...,1]],True,args.AbsoluteCoordinates)
+
+    for j,dilution in enumerate(dlist):
+        if args.verbose:
+            sys.stderr.write("# writing trajectories for D = {:e}\n".format(dilution))
+        if args.format != 'text':
+            # each trajectory is one segment, as separated by blank lines in text output
+            names = ['n1','n2'] if args.AbsoluteCoordinates else ['n','x']
+            steps = np.arange(args.trajectorylength + 1)[:,np.newaxis] <= length[j][np.newaxis,:]
+            gc.WriteColumns(args.outfile + "_D{:.3e}".format(dilution),{names[0]:outcoordinates[0,:,j].T[steps.T],names[1]:outcoordinates[1,:,j].T[steps.T]},offsets = gc.SegmentOffsets(length[j] + 1),format = args.format)
+            continue
         fp = open(args.outfile + "_D{:.3e}".format(dilution),"w")
-        for ic1,ic2 in initialcoordinates:
-            n1,n2 = gc.TransformInoculum([ic1,ic2],args.AbsoluteCoordinates,True)
-            fp.write("{} {}\n".format(*gc.TransformInoculum([n1,n2],True,args.AbsoluteCoordinates)))
-            for i in range(args.trajectorylength):
-                next1 = gc.SeedingAverage(gm1,[n1,n2]) * dilution
-                next2 = gc.SeedingAverage(gm2,[n1,n2]) * dilution
-                n1,n2 = next1,next2
-                fp.write("{} {}\n".format(*gc.TransformInoculum([n1,n2],True,args.AbsoluteCoordinates)))
-                if (n1==0) and (n2==0):
-                    break
+        for k in range(len(initialcells)):
+            for i in range(length[j,k] + 1):
+                fp.write("{} {}\n".format(outcoordinates[0,i,j,k],outcoordinates[1,i,j,k]))
             fp.write("\n")
         fp.close()
 
+    if args.verbose:
+        sys.stderr.write(str(gc.SeedingVectorCache))
+        sys.stderr.write(str(gc.SeedingTruncation))
+
                 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+
+# convert growthmatrix files between the binary format (see 'SaveBinaryGM' in growthclasses.py)
+# and pickle files, legacy pickle files written by python 2 can be read as well
+
+import argparse
+import sys
+
+sys.path.append(sys.path[0] + '/..')
+import growthclasses as gc
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-i","--infile",required = True)
+parser.add_argument("-o","--outfile",default=None)
+parser.add_argument("-O","--OverwriteInPlace",default=False,action="store_true")
+parser.add_argument("-f","--format",choices = ['binary','pickle'],default='binary',help = "format of output file [default: binary]")
+args = parser.parse_args()
+
+g = gc.LoadGM(infile = args.infile)
+
+if args.outfile is None:
+    if args.OverwriteInPlace:
+        # output is written to a temporary file first, then replaces the input file
+        args.outfile = args.infile
+    else:
+        raise IOError("no output file specified")
+
+gc.SaveGM(g,args.outfile,binary = (args.format == 'binary'))
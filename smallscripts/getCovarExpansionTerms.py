@@ -71,45 +71,57 @@ def main():
         fp = sys.stdout
 
     # compute averages for all inocula given by the two axes
+    # all required quantities are stacked and averaged at once for all inocula
+    # weights omega = N_ini * Xi / <N_ini * Xi> depend on the inoculum only via the denominator,
+    # hence averages containing omega are computed from averages with N_ini * Xi and divided afterwards
+    shape   = (len(a1_list),len(a2_list))
+    sn1,sn2 = gc.TransformInoculum(np.meshgrid(a1_list,a2_list,indexing = 'ij'),inabs = args.AbsoluteCoordinates, outabs = True)
+    wd_NXi  = wd_N_ini * wd_Xi
+    
+    quantities = np.stack([ gm1,
+                            gm2,
+                            gm1 * gm1,
+                            gm1 * gm2,
+                            wd_dX,
+                            wd_X_fin,
+                            wd_NXi,
+                            wd_Xi,
+                            wd_logXi,
+                            wd_X_ini,
+                            wd_X_ini * wd_NXi,
+                            wd_X_ini * wd_logXi,
+                            wd_X_ini * wd_NXi * wd_logXi,
+                            wd_X_ini * (2*wd_X_ini-1) * wd_logXi,
+                            (2*wd_X_ini-1) * wd_NXi * wd_logXi ],axis = -1)
+    
+    avg = gc.SeedingAverageArray(quantities,np.column_stack([sn1.flatten(),sn2.flatten()]),axis1 = m1,axis2 = m2)
+    avg = avg.reshape(shape + (quantities.shape[-1],))
+    
+    avg_N1,avg_N2,avg_N1N1,avg_N1N2,avg_dX,avg_X,avg_nXi,avg_Xi,avg_LogXi,avg_Xini,avg_XiniNXi,avg_XiniLogXi,avg_XiniNXiLogXi,avg_Xini2LogXi,avg_2XiniNXiLogXi = np.moveaxis(avg,-1,0)
+    
+    var_N1    = avg_N1N1 - avg_N1 * avg_N1
+    cov_N1N2  = avg_N1N2 - avg_N1 * avg_N2
+    
+    cov_XrelN = np.zeros(shape)
+    nonzero   = avg_N1 + avg_N2 > 0
+    cov_XrelN[nonzero] = avg_N1[nonzero]/(avg_N1[nonzero] + avg_N2[nonzero]) - avg_X[nonzero]
+    
+    # averages including omega, which is 0 if <N_ini * Xi> vanishes
+    inv_nXi   = np.zeros(shape)
+    inv_nXi[avg_nXi > 0] = 1./avg_nXi[avg_nXi > 0]
+    
+    # individual 4 terms for 2 strains in the expansion of Cov[X,N/<N>] up to O(da), weak selection limit
+    avg_exp1   =      avg_XiniNXi * inv_nXi - avg_Xini
+    avg_exp2   = da * (avg_XiniNXiLogXi * inv_nXi - avg_XiniLogXi)
+    avg_exp3A  = da * avg_Xini2LogXi
+    avg_exp3B1 =      avg_XiniNXi * inv_nXi
+    avg_exp3B2 =      avg_2XiniNXiLogXi * inv_nXi
+    avg_exp3B  = da * avg_exp3B1 * avg_exp3B2
+    
     for i,a1 in enumerate(a1_list):
         for j,a2 in enumerate(a2_list):
-            
-            inoc      = gc.TransformInoculum([a1,a2],inabs = args.AbsoluteCoordinates, outabs = True)
-            
-            avg_N1    = gc.SeedingAverage(gm1,       inoc)
-            avg_N2    = gc.SeedingAverage(gm2,       inoc)
-            avg_N1N1  = gc.SeedingAverage(gm1 * gm1, inoc)
-            avg_N1N2  = gc.SeedingAverage(gm1 * gm2, inoc)
-
-            avg_dX    = gc.SeedingAverage(wd_dX,     inoc)
-            avg_X     = gc.SeedingAverage(wd_X_fin,  inoc)
-            
-            
-            avg_nXi   = gc.SeedingAverage(wd_N_ini * wd_Xi, inoc)
-            if avg_nXi > 0: omega = wd_N_ini * wd_Xi / avg_nXi
-            else:           omega = 0
-            
-            var_N1    = avg_N1N1 - avg_N1 * avg_N1
-            cov_N1N2  = avg_N1N2 - avg_N1 * avg_N2
-                    
-            if avg_N1 + avg_N2 > 0:
-                cov_XrelN = avg_N1/(avg_N1 + avg_N2) - avg_X
-            else:
-                cov_XrelN = 0
-            
-            avg_Xi    = gc.SeedingAverage(wd_Xi,    inoc)
-            avg_LogXi = gc.SeedingAverage(wd_logXi, inoc)
-            
-            # individual 4 terms for 2 strains in the expansion of Cov[X,N/<N>] up to O(da), weak selection limit
-            avg_exp1   =      gc.SeedingAverage(wd_X_ini * (omega - 1),               inoc)
-            avg_exp2   = da * gc.SeedingAverage(wd_X_ini * (omega - 1) * wd_logXi,    inoc)
-            avg_exp3A  = da * gc.SeedingAverage(wd_X_ini * (2*wd_X_ini-1) * wd_logXi, inoc)
-            avg_exp3B1 =      gc.SeedingAverage(wd_X_ini * omega,                     inoc)
-            avg_exp3B2 =      gc.SeedingAverage((2*wd_X_ini-1) * omega * wd_logXi,    inoc)
-            avg_exp3B  = da * avg_exp3B1 * avg_exp3B2
-            
-            # output                                                                                             1   2   3       4          5         6         7                      8       9      
-            fp.write("{:14.6e} {:14.6e} {:14.6e} {:14.6e} {:14.6e} {:14.6e} {:14.6e} {:14.6e} {:14.6e}\n".format(a1, a2, avg_dX, cov_XrelN, avg_exp1, avg_exp2, avg_exp3A - avg_exp3B, avg_Xi, avg_LogXi))
+            # output                                                                                             1   2   3            4               5               6               7                                 8             9
+            fp.write("{:14.6e} {:14.6e} {:14.6e} {:14.6e} {:14.6e} {:14.6e} {:14.6e} {:14.6e} {:14.6e}\n".format(a1, a2, avg_dX[i,j], cov_XrelN[i,j], avg_exp1[i,j], avg_exp2[i,j], avg_exp3A[i,j] - avg_exp3B[i,j], avg_Xi[i,j], avg_LogXi[i,j]))
         fp.write("\n")
 
     if not args.baseoutfilename is None:
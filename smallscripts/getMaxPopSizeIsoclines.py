@@ -42,7 +42,7 @@ avgPopSize  = np.zeros((len(axis1),len(axis2)))
 
 for i,a in enumerate(axis1):
     for j,b in enumerate(axis2):
-        avgPopSize[i,j] = gc.SeedingAverage(gm1 + gm2,gc.getAbsoluteInoculumNumbers([a,b],args.newcoordinates))
+        avgPopSize[i,j] = gc.SeedingAverage(gm1 + gm2,gc.getAbsoluteInoculumNumbers([a,b],args.newcoordinates),axis1 = m1,axis2 = m2)
         
 avgPopSize /= np.max(avgPopSize)
 
@@ -0,0 +1,31 @@
+#-*- coding: utf-8 -*-
+
+# comparison checks for growthclasses.py, run with 'python -m pytest tests' from the repository root
+
+import os,sys
+import pytest
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import growthclasses as gc
+
+
+def SmallDynamics():
+    # analytic model with two strains, growthmatrix not computed yet (tests import it as 'from conftest import SmallDynamics')
+    return gc.AssignGrowthDynamics(GrowthDynamics = '',growthrates = [2.,1.],yieldfactors = [1.,2.],mixingtime = 24,substrateconcentration = 1e4)
+
+
+def SmallGrowthDynamics(step = 1,size = 40):
+    # growthmatrix of the small model is computed in milliseconds
+    g = SmallDynamics()
+    g.ComputeGrowthMatrix(size = size,step = step)
+    return g
+
+
+@pytest.fixture(scope = 'module')
+def unitgrid():
+    return SmallGrowthDynamics()
+
+
+@pytest.fixture(scope = 'module')
+def coarsegrid():
+    return SmallGrowthDynamics(step = 3,size = 60)
@@ -0,0 +1,33 @@
+#-*- coding: utf-8 -*-
+
+import os,sys,subprocess
+import numpy as np
+import growthclasses as gc
+
+
+SCRIPTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_basins_direct_iteration(tmp_path):
+    # origin is an unstable fixed point, all trajectories in the interior converge to the single attractor (0,1.596)
+    g = gc.AssignGrowthDynamics(GrowthDynamics = '',growthrates = [2.,1.],yieldfactors = [1.,2.],mixingtime = 24,substrateconcentration = 1e3)
+    g.ComputeGrowthMatrix(size = 52)
+    gc.SaveGM(g,str(tmp_path / 'gm.pkl'))
+    subprocess.check_call([sys.executable,os.path.join(SCRIPTDIR,'mixingcycles_Basins.py'),'-i',str(tmp_path / 'gm.pkl'),'-o',str(tmp_path / 'basins'),
+                           '-N','20','-n','2','-d','1e-3'],stderr = subprocess.DEVNULL)
+    labels     = np.loadtxt(str(tmp_path / 'basins_D1.000e-03'),dtype = int)
+    attractors = np.atleast_2d(np.loadtxt(str(tmp_path / 'basins_attractors')))
+
+    assert np.sum(labels == labels[0,0]) == 1
+    assert np.allclose(attractors[labels[0,0],2:4],[0,0])
+
+    mx,my = g.growthmatrixgrid
+    for cell in [(1,1),(5,5),(10,2),(0,3),(3,0)]:
+        n = np.array([cell],dtype = np.float64) * 2
+        for i in range(3000):
+            n = gc.SeedingIterationMap(g.growthmatrix[:,:,:2],n,1e-3,axis1 = mx,axis2 = my)
+        if labels[cell] >= 0:
+            assert np.allclose(attractors[labels[cell],2:4],n[0],atol = 1e-2)
+        else:
+            # trajectories along the axis n2 = 0 converge too slowly, cells stay unresolved
+            assert cell[1] == 0
@@ -0,0 +1,137 @@
+#-*- coding: utf-8 -*-
+
+import os,sys,subprocess,warnings
+import numpy as np
+import pytest
+import growthclasses as gc
+
+
+SCRIPTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DILUTIONS = [1e-4,2e-4,5e-4]
+
+
+@pytest.fixture(scope = 'module')
+def gmfile(tmp_path_factory):
+    # several fixed points at each dilution: origin, one on each axis
+    g = gc.AssignGrowthDynamics(GrowthDynamics = '',growthrates = [2.,1.],yieldfactors = [1.,2.],mixingtime = 24,substrateconcentration = 1e3)
+    g.ComputeGrowthMatrix(size = 52)
+    filename = str(tmp_path_factory.mktemp('gm') / 'gm.pkl')
+    gc.SaveGM(g,filename)
+    return filename
+
+
+def FixedPointScript(gmfile,*args):
+    output = subprocess.check_output([sys.executable,os.path.join(SCRIPTDIR,'mixingcycles_FixedPoint.py'),'-i',gmfile,'-d','1e-3','-D','5e-3','-K','3'] + list(args),stderr = subprocess.DEVNULL)
+    return output.decode().splitlines()
+
+
+def test_singular_jacobian(unitgrid,monkeypatch):
+    # Jacobian of the state at dilution 1 is made singular, only this state fails, all others converge as if solved alone
+    m    = unitgrid.growthmatrix[:,:,:2]
+    n0   = [[5.,5.]] * (len(DILUTIONS) + 1)
+    dlst = DILUTIONS + [1.]
+    reference = [gc.SeedingFixedPoints(m,n0[0],d) for d in DILUTIONS]
+
+    iterationmap = gc.SeedingIterationMap
+    def SingularIterationMap(matrix,n,dilutions,**kwargs):
+        result = iterationmap(matrix,n,dilutions,**kwargs)
+        if kwargs.get('jacobian',False):
+            result[1][np.broadcast_to(dilutions,(len(n),)) == 1.] = np.eye(2)
+        return result
+    monkeypatch.setattr(gc,'SeedingIterationMap',SingularIterationMap)
+
+    n,steps = gc.SeedingFixedPoints(m,n0,dlst)
+    assert steps[-1] == -1 and np.array_equal(n[-1],n0[-1])
+    for k,(nref,stepsref) in enumerate(reference):
+        assert np.allclose(n[k],nref[0],rtol = 1e-12,atol = 1e-12)
+        assert steps[k] > 0
+
+
+def test_seeding_cache(unitgrid):
+    # the common start point of all dilutions and strains going extinct reuse seeding vectors, fixed points do not change
+    m       = unitgrid.growthmatrix[:,:,:2]
+    cache   = gc.PoissonSeedingCache()
+    n,steps = gc.SeedingFixedPoints(m,[[5.,5.]] * len(DILUTIONS),DILUTIONS,cache = cache)
+    nref,stepsref = gc.SeedingFixedPoints(m,[[5.,5.]] * len(DILUTIONS),DILUTIONS,cache = False)
+    assert cache.hits >= len(DILUTIONS) and np.array_equal(n,nref) and np.array_equal(steps,stepsref)
+    
+    # with rounded inoculum sizes, nearly converged Newton iterations of a single state are served from the cache
+    exact   = gc.PoissonSeedingCache()
+    rounded = gc.PoissonSeedingCache(mantissabits = 20)
+    gc.SeedingFixedPoints(m,[5.,5.],DILUTIONS[-1],maxiterations = 20,cache = exact)
+    n,steps = gc.SeedingFixedPoints(m,[5.,5.],DILUTIONS[-1],maxiterations = 20,cache = rounded)
+    assert rounded.hits > exact.hits and np.allclose(n[0],nref[-1],rtol = 1e-6)
+
+
+def test_multistart(gmfile):
+    # fixed points found by a single Newton-Raphson iteration are among all fixed points of the multi-start search
+    g       = gc.LoadGM(infile = gmfile)
+    mx,my   = g.growthmatrixgrid
+    single  = np.loadtxt(FixedPointScript(gmfile,'-N'))
+    allfp   = np.loadtxt(FixedPointScript(gmfile,'-m','4'))
+    assert len(allfp) > len(single)
+    for row in single:
+        candidates = allfp[allfp[:,0] == row[0]]
+        assert np.any(np.all(np.abs(candidates[:,3:5] - row[3:5]) <= 1e-6 * mx[-1],axis = 1))
+    growth = gc.SeedingIterationMap(g.growthmatrix[:,:,:2],allfp[:,3:5],allfp[:,0],axis1 = mx,axis2 = my)
+    assert np.allclose(growth,allfp[:,3:5],atol = 1e-5 * mx[-1])
+
+
+def test_continuation(gmfile):
+    # points on the branch are fixed points, as found by Newton-Raphson iterations close to them
+    g       = gc.LoadGM(infile = gmfile)
+    mx,my   = g.growthmatrixgrid
+    m       = g.growthmatrix[:,:,:2]
+    n,steps = gc.SeedingFixedPoints(m,[1.,1.],1e-3,axis1 = mx,axis2 = my,newtonraphson = True)
+    # neither the corrector nor the bisection evaluates the map where Poisson seeding leaves the grid
+    gc.SeedingTruncation.Reset()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        branch  = gc.SeedingContinuation(m,n[0],1e-3,5e-3,axis1 = mx,axis2 = my)
+    assert np.isclose(branch[0,0],1e-3) and branch[-1,0] >= 5e-3 and len(branch) > 2
+    
+    points = branch[branch[:,-1] == 0]
+    nref,steps = gc.SeedingFixedPoints(m,points[:,1:3] * 1.01,points[:,0],axis1 = mx,axis2 = my,newtonraphson = True)
+    assert np.all(steps > 0)
+    assert np.allclose(points[:,1:3],nref,atol = 1e-8 * mx[-1])
+    growth,j = gc.SeedingIterationMap(m,nref,points[:,0],axis1 = mx,axis2 = my,jacobian = True)
+    w = np.linalg.eigvals(j)
+    w = np.take_along_axis(w,np.argsort(-np.abs(w),axis = 1),axis = 1)
+    assert np.allclose(points[:,3:7:2] + 1j * points[:,4:8:2],w,atol = 1e-6)
+
+
+def test_neimark_sacker(unitgrid,monkeypatch):
+    # map F(n) = D (v + R n) with a rotation R by 60 degrees has eigenvalues D exp(+-i pi/3),
+    # the fixed point (20,20) at D = 1 is a Neimark-Sacker point, and there is no other bifurcation
+    r = np.array([[.5,-np.sqrt(.75)],[np.sqrt(.75),.5]])
+    v = np.dot(np.eye(2) - r,[20.,20.])
+    def RotationMap(matrix,n,dilutions,jacobian = False,**kwargs):
+        d      = np.broadcast_to(np.array(dilutions,dtype=np.float64),(len(n),))[:,np.newaxis]
+        growth = d * (v[np.newaxis,:] + np.dot(n,r.T))
+        if not jacobian:
+            return growth
+        return growth,d[:,:,np.newaxis] * r[np.newaxis,:,:]
+    monkeypatch.setattr(gc,'SeedingIterationMap',RotationMap)
+    
+    n0     = np.linalg.solve(np.eye(2) - .5 * r,.5 * v)
+    # grid is large enough that Poisson seeding around the whole branch stays on it
+    grid   = np.arange(100)
+    branch = gc.SeedingContinuation(unitgrid.growthmatrix[:,:,:2],n0,.5,2.,axis1 = grid,axis2 = grid)
+    assert branch[-1,0] >= 2.
+    bifurcations = branch[branch[:,-1] > 0]
+    assert len(bifurcations) == 1 and bifurcations[0,-1] == 3
+    assert np.isclose(bifurcations[0,0],1.,rtol = 1e-6) and np.allclose(bifurcations[0,1:3],[20.,20.],rtol = 1e-5)
+    assert np.isclose(np.abs(bifurcations[0,3] + 1j * bifurcations[0,4]),1.,rtol = 1e-6)
+
+
+@pytest.mark.parametrize('format',['npy','npz'])
+def test_binary_output(gmfile,tmp_path,format):
+    # same columns as text output, which has 6 significant digits
+    text = np.loadtxt(FixedPointScript(gmfile,'-N'))
+    FixedPointScript(gmfile,'-N','--format',format,'-o',str(tmp_path / 'fp'))
+    data = np.load(str(tmp_path / ('fp.' + format)))
+    if format == 'npz':
+        data = data['data']
+    assert list(data.dtype.names) == ['dilution','growthratio','yieldratio','n1','n2','steps','re_l1','re_l2']
+    for k,name in enumerate(data.dtype.names):
+        assert np.allclose(data[name],text[:,k],rtol = 1e-6,atol = 1e-12)
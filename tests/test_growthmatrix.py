@@ -0,0 +1,110 @@
+#-*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import pytest
+import growthclasses as gc
+from conftest import SmallDynamics as Dynamics
+
+
+def Serial(size,step = 1):
+    g = Dynamics()
+    g.ComputeGrowthMatrix(size = size,step = step)
+    return g
+
+
+def AssertSameGrid(g1,g2):
+    for grid1,grid2 in zip(g1.growthmatrixgrid,g2.growthmatrixgrid):
+        assert np.array_equal(grid1,grid2)
+
+
+def test_workers():
+    g = Dynamics()
+    g.ComputeGrowthMatrix(size = 30,workers = 2)
+    AssertSameGrid(g,Serial(30))
+    assert np.array_equal(g.growthmatrix,Serial(30).growthmatrix)
+
+
+@pytest.mark.parametrize('workers',[1,2])
+def test_tiles_resume(tmp_path,monkeypatch,workers):
+    checkpointdir = str(tmp_path / 'tiles')
+    reference     = Serial(30).growthmatrix
+    g = Dynamics()
+    g.ComputeGrowthMatrix(size = 30,checkpointdir = checkpointdir,tilesize = 8,workers = workers)
+    assert np.array_equal(g.growthmatrix,reference)
+    assert len([f for f in os.listdir(checkpointdir) if f.startswith('tile_')]) == 16
+
+    # only the missing tile is computed again
+    os.remove(os.path.join(checkpointdir,'tile_1_2.npy'))
+    computed = list()
+    cells    = g.GrowthMatrixCells
+    def CountedCells(gridX,gridY,workers = 1):
+        computed.append((len(gridX),len(gridY)))
+        return cells(gridX,gridY,workers = workers)
+    monkeypatch.setattr(g,'GrowthMatrixCells',CountedCells)
+    g.ComputeGrowthMatrix(size = 30,checkpointdir = checkpointdir,tilesize = 8,resume = True)
+    assert computed == [(8,8)]
+    assert np.array_equal(g.growthmatrix,reference)
+
+    with pytest.raises(ValueError):
+        g.ComputeGrowthMatrix(size = 30,checkpointdir = checkpointdir,tilesize = 10,resume = True)
+    with pytest.raises(ValueError):
+        g.ComputeGrowthMatrix(size = 31,checkpointdir = checkpointdir,tilesize = 8,resume = True)
+    # parameters that do not appear in 'ParameterString', e.g. of the integrator, are checked as well
+    changed = gc.AssignGrowthDynamics(TimeIntegratorStep = .5,**Dynamics().__getstate__()[0])
+    assert changed.ParameterString() == g.ParameterString()
+    with pytest.raises(ValueError):
+        changed.ComputeGrowthMatrix(size = 30,checkpointdir = checkpointdir,tilesize = 8,resume = True)
+
+
+@pytest.mark.parametrize('size,step,newsize',[(20,1,30),(30,3,(np.arange(0,30,2),np.arange(0,40,3)))])
+def test_extend(size,step,newsize):
+    # extended (or refined) growthmatrix is identical to the one computed directly on the new grid
+    g = Serial(size,step)
+    g.ExtendGrowthMatrix(newsize)
+    reference = Serial(newsize) if isinstance(newsize,int) else None
+    grid      = newsize if reference is None else reference.growthmatrixgrid
+    for grid1,grid2 in zip(g.growthmatrixgrid,grid):
+        assert np.array_equal(grid1,grid2)
+    assert np.array_equal(g.growthmatrix,Dynamics().GrowthMatrixCells(*grid))
+
+
+def test_cache(tmp_path,monkeypatch):
+    cache = gc.GrowthMatrixCache(directory = str(tmp_path))
+    g1 = Dynamics()
+    g1.ComputeGrowthMatrix(size = 20,cache = cache)
+    assert len(cache.Files()) == 1
+
+    # second computation is read from the cache
+    g2 = Dynamics()
+    def NotComputed(*args,**kwargs):
+        raise AssertionError("growthmatrix was not taken from cache")
+    monkeypatch.setattr(g2,'GrowthMatrixCells',NotComputed)
+    g2.ComputeGrowthMatrix(size = 20,cache = cache)
+    AssertSameGrid(g2,Serial(20))
+    assert np.array_equal(g2.growthmatrix,Serial(20).growthmatrix)
+
+    # dynamics are assigned with the cached growthmatrix, which is not stored as a parameter
+    g3 = gc.AssignGrowthDynamics(GrowthMatrixCache = cache,GrowthMatrixSize = 20,**Dynamics().__getstate__()[0])
+    assert np.array_equal(g3.growthmatrix,g2.growthmatrix)
+    assert g3.__getstate__()[0] == g2.__getstate__()[0]
+    assert not Dynamics().hasGrowthMatrix()
+    
+    # other grid is not in the cache
+    with pytest.raises(AssertionError):
+        g2.ComputeGrowthMatrix(size = 21,cache = cache)
+
+
+def test_chunks(monkeypatch):
+    # batched ODE integration in blocks of rows gives the same growthmatrix as a single batch
+    g = gc.AssignGrowthDynamics(GrowthDynamics = 'ODE',growthrates = [2.,1.],yieldfactors = [1.,2.],mixingtime = 6,substrateconcentration = 1e2,TimeIntegratorStep = 1e-2)
+    reference = g.GrowthMatrixCells(np.arange(7),np.arange(5))
+    batches   = list()
+    growtharray = g.GrowthArray
+    def CountedGrowthArray(ic):
+        batches.append(len(ic))
+        return growtharray(ic)
+    monkeypatch.setattr(g,'GrowthArray',CountedGrowthArray)
+    monkeypatch.setattr(gc,'GrowthArrayChunkSize',10)
+    assert np.array_equal(g.GrowthMatrixCells(np.arange(7),np.arange(5)),reference)
+    assert max(batches) <= 10 and sum(batches) == 7 * 5
@@ -0,0 +1,61 @@
+#-*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+import growthclasses as gc
+
+
+def AssertSameGrowthMatrix(g1,g2):
+    assert np.array_equal(g1.growthmatrix,g2.growthmatrix)
+    for grid1,grid2 in zip(g1.growthmatrixgrid,g2.growthmatrixgrid):
+        assert np.array_equal(grid1,grid2)
+    assert np.array_equal(g1.growthrates,g2.growthrates)
+    assert np.array_equal(g1.yieldfactors,g2.yieldfactors)
+    assert g1.__getstate__()[0] == g2.__getstate__()[0]
+
+
+@pytest.mark.parametrize('readonly',[False,True])
+def test_pickle_binary_roundtrip(coarsegrid,tmp_path,readonly):
+    picklefile = str(tmp_path / 'gm.pkl')
+    binaryfile = str(tmp_path / 'gm.gm')
+    gc.SaveGM(coarsegrid,picklefile)
+    gc.SaveGM(coarsegrid,binaryfile,binary = True)
+    assert not gc.IsBinaryGM(picklefile) and gc.IsBinaryGM(binaryfile)
+
+    gp = gc.LoadGM(infile = picklefile,readonly = readonly)
+    gb = gc.LoadGM(infile = binaryfile,readonly = readonly)
+    assert isinstance(gb,gc.GrowthMatrixView) == readonly
+    assert type(gp) == type(gb)
+    AssertSameGrowthMatrix(coarsegrid,gp)
+    AssertSameGrowthMatrix(coarsegrid,gb)
+
+    # arrays of binary files are memory-mapped copy-on-write, changes never reach the file
+    assert isinstance(gb.growthmatrix,np.memmap)
+    gb.growthmatrix[1,1] = -1
+    AssertSameGrowthMatrix(coarsegrid,gc.LoadGM(infile = binaryfile,readonly = readonly))
+
+    # stored again in the other format, files load as the original dynamics object
+    gc.SaveGM(gb,picklefile)
+    gc.SaveGM(gp,binaryfile,binary = True)
+    AssertSameGrowthMatrix(gp,gc.LoadGM(infile = binaryfile))
+    assert type(gc.LoadGM(infile = picklefile)) == type(coarsegrid)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['gm.gm','gm.pkl']
+
+
+@pytest.mark.parametrize('readonly',[False,True])
+def test_binary_partial_read(tmp_path,readonly):
+    # values below 1 are set to 0 when writing, such that reading a few rows of a memory-mapped growthmatrix does not touch the others
+    resource = pytest.importorskip('resource')
+    binaryfile = str(tmp_path / 'gm.gm')
+    size       = 1000
+    matrix     = np.random.RandomState(0).uniform(0,10,size = (size,size,2))
+    gc.SaveGM(gc.GrowthMatrixView('GrowthDynamics',[{},matrix,(np.arange(size),np.arange(size))]),binaryfile,binary = True)
+    
+    g      = gc.LoadGM(infile = binaryfile,readonly = readonly)
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+    rows   = np.array(g.growthmatrix[10:12])
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt - faults
+    # the whole matrix has about 4000 pages, the two rows only 8
+    assert faults < 400
+    assert np.array_equal(rows,np.where(matrix[10:12] < 1,0,matrix[10:12]))
@@ -0,0 +1,103 @@
+#-*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+import growthclasses as gc
+
+
+# inocula include strains exactly at the extinction threshold of 1 cell
+INOCULA = [[2.,1.],[2.,2.],[3.,0.],[1.,5.]]
+
+
+def Antibiotics5(method):
+    # strain 1 produces the enzyme, strain 2 dies under antibiotics unless enough enzyme is around; cells are stationary after depletion
+    return gc.AssignGrowthDynamics(GrowthDynamics = 'Antibiotics5',ParameterList = ['AB','1.25','gamma','2','EnzymeProductionActivity','1','0'],
+                                   growthrates = [2.,1.],yieldfactors = [1.,2.],mixingtime = 6,substrateconcentration = 1e3,IntegrationMethod = method)
+
+
+def test_adaptive_integrator():
+    rk4 = Antibiotics5('ownRK4')
+    dp  = Antibiotics5('ownDP45')
+    for ic in INOCULA:
+        grk4 = rk4.Growth(np.array(ic))
+        gdp  = dp.Growth(np.array(ic))
+        # same strains survive, sizes differ by the overshoot of fixed RK4 steps at depletion
+        assert np.array_equal(grk4 == 0,gdp == 0)
+        assert np.allclose(grk4,gdp,rtol = 2e-3)
+
+
+def test_solveivp_integrator():
+    rk4 = Antibiotics5('ownRK4')
+    ivp = Antibiotics5('SolveIVP')
+    for ic in INOCULA:
+        grk4 = rk4.Growth(np.array(ic))
+        givp = ivp.Growth(np.array(ic))
+        assert np.array_equal(grk4 == 0,givp == 0)
+        assert np.allclose(grk4,givp,rtol = 2e-3)
+
+
+def test_solveivp_exponential_growth():
+    # without substrate dependence of growth, 'SolveIVP' follows the exact solution, as 'ownDP45' does
+    g = gc.GrowthDynamicsODE(growthrates = [2.,1.],yieldfactors = [1.,2.],mixingtime = 6,substrate = 1e3,IntegrationMethod = 'SolveIVP')
+    ic = np.array([2.,1.])
+    assert np.allclose(g.Growth(ic),ic * np.exp(np.array([2.,1.]) * 6),rtol = 1e-4)
+
+
+def test_solveivp_not_available():
+    with pytest.raises(ValueError):
+        gc.GrowthDynamicsPyoverdin(PVDproduction = [1.,0.],growthrates = [2.,1.],yieldfactors = [1.,2.],IntegrationMethod = 'SolveIVP')
+
+
+@pytest.mark.parametrize('dynamics,method',[('','ownRK4'),('ODE','ownDP45'),('ODE','SolveIVP'),('Approx','ownRK4')])
+def test_growth_array(dynamics,method):
+    # vectorized or one inoculum after the other, missing strains are filled up with zeros
+    g  = gc.AssignGrowthDynamics(GrowthDynamics = dynamics,growthrates = [2.,1.],yieldfactors = [1.,2.],mixingtime = 24,substrateconcentration = 1e4,IntegrationMethod = method)
+    ic = np.array(INOCULA)
+    assert np.allclose(g.GrowthArray(ic),[g.Growth(x) for x in ic],rtol = 1e-14)
+    assert np.array_equal(g.GrowthArray(ic[:,:1]),g.GrowthArray(np.column_stack([ic[:,0],np.zeros(len(ic))])))
+
+
+def test_batch_integrator():
+    # all inocula in lockstep, same fixed steps as integrating each inoculum alone
+    g  = Antibiotics5('ownRK4')
+    ic = np.array(INOCULA + [[10.,3.],[0.,4.]])
+    assert isinstance(g.batchintegrator,gc.TimeIntegratorBatch)
+    assert np.allclose(g.GrowthArray(ic),[g.Growth(x) for x in ic],rtol = 1e-12,atol = 1e-12)
+
+
+def test_exact_exponential_phase():
+    # jump to the end of the exponential phase, then the same fixed steps as integration from the start
+    kwargs = dict(GrowthDynamics = 'ODE',growthrates = [2.,1.],yieldfactors = [1.,2.],mixingtime = 24,substrateconcentration = 1e4)
+    g      = gc.AssignGrowthDynamics(**kwargs)
+    gexact = gc.AssignGrowthDynamics(ExactExponentialPhase = True,**kwargs)
+    ic     = np.array(INOCULA + [[10.,3.],[0.,4.]])
+    x,t,done = gexact.ExponentialPhaseJump(ic)
+    assert np.all(t > 0) and not np.any(done)
+    
+    growth = gexact.GrowthArray(ic)
+    assert np.allclose(growth,g.GrowthArray(ic),rtol = 1e-10)
+    assert np.allclose(growth,[gexact.Growth(x) for x in ic],rtol = 1e-12)
+    # growth does not depend on substrate, exact solution is exponential growth over the whole mixing time
+    assert np.allclose(growth,np.where(ic >= 1,ic,0) * np.exp(np.array([2.,1.]) * 24),rtol = 1e-9)
+
+
+def test_adaptive_integrator_nonfinite():
+    # blow-up is returned with the time it occured, events of end conditions are removed again
+    ti = gc.TimeIntegrator(dynamics = lambda t,x: np.where(t > .5,np.nan,1.) * np.ones_like(x),IntegrationMethod = 'ownDP45')
+    ti.ResetInitialConditions([2.,2.])
+    ti.SetEndConditionMaxTime(2.)
+    ti.SetEndConditionReachZero(1)
+    ti.SetPopulationExtinctionThreshold(0,1.)
+    with np.errstate(invalid = 'ignore'):
+        x = ti.IntegrateToEndConditions()
+    assert np.all(np.isnan(x)) and .5 < ti.time < 2.
+    assert len(ti._TimeIntegrator__events) == 0
+
+
+def test_strain_attributes():
+    # values live in the StrainTable of the dynamics, other attributes can still be set on strains
+    g = gc.AssignGrowthDynamics(GrowthDynamics = '',growthrates = [2.,1.],yieldfactors = [1.,2.],mixingtime = 24,substrateconcentration = 1e4)
+    g.strains[0].label = 'producer'
+    g.strains[0].growthrate = 3.
+    assert g.strains[0].label == 'producer'
+    assert g.growthrates[0] == 3.
@@ -0,0 +1,87 @@
+#-*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from scipy.stats import poisson
+import growthclasses as gc
+
+
+def ReferenceSeedingVector(m,n,cutoff = 1e-100):
+    # Poisson weights as computed originally, one inoculum at a time on the whole axis
+    if n <= 0:
+        return (np.arange(len(m)) == 0).astype(np.float64)
+    p = poisson.pmf(m,n)
+    p[p < cutoff] = 0.
+    return p / np.sum(p)
+
+
+def ReferenceSeedingAverage(matrix,coordinates,mask = None):
+    matrix = np.array(matrix,dtype = np.float64)
+    if not mask is None:
+        matrix[np.logical_not(mask)] = 0
+    p1 = ReferenceSeedingVector(np.arange(np.shape(matrix)[0]),coordinates[0])
+    p2 = ReferenceSeedingVector(np.arange(np.shape(matrix)[1]),coordinates[1])
+    return np.dot(p2,np.dot(p1,np.nan_to_num(matrix)))
+
+
+# states in the bulk, on the boundaries n = 0 and close to the end of the grid
+STATES = [[3.,5.],[10.,0.],[0.,4.],[0.,0.],[0.7,0.],[15.,30.],[36.,3.],[37.,38.]]
+
+
+@pytest.mark.filterwarnings('ignore:Poisson seeding')
+@pytest.mark.parametrize('grid',['unitgrid','coarsegrid'])
+def test_jacobian_finite_differences(grid,request):
+    g     = request.getfixturevalue(grid)
+    mx,my = g.growthmatrixgrid
+    m     = g.growthmatrix[:,:,:2]
+    n     = np.array(STATES) * mx[-1] / 40.
+    f,j   = gc.SeedingIterationMap(m,n,1e-3,axis1 = mx,axis2 = my,jacobian = True)
+    h     = 1e-6
+    for i in range(2):
+        dn = np.zeros(2)
+        dn[i] = h
+        fd = (gc.SeedingIterationMap(m,n + dn,1e-3,axis1 = mx,axis2 = my) - f)/h
+        assert np.allclose(j[:,:,i],fd,rtol = 1e-4,atol = 1e-5 * np.max(np.abs(fd)))
+
+
+def test_seeding_cache_identical():
+    # cached rows, assembled for batches of different composition, are identical to uncached ones
+    rng   = np.random.default_rng(1)
+    m     = np.arange(60.)
+    cache = gc.PoissonSeedingCache()
+    sizes = np.concatenate([rng.uniform(0,50,20),[0.,1.,2.5]])
+    for i in range(100):
+        n = rng.choice(sizes,size = rng.integers(1,15))
+        for cached,uncached in zip(gc.PoissonSeedingVectors(m,n,diff = True,cache = cache),gc.PoissonSeedingVectors(m,n,diff = True,cache = False)):
+            assert np.array_equal(cached,uncached)
+    assert cache.hits > 0
+
+
+def test_seeding_average_array(unitgrid):
+    # averages for many inocula at once agree with averages for single inocula on the whole axis
+    m     = np.array(unitgrid.growthmatrix[:,:,:2])
+    mask  = np.ones(np.shape(m)[:2],dtype = bool)
+    mask[5:9,2:4] = False
+    coord = [[0.,0.],[0.,3.],[2.5,0.],[1.,1.],[7.3,12.1],[7.3,4.],[20.,20.],[7.3,12.1]]
+    for q in range(2):
+        avg = gc.SeedingAverageArray(m[:,:,q],coord)
+        assert np.allclose(avg,[ReferenceSeedingAverage(m[:,:,q],c) for c in coord],rtol = 1e-12)
+        avg = gc.SeedingAverageArray(m[:,:,q],coord,mask = mask)
+        assert np.allclose(avg,[ReferenceSeedingAverage(m[:,:,q],c,mask = mask) for c in coord],rtol = 1e-12)
+        assert np.allclose(gc.SeedingAverage(m[:,:,q],coord[4]),ReferenceSeedingAverage(m[:,:,q],coord[4]),rtol = 1e-12)
+    # all quantities at once, and one step of the cycle map
+    assert np.allclose(gc.SeedingAverageArray(m,coord)[:,1],gc.SeedingAverageArray(m[:,:,1],coord),rtol = 1e-14)
+    assert np.allclose(gc.SeedingIterationMap(m,coord,1e-3),1e-3 * gc.SeedingAverageArray(m,coord),rtol = 1e-12)
+
+
+def test_coarse_grid_small_inocula(unitgrid,coarsegrid):
+    # coarse grids contain node 1, such that averages for small inocula follow the unit lattice up to interpolation errors
+    coord = [[3.,5.],[1.,1.],[.5,2.],[10.,10.]]
+    assert np.array_equal(coarsegrid.growthmatrixgrid[0][:3],[0,1,3])
+    avg   = gc.SeedingAverageArray(coarsegrid.growthmatrix[:,:,:2],coord,axis1 = coarsegrid.growthmatrixgrid[0],axis2 = coarsegrid.growthmatrixgrid[1])
+    assert np.allclose(avg,gc.SeedingAverageArray(unitgrid.growthmatrix[:,:,:2],coord),rtol = 2e-2)
+
+    # stored grids without node 1 are still used, with a warning
+    grid = np.arange(0,60,3)
+    with pytest.warns(UserWarning,match = 'no node 1'):
+        gc.GridSeedingBands(grid,[3.])
@@ -8,7 +8,8 @@
 ==================================
 
     Compute the final population sizes for a matrix of inoculum sizes,
-    then store as binary pickle file, that is used by all other programs
+    then store as binary pickle file (or in the binary growthmatrix format
+    with memory-mapped arrays), that is used by all other programs
     
     Lukas Geyrhofer, l.geyrhofer@technion.ac.il
 
@@ -16,8 +17,7 @@
 
 import numpy as np
 import argparse
-import sys,math
-import pickle
+import sys,os,math,glob
 import growthclasses as gc
 
 
@@ -27,39 +27,75 @@ def main():
     parser_io.add_argument("-o","--outfile",default=None,required = True)
     parser_io.add_argument("-i","--infile",default=None)
     parser_io.add_argument("-v","--verbose",default=False,action="store_true")
+    parser_io.add_argument("-B","--binary",default=False,action="store_true",help="write binary growthmatrix format instead of pickle file")
 
     parser = gc.AddGrowthDynamicsArguments(parser)
     parser = gc.AddGrowthParameters(parser,defaultmixingtime=24,dilution=False)
 
+    parser_ode = parser.add_argument_group(description = "==== Parameters for numerical integration (only ODE based dynamics) ====")
+    parser_ode.add_argument("--IntegrationMethod",choices = ['ownRK4','ownDP45','SciPy','SolveIVP'],default = argparse.SUPPRESS)
+    parser_ode.add_argument("--TimeIntegratorStep",type=float,default = argparse.SUPPRESS)
+    parser_ode.add_argument("--TimeIntegratorRtol",type=float,default = argparse.SUPPRESS,help="relative tolerance for adaptive steps in 'ownDP45' and 'SolveIVP' [default: 1e-6]")
+    parser_ode.add_argument("--TimeIntegratorAtol",type=float,default = argparse.SUPPRESS,help="absolute tolerance for adaptive steps in 'ownDP45' and 'SolveIVP' [default: 1e-6]")
+    parser_ode.add_argument("--SolveIVPMethod",choices = ['RK45','RK23','DOP853','Radau','BDF','LSODA'],default = argparse.SUPPRESS,help="integration method used by 'SolveIVP' [default: LSODA]")
+    parser_ode.add_argument("--ExactExponentialPhase",action="store_true",default = argparse.SUPPRESS,help="solve exponential growth until substrate is used up analytically, if dynamics allow it")
+
     parser_gm = parser.add_argument_group(description = "==== Parameters for growthmatrix ====")
     parser_gm.add_argument("-m","--maxsize",type=int,default=100)
     parser_gm.add_argument("-M","--step",type=int,default=1)
+    parser_gm.add_argument("-w","--workers",type=int,default=1,help="number of processes to compute growthmatrix in parallel [default: 1]")
+    parser_gm.add_argument("-C","--checkpointdir",default=None,help="write finished tiles of the growthmatrix to this directory, such that interrupted runs can be resumed [default: OUTFILE.tiles, removed after OUTFILE is written]")
+    parser_gm.add_argument("-t","--tilesize",type=int,default=50)
+    parser_gm.add_argument("-R","--resume",default=False,action="store_true",help="skip tiles already finished in CHECKPOINTDIR")
+    parser_gm.add_argument("-N","--nocheckpoint",default=False,action="store_true",help="do not write tiles, an interrupted run has to start over")
+
+    parser_cache = parser.add_argument_group(description = "==== Cache of computed growthmatrices ====")
+    parser_cache.add_argument("--cachedir",default=None,help="use cache of growthmatrices in this directory, identified by dynamics, parameters and grid [default: $GROWTHMATRIXCACHE, no cache if not set]")
+    parser_cache.add_argument("--cachemaxsize",type=float,default=4,help="least recently used growthmatrices are removed if cache exceeds this size in GB [default: 4]")
+    parser_cache.add_argument("--nocache",default=False,action="store_true",help="always compute growthmatrix, do not use cache even if $GROWTHMATRIXCACHE is set")
 
     args = parser.parse_args()
+    
+    # tiles are written by default, but only kept after a successful run if the directory was given explicitly
+    removetiles = args.checkpointdir is None
+    if args.nocheckpoint:
+        args.checkpointdir = None
+    elif args.checkpointdir is None:
+        args.checkpointdir = args.outfile + '.tiles'
+
+
+    # cache is only used if a directory is given explicitly
+    if args.cachedir is None:
+        args.cachedir = os.environ.get('GROWTHMATRIXCACHE',None)
+    cache = None if (args.nocache or args.cachedir is None) else gc.GrowthMatrixCache(args.cachedir,maxsize = args.cachemaxsize * 2**30)
 
+    # only parameters of the dynamics are stored with the growthmatrix, not I/O or other options of this script
+    scriptParameters   = ['infile','outfile','verbose','binary','maxsize','step','workers','checkpointdir','tilesize','resume','nocheckpoint','cachedir','cachemaxsize','nocache']
+    dynamicsParameters = dict([(key,value) for key,value in vars(args).items() if not key in scriptParameters])
 
     if args.infile is None:
-        g = gc.AssignGrowthDynamics(**vars(args))
+        g = gc.AssignGrowthDynamics(GrowthMatrixCache = cache,GrowthMatrixSize = args.maxsize,GrowthMatrixStep = args.step,**dynamicsParameters)
         if args.verbose:print(g)
-        g.ComputeGrowthMatrix(size = args.maxsize,step = args.step)
+        if not g.hasGrowthMatrix():
+            g.ComputeGrowthMatrix(size = args.maxsize,step = args.step,workers = args.workers,checkpointdir = args.checkpointdir,tilesize = args.tilesize,resume = args.resume,cache = cache)
 
     else:
-        try:
-            g = pickle.load(open(args.infile,'rb'),encoding='bytes')
-        except:
-            raise IOError("could not open pickle file")
+        g = gc.LoadGM(infile = args.infile)
         if args.verbose:print(g)
         if g.hasGrowthMatrix():
-            g.ExtendGrowthMatrix(size = args.maxsize)
+            g.ExtendGrowthMatrix(size = args.maxsize,step = args.step,workers = args.workers,cache = cache)
         else:
             raise IOError("pickle file does not contain growthmatrix")
         
-    try:
-        fp = open(args.outfile,"wb")
-        pickle.dump(g,fp)
-        fp.close()
-    except:
-        raise IOError("could not open file for pickle dump")
+    gc.SaveGM(g,args.outfile,binary = args.binary)
+    if removetiles and not args.checkpointdir is None and os.path.isdir(args.checkpointdir):
+        for filename in glob.glob(os.path.join(args.checkpointdir,'tile_*.npy')) + [os.path.join(args.checkpointdir,'manifest.json')]:
+            if os.path.exists(filename):
+                os.remove(filename)
+        if len(os.listdir(args.checkpointdir)) == 0:
+            os.rmdir(args.checkpointdir)
+    if args.verbose and not cache is None:
+        sys.stderr.write(str(cache))
             
         
 if __name__ == "__main__":
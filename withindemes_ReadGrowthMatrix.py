@@ -22,27 +22,64 @@
     either stdout or to 'outfile',
     if '-o OUTFILE'/'--outfile OUTFILE' is given
     
+    Only parts of the growthmatrix are written with
+    '-x XMIN XMAX', '-y YMIN YMAX' (ranges in grid values),
+    '-s STRIDE' (every STRIDE-th grid point) and
+    '-c COMPONENT [COMPONENT ...]' (default: 0 1).
+    With '--format npy' or '--format npz' values are
+    stored as columns x, y, m0, m1, ... in OUTFILE.npy(z)
+    
     Lukas Geyrhofer, l.geyrhofer@technion.ac.il
 
 '''
 
 import numpy as np
 import argparse
-import pickle
 import sys
 import growthclasses as gc
 
 def array_to_str(x):
     return ' '.join(['{:e}'.format(float(y)) for y in x])
 
+def GridSlice(grid,valuerange,stride):
+    # indices of grid points within 'valuerange' (inclusive), every 'stride'-th point
+    if valuerange is None:
+        return slice(0,len(grid),stride)
+    return slice(np.searchsorted(grid,min(valuerange),side = 'left'),np.searchsorted(grid,max(valuerange),side = 'right'),stride)
+
+
+def WriteValuesText(fp,gridx,gridy,values):
+    # one line for each grid point, blank line after each row in x,
+    # each row is formatted with a single call on python scalars, which matches the former output cell by cell
+    gridy = list(gridy)
+    line  = ' '.join(['{}'] * (2 + np.shape(values)[2])) + '\n'
+    row   = line * len(gridy) + '\n'
+    for i,x in enumerate(gridx):
+        columns = [[x] * len(gridy),gridy] + [values[i,:,c].tolist() for c in range(np.shape(values)[2])]
+        fp.write(row.format(*[v for cell in zip(*columns) for v in cell]))
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("-i", "--infile",  default = None, required = True)
     parser.add_argument("-o", "--outfile", default = None)
     parser.add_argument("-q", "--quiet",   default = False, action = "store_true")
+
+    parser_export = parser.add_argument_group(description = "==== Export of growthmatrix values ====")
+    parser_export.add_argument("-x", "--xrange",    default = None, type = float, nargs = 2, help = "only grid points with XMIN <= x <= XMAX")
+    parser_export.add_argument("-y", "--yrange",    default = None, type = float, nargs = 2, help = "only grid points with YMIN <= y <= YMAX")
+    parser_export.add_argument("-s", "--stride",    default = [1],  type = int,   nargs = '+', help = "write every STRIDE-th grid point, different strides for x and y with two values [default: 1]")
+    parser_export.add_argument("-c", "--component", default = [0,1],type = int,   nargs = '+', help = "components of growthmatrix to write [default: 0 1]")
+    parser = gc.AddOutputFormatParameters(parser)
     args = parser.parse_args()
 
-    g = gc.LoadGM(**vars(args))
+    if args.format != 'text' and args.outfile is None:
+        raise ValueError("output format '{}' needs OUTFILE".format(args.format))
+    if len(args.stride) > 2 or min(args.stride) < 1:
+        raise ValueError("STRIDE needs one or two positive values")
+
+    # without parameter output only the matrix itself is needed, which is loaded without constructing the dynamics
+    g = gc.LoadGM(readonly = args.quiet,**vars(args))
     
     if not args.quiet:
         # output of all parameters
@@ -68,10 +105,14 @@ def main():
         generateString = "   -G '" + type(g).__name__[14:] + "'"
         # default parameters for strains
         excludeParameters  = ['growthrates','yieldfactors','substrateconcentration','mixingtime']
-        # I/O parameters from computing growthmatrix
+        # I/O parameters from computing growthmatrix, only stored in files written before 'withindemes_ComputeGrowthMatrix.py' kept dynamics parameters alone
         excludeParameters += ['infile','outfile','verbose']
         # other parameters from computing GrowthMatrix
         excludeParameters += ['GrowthDynamics','maxsize','step']
+        # parameters for numerical integration have their own command-line options
+        integratorParameters = ['IntegrationMethod','TimeIntegratorStep','TimeIntegratorRtol','TimeIntegratorAtol','SolveIVPMethod']
+        integratorFlags      = ['ExactExponentialPhase']
+        excludeParameters += integratorParameters + integratorFlags
         
         if 'growthrates' in g._GrowthDynamics__kwargs_for_pickle.keys():
             generateString += " -a " + array_to_str(g.growthrates)
@@ -81,6 +122,12 @@ def main():
             generateString += " -S " + str(g.env.substrate)
         if 'mixingtime' in g._GrowthDynamics__kwargs_for_pickle.keys():
             generateString += " -T " + str(g.env.mixingtime)
+        for key in integratorParameters:
+            if key in g._GrowthDynamics__kwargs_for_pickle.keys():
+                generateString += " --{} {}".format(key,g._GrowthDynamics__kwargs_for_pickle[key])
+        for key in integratorFlags:
+            if g._GrowthDynamics__kwargs_for_pickle.get(key,False):
+                generateString += " --{}".format(key)
         
         additionalParameters = ""
         for key,values in g._GrowthDynamics__kwargs_for_pickle.items():
@@ -99,34 +146,47 @@ def main():
         fp_params.write("==================================================================\n")
         
     
-    # output of all values
-    if not args.outfile is None:
-        try:
-            fp_values = open(args.outfile,"w")
-        except:
-            raise IOError("could not open file '{}' to write.".format(args.outfile))
-    else:
-        fp_values = sys.stdout
-    
+    # output of values
     if isinstance(g.growthmatrixgrid,int):
         # old implementation, still here for these old growth matrices
-        for x in range(g.growthmatrixgrid):
-            for y in range(g.growthmatrixgrid):
-                fp_values.write('{} {} {} {}\n'.format(x,y,g.growthmatrix[x,y,0],g.growthmatrix[x,y,1]))
-            fp_values.write('\n')
+        gridx = np.arange(g.growthmatrixgrid)
+        gridy = np.arange(g.growthmatrixgrid)
     elif isinstance(g.growthmatrixgrid,(tuple,list,np.ndarray)):
         # growthmatrixgrid is stored in pickle file
-        for i,x in enumerate(g.growthmatrixgrid[0]):
-            for j,y in enumerate(g.growthmatrixgrid[1]):
-                fp_values.write('{} {} {} {}\n'.format(x,y,g.growthmatrix[i,j,0],g.growthmatrix[i,j,1]))
-            fp_values.write('\n')
+        gridx = np.asarray(g.growthmatrixgrid[0])
+        gridy = np.asarray(g.growthmatrixgrid[1])
     else:
         # should not happen
         raise NotImplementedError
     
-    if not args.outfile is None:
-        fp_values.close()
-
+    numcomponents = np.shape(g.growthmatrix)[2]
+    if min(args.component) < 0 or max(args.component) >= numcomponents:
+        raise ValueError("growthmatrix has only {} components".format(numcomponents))
+    
+    sx     = GridSlice(gridx,args.xrange,args.stride[0])
+    sy     = GridSlice(gridy,args.yrange,args.stride[-1])
+    gridx  = gridx[sx]
+    gridy  = gridy[sy]
+    # binary files store values below 1 already set to 0, such that slicing first only reads the requested part of their memory-mapped growthmatrices
+    # (pickle files, and binary files written without 'restricted' in their header, are read completely)
+    values = np.asarray(g.growthmatrix[sx,sy])[:,:,args.component]
+    
+    if args.format == 'text':
+        if not args.outfile is None:
+            try:
+                fp_values = open(args.outfile,"w")
+            except:
+                raise IOError("could not open file '{}' to write.".format(args.outfile))
+        else:
+            fp_values = sys.stdout
+        WriteValuesText(fp_values,gridx.tolist(),gridy.tolist(),values)
+        if not args.outfile is None:
+            fp_values.close()
+    else:
+        # same rows as text output, blank lines are given by offsets
+        mx,my   = np.meshgrid(gridx,gridy,indexing = 'ij')
+        columns = dict([('x',mx),('y',my)] + [('m{}'.format(c),values[:,:,k]) for k,c in enumerate(args.component)])
+        gc.WriteColumns(args.outfile,columns,offsets = gc.SegmentOffsets(np.repeat(len(gridy),len(gridx))),format = args.format)
 
 if __name__ == "__main__":
     main()
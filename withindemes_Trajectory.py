@@ -28,7 +28,10 @@ def main():
     parser_alg = parser.add_argument_group(description = "==== Parameters for algorithm ====")
     parser_alg.add_argument("-t","--TimeIntegratorStep",default=1e-3,type=float)
     parser_alg.add_argument("-O","--TimeIntegratorOutput",default=10,type=int)
-    parser_alg.add_argument("-M","--IntegrationMethod",choices = ['ownRK4','SciPy'],default = 'ownRK4')
+    parser_alg.add_argument("-M","--IntegrationMethod",choices = ['ownRK4','ownDP45','SciPy','SolveIVP'],default = 'ownRK4')
+    parser_alg.add_argument("-r","--TimeIntegratorRtol",default=1e-6,type=float,help="relative tolerance for adaptive steps in 'ownDP45' and 'SolveIVP' [default: 1e-6]")
+    parser_alg.add_argument("-e","--TimeIntegratorAtol",default=1e-6,type=float,help="absolute tolerance for adaptive steps in 'ownDP45' and 'SolveIVP' [default: 1e-6]")
+    parser_alg.add_argument("--SolveIVPMethod",choices = ['RK45','RK23','DOP853','Radau','BDF','LSODA'],default = 'LSODA',help="integration method used by 'SolveIVP' [default: LSODA]")
 
     parser_ic = parser.add_argument_group(description = "==== Initial conditions ====")
     parser_ic.add_argument("-N","--initialconditions",default=[1,1],type=float,nargs="*")